@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class AlgoTradingConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "algo_trading"
+
+    def ready(self):
+        from django.core.signals import request_started
+        from .jobs import fail_orphaned_jobs_once
+
+        # Jobs queued by a process that has since exited would stay PENDING/RUNNING forever
+        request_started.connect(fail_orphaned_jobs_once, dispatch_uid="algo_trading_orphaned_jobs")
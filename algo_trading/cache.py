@@ -0,0 +1,87 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from django.conf import settings
+
+
+def cache_key(file, short_window, long_window):
+    """SHA-256 of the uploaded file's bytes plus the strategy parameters."""
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    params = json.dumps({'short_window': short_window, 'long_window': long_window}, sort_keys=True)
+    digest.update(params.encode())
+    return digest.hexdigest()
+
+
+def summary_entry(result):
+    """What the result cache keeps of a stored run: everything but its trades.
+
+    Trades can run to millions of rows, so an entry count alone would not
+    bound the cache's memory; they are reloaded from the run on a hit.
+    """
+    return {key: value for key, value in result.items() if key != 'trades'}
+
+
+class ResultCache:
+    """Thread-safe LRU cache of backtest results with hit/miss counters.
+
+    Holds at most ``max_entries`` results; the least recently used one is
+    evicted first.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+    def put(self, key, value):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def discard_run(self, run_id):
+        """Drop every entry pointing at a stored run that no longer exists."""
+        with self._lock:
+            for key in [k for k, v in self._entries.items() if isinstance(v, dict) and v.get('run_id') == run_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups * 100, 2) if lookups else 0.0,
+            }
+
+
+result_cache = ResultCache(settings.BACKTEST_CACHE_SIZE)
+
+# IndicatorCache per dataset slice, so repeated strategy runs reuse indicators
+indicator_caches = ResultCache(settings.BACKTEST_INDICATOR_CACHE_SIZE)
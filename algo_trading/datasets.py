@@ -0,0 +1,108 @@
+import os
+import shutil
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .models import Dataset
+
+# Columns stored as one .npy file each
+DATASET_COLUMNS = ['Date', 'Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def dataset_dir(dataset_id):
+    return os.path.join(settings.MEDIA_ROOT, 'datasets', str(dataset_id))
+
+
+def save_dataset(df, name, ticker=None):
+    """Store an OHLCV frame as per-column arrays and register it.
+
+    Rows are sorted by ticker and date so each ticker is one contiguous range
+    of every column. A frame without a ``Ticker`` column is stored under
+    ``ticker`` (or ``name``).
+    """
+    df = df.dropna(subset=['Close'])
+    if 'Ticker' not in df.columns:
+        df = df.assign(Ticker=ticker or name)
+    if df.empty:
+        raise ValueError("No price rows to store")
+    df = df.sort_values(['Ticker', 'Date'], kind='stable')
+
+    tickers = df['Ticker'].astype(str).to_numpy()
+    boundaries = np.flatnonzero(tickers[1:] != tickers[:-1]) + 1
+    starts = np.concatenate(([0], boundaries))
+    ends = np.append(boundaries, len(tickers))
+    ticker_index = {tickers[s]: [int(s), int(e)] for s, e in zip(starts, ends)}
+
+    dates = pd.to_datetime(df['Date'])
+    scratch = target = None
+    moved = False
+    try:
+        # The row is committed only after its files are in place, so any reader
+        # that can see it can also open its columns
+        with transaction.atomic():
+            dataset = Dataset.objects.create(
+                name=name,
+                rows=len(df),
+                ticker_index=ticker_index,
+                start_date=timezone.make_aware(dates.min()),
+                end_date=timezone.make_aware(dates.max()),
+            )
+            # Write into a scratch directory first so readers never see a partial dataset
+            target = dataset_dir(dataset.pk)
+            scratch = target + '.tmp'
+            os.makedirs(scratch, exist_ok=True)
+            np.save(os.path.join(scratch, 'Date.npy'), dates.to_numpy(dtype='datetime64[ns]'))
+            for column in DATASET_COLUMNS[1:]:
+                np.save(os.path.join(scratch, f'{column}.npy'), df[column].to_numpy(dtype=np.float64))
+            os.replace(scratch, target)
+            moved = True
+    except Exception:
+        if scratch is not None:
+            shutil.rmtree(scratch, ignore_errors=True)
+        if moved:
+            shutil.rmtree(target, ignore_errors=True)
+        raise
+    return dataset
+
+
+def open_column(dataset, column):
+    """Memory-map one stored column; pages are shared through the OS cache."""
+    if column not in DATASET_COLUMNS:
+        raise ValueError(f"Unknown column: {column}")
+    return np.load(os.path.join(dataset_dir(dataset.pk), f'{column}.npy'), mmap_mode='r')
+
+
+def load_slice(dataset, ticker=None, start=None, end=None, columns=('Date', 'Close')):
+    """Zero-copy views of ``columns`` for one ticker and an optional date range.
+
+    ``start`` and ``end`` are inclusive bounds. Without a ticker the whole
+    dataset is returned (date bounds then need a single-ticker dataset).
+    """
+    if ticker is not None:
+        if ticker not in dataset.ticker_index:
+            raise ValueError(f"Ticker {ticker} is not in dataset {dataset.pk}")
+        first, last = dataset.ticker_index[ticker]
+    else:
+        first, last = 0, dataset.rows
+
+    if start is not None or end is not None:
+        if ticker is None and len(dataset.ticker_index) > 1:
+            raise ValueError("Pick a ticker to filter a multi-ticker dataset by date")
+        dates = open_column(dataset, 'Date')[first:last]
+        lo, hi = 0, len(dates)
+        if start is not None:
+            lo = int(np.searchsorted(dates, np.datetime64(pd.Timestamp(start)), side='left'))
+        if end is not None:
+            hi = int(np.searchsorted(dates, np.datetime64(pd.Timestamp(end)), side='right'))
+        first, last = first + lo, first + max(lo, hi)
+
+    return {column: open_column(dataset, column)[first:last] for column in columns}
+
+
+def ticker_column(dataset):
+    """Ticker label of every row, rebuilt from the index."""
+    names = sorted(dataset.ticker_index, key=lambda t: dataset.ticker_index[t][0])
+    sizes = [dataset.ticker_index[t][1] - dataset.ticker_index[t][0] for t in names]
+    return np.repeat(np.array(names, dtype=object), sizes)
@@ -0,0 +1,213 @@
+import numpy as np
+import pandas as pd
+
+# Default moving average windows for the crossover strategy
+SHORT_WINDOW = 50
+LONG_WINDOW = 200
+
+REQUIRED_COLUMNS = ['Date', 'Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def load_prices(source):
+    """Read an OHLCV CSV into a DataFrame sorted by date.
+
+    Raises ``ValueError`` when required columns are missing.
+    """
+    df = pd.read_csv(source)
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing_columns:
+        raise ValueError(f"CSV file is missing required columns: {', '.join(missing_columns)}")
+    df['Date'] = pd.to_datetime(df['Date'])
+    df.sort_values('Date', inplace=True)
+    df.dropna(subset=['Close'], inplace=True)
+    return df
+
+
+def cumulative_sum(close):
+    """Return a zero-padded cumulative sum of close prices.
+
+    The series is shifted by its first value before summing so the running
+    total stays small and rolling means keep their precision on long inputs.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    csum = np.zeros(len(close) + 1, dtype=np.float64)
+    if len(close):
+        np.cumsum(close - close[0], out=csum[1:])
+    return csum
+
+
+def moving_average(close, window, csum=None):
+    """Simple moving average computed from a cumulative sum in O(n).
+
+    The first ``window - 1`` values are NaN, matching ``Series.rolling().mean()``.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    if csum is None:
+        csum = cumulative_sum(close)
+    ma = np.full(len(close), np.nan)
+    if len(close) >= window:
+        ma[window - 1:] = (csum[window:] - csum[:-window]) / window + close[0]
+    return ma
+
+
+def crossover_indices(signal):
+    """Pair entry and exit rows from a 0/1 position signal.
+
+    An entry is a 0 -> 1 transition (golden cross) and an exit is a 1 -> 0
+    transition (death cross). The first row never triggers, and an exit seen
+    before any entry is ignored. Returns ``(entries, exits, open_entry)`` where
+    ``open_entry`` is the row of a position still open at the end, or -1.
+    """
+    signal = np.asarray(signal, dtype=np.int8)
+    change = np.diff(signal)
+    entries = np.flatnonzero(change == 1) + 1
+    exits = np.flatnonzero(change == -1) + 1
+    return pair_crossings(entries, exits)
+
+
+def pair_crossings(entries, exits):
+    """Match sorted entry rows with the exit rows that follow them.
+
+    Transitions of a 0/1 signal alternate, so only a leading exit can be
+    unmatched (it is dropped) and only a trailing entry can stay open.
+    """
+    if len(entries) == 0:
+        return entries, exits[:0], -1
+    exits = exits[exits > entries[0]]
+
+    open_entry = -1
+    if len(entries) > len(exits):
+        open_entry = int(entries[-1])
+        entries = entries[:-1]
+    return entries, exits, open_entry
+
+
+def _format_dates(dates, rows):
+    return list(pd.DatetimeIndex(dates[rows]).strftime('%Y-%m-%d'))
+
+
+def trade_records(dates, close, buy_rows, sell_rows, is_open=None, indicators=None, labels=None):
+    """Build trade dicts from matching arrays of buy and sell rows.
+
+    ``is_open`` flags trades whose sell row is only a mark-to-market price;
+    they are reported with ``sell_date='Open Position'``. ``indicators`` maps a
+    trade key (e.g. ``'ma_50'``) to an array whose value at the sell row is
+    recorded with the trade, and ``labels`` maps a key to one value per trade
+    placed ahead of the other fields (e.g. the ticker).
+    """
+    close = np.asarray(close, dtype=np.float64)
+    dates = np.asarray(dates)
+
+    buy_price = close[buy_rows]
+    sell_price = close[sell_rows]
+    profit = sell_price - buy_price
+
+    sell_dates = np.array(_format_dates(dates, sell_rows), dtype=object)
+    if is_open is not None:
+        sell_dates[is_open] = 'Open Position'
+
+    columns = dict(labels or {})
+    columns.update({
+        'buy_date': _format_dates(dates, buy_rows),
+        'buy_price': np.round(buy_price, 2).tolist(),
+        'sell_date': sell_dates.tolist(),
+        'sell_price': np.round(sell_price, 2).tolist(),
+        'profit': np.round(profit, 2).tolist(),
+        'profit_percentage': np.round(profit / buy_price * 100, 2).tolist(),
+    })
+    for key, values in (indicators or {}).items():
+        columns[key] = np.round(np.asarray(values)[sell_rows], 2).tolist()
+
+    keys = list(columns)
+    return [dict(zip(keys, row)) for row in zip(*columns.values())]
+
+
+def build_trades(dates, close, entries, exits, open_entry=-1, indicators=None):
+    """Build trade dicts for a single series from ``crossover_indices`` output.
+
+    An open position is marked to the last close.
+    """
+    is_open = np.zeros(len(entries) + (open_entry >= 0), dtype=bool)
+    if open_entry >= 0:
+        entries = np.append(entries, open_entry)
+        exits = np.append(exits, len(close) - 1)
+        is_open[-1] = True
+    return trade_records(dates, close, entries, exits, is_open, indicators)
+
+
+def crossover_rows(ma_short, ma_long, start):
+    """Entry/exit rows of a crossover, evaluated from row ``start`` onwards."""
+    signal = ma_short[start:] > ma_long[start:]
+    entries, exits, open_entry = crossover_indices(signal)
+    if open_entry >= 0:
+        open_entry += start
+    return entries + start, exits + start, open_entry
+
+
+def crossover_stats(close, ma_short, ma_long, start):
+    """Profit, trade count and win rate of a crossover without building trades.
+
+    Counts follow ``summarize``: an open position is a trade, but only closed
+    trades add to the total profit.
+    """
+    entries, exits, open_entry = crossover_rows(ma_short, ma_long, start)
+    profits = close[exits] - close[entries]
+    total_trades = len(profits) + (open_entry >= 0)
+    winning_trades = int((np.round(profits, 2) > 0).sum())
+    if open_entry >= 0 and round(close[-1] - close[open_entry], 2) > 0:
+        winning_trades += 1
+    return {
+        'total_profit': round(float(profits.sum()), 2),
+        'total_trades': int(total_trades),
+        'winning_trades': winning_trades,
+        'win_rate': round(winning_trades / total_trades * 100, 2) if total_trades else 0.0,
+    }
+
+
+def run_crossover(dates, close, short_window=SHORT_WINDOW, long_window=LONG_WINDOW):
+    """Run the moving average crossover strategy over a sorted price series.
+
+    Buys on a golden cross (short MA crosses above long MA) and sells on the
+    next death cross. Returns a dict with the trade list, the realized profit
+    of closed trades and the number of rows that had both moving averages
+    available.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    dates = np.asarray(dates)
+    if not 0 < short_window < long_window:
+        raise ValueError("Short window must be positive and smaller than long window")
+    if len(close) < long_window:
+        return {'trades': [], 'total_profit': 0.0, 'rows_evaluated': 0}
+
+    csum = cumulative_sum(close)
+    ma_short = moving_average(close, short_window, csum)
+    ma_long = moving_average(close, long_window, csum)
+
+    # Only rows with both averages take part, as after dropna() in the old loop
+    start = long_window - 1
+    entries, exits, open_entry = crossover_rows(ma_short, ma_long, start)
+
+    trades = build_trades(dates, close, entries, exits, open_entry, indicators={
+        'ma_50': ma_short,
+        'ma_200': ma_long,
+    })
+    # An open position is reported as a trade but not counted as realized profit
+    total_profit = float(close[exits].sum() - close[entries].sum())
+
+    return {
+        'trades': trades,
+        'total_profit': round(total_profit, 2),
+        'rows_evaluated': len(close) - start,
+    }
+
+
+def summarize(trades, total_profit=None):
+    """Summary figures shown on the results page and in the CSV report."""
+    if total_profit is None:
+        total_profit = round(sum(t['profit'] for t in trades), 2)
+    return {
+        'total_profit': total_profit,
+        'total_trades': len(trades),
+        'winning_trades': sum(1 for t in trades if t['profit'] > 0),
+        'losing_trades': sum(1 for t in trades if t['profit'] < 0),
+    }
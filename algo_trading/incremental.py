@@ -0,0 +1,86 @@
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from .models import BacktestJob, BacktestTrade, IncrementalBacktest
+from .results import TRADE_FIELDS
+from .streaming import CrossoverState
+
+OPEN_POSITION = 'Open Position'
+
+
+def _lock_tracker(ticker, short_window, long_window):
+    """The ticker's tracker, row-locked, and whether this call created it (with its run).
+
+    Two first calls for a ticker can both miss the lookup; the second insert
+    then fails on the unique constraint, and that call waits for the row the
+    first one created instead.
+    """
+    lookup = {'ticker': ticker, 'short_window': short_window, 'long_window': long_window}
+    tracker = IncrementalBacktest.objects.select_for_update().filter(**lookup).first()
+    if tracker is not None:
+        return tracker, False
+    try:
+        with transaction.atomic():
+            run = BacktestJob.objects.create(
+                status='DONE',
+                file_name=f"incremental {ticker}",
+                short_window=short_window,
+                long_window=long_window,
+                started_at=timezone.now(),
+            )
+            return IncrementalBacktest.objects.create(run=run, **lookup), True
+    except IntegrityError:
+        return IncrementalBacktest.objects.select_for_update().get(**lookup), False
+
+
+def append_bars(ticker, dates, close, short_window, long_window):
+    """Advance a ticker's saved crossover state over newly appended bars.
+
+    Bars at or before the last processed date are skipped, so resending
+    overlapping history is harmless. Only the new bars are evaluated: the
+    saved state carries the moving-average window and any open position.
+    The first call for a ticker processes the full series it is given.
+    Returns the tracker, the number of new bars, the trades they closed and
+    the open position (or None).
+    """
+    with transaction.atomic():
+        tracker, created = _lock_tracker(ticker, short_window, long_window)
+        if created:
+            state = CrossoverState(short_window, long_window)
+        else:
+            state = CrossoverState.from_dict(tracker.state)
+
+        if state.last_date is not None:
+            newer = dates > state.last_date
+            dates, close = dates[newer], close[newer]
+        closed = state.update(dates, close)
+        open_trade = state.open_trade()
+
+        # The open position row is replaced on every update
+        run = tracker.run
+        run.trades.filter(seq__gte=tracker.closed_trades).delete()
+        rows = closed + ([open_trade] if open_trade else [])
+        BacktestTrade.objects.bulk_create([
+            BacktestTrade(job=run, seq=tracker.closed_trades + i, ticker=ticker,
+                          **{field: trade[field] for field in TRADE_FIELDS[1:]})
+            for i, trade in enumerate(rows)
+        ])
+
+        tracker.closed_trades += len(closed)
+        tracker.winning_trades += sum(1 for t in closed if t['profit'] > 0)
+        tracker.losing_trades += sum(1 for t in closed if t['profit'] < 0)
+        tracker.state = state.to_dict()
+        tracker.save()
+
+        summary = {
+            'total_profit': round(state.total_profit, 2),
+            'total_trades': tracker.closed_trades + (1 if open_trade else 0),
+            'winning_trades': tracker.winning_trades + (1 if open_trade and open_trade['profit'] > 0 else 0),
+            'losing_trades': tracker.losing_trades + (1 if open_trade and open_trade['profit'] < 0 else 0),
+        }
+        run.rows_processed = state.rows
+        run.trades_found = summary['total_trades']
+        run.total_profit = summary['total_profit']
+        run.result = {'summary': summary, 'per_ticker': None, 'equity_curve': None}
+        run.finished_at = timezone.now()
+        run.save()
+    return tracker, len(close), closed, open_trade
@@ -0,0 +1,92 @@
+import threading
+import numpy as np
+import pandas as pd
+from .engine import cumulative_sum, moving_average
+
+# Indicator name -> function(cache, *params) returning an array aligned with close
+INDICATORS = {}
+
+
+def indicator(name):
+    def decorator(func):
+        INDICATORS[name] = func
+        return func
+    return decorator
+
+
+class IndicatorCache:
+    """Indicators of one price series, each computed once per (name, params).
+
+    Strategies ask the cache instead of computing indicators themselves, so a
+    200-period SMA or 14-period RSI shared by several strategies is computed
+    a single time.
+    """
+
+    def __init__(self, close):
+        self.close = np.asarray(close, dtype=np.float64)
+        self._values = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, name, *params):
+        key = (name, *params)
+        with self._lock:
+            if key in self._values:
+                self.hits += 1
+                return self._values[key]
+            self.misses += 1
+        if name not in INDICATORS:
+            raise ValueError(f"Unknown indicator: {name}")
+        value = INDICATORS[name](self, *params)
+        with self._lock:
+            return self._values.setdefault(key, value)
+
+    def stats(self):
+        return {'computed': self.misses, 'reused': self.hits}
+
+
+@indicator('csum')
+def _csum(cache):
+    return cumulative_sum(cache.close)
+
+
+@indicator('sma')
+def _sma(cache, window):
+    return moving_average(cache.close, window, cache.get('csum'))
+
+
+@indicator('ema')
+def _ema(cache, span):
+    ema = pd.Series(cache.close).ewm(span=span, adjust=False).mean().to_numpy(copy=True)
+    ema[:span - 1] = np.nan
+    return ema
+
+
+@indicator('std')
+def _std(cache, window):
+    return pd.Series(cache.close).rolling(window).std(ddof=0).to_numpy()
+
+
+@indicator('rsi')
+def _rsi(cache, period):
+    """Wilder's relative strength index."""
+    change = np.diff(cache.close, prepend=np.nan)
+    gains = pd.Series(np.clip(change, 0, None))
+    losses = pd.Series(np.clip(-change, 0, None))
+    avg_gain = gains.ewm(alpha=1 / period, adjust=False, min_periods=period).mean()
+    avg_loss = losses.ewm(alpha=1 / period, adjust=False, min_periods=period).mean()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - 100 / (1 + avg_gain.to_numpy() / avg_loss.to_numpy())
+    rsi[(avg_loss.to_numpy() == 0) & ~np.isnan(avg_gain.to_numpy())] = 100.0
+    return rsi
+
+
+@indicator('rolling_max')
+def _rolling_max(cache, window):
+    return pd.Series(cache.close).rolling(window).max().to_numpy()
+
+
+@indicator('rolling_min')
+def _rolling_min(cache, window):
+    return pd.Series(cache.close).rolling(window).min().to_numpy()
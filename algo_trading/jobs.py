@@ -0,0 +1,189 @@
+import os
+import socket
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections
+from django.utils import timezone
+from .models import BacktestJob
+from .engine import run_crossover, summarize, load_prices
+from .portfolio import run_portfolio
+from .streaming import CrossoverState, iter_csv_blocks, UnsortedInputError, STREAM_CHUNK_SIZE
+from .results import store_result
+from .cache import result_cache, summary_entry
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_slots = None
+_lock = threading.Lock()
+
+# Jobs run on an in-process thread pool, so only this process can finish the ones it queued
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+class QueueFull(Exception):
+    """Raised when too many backtest jobs are already waiting or running."""
+
+
+def _get_executor():
+    global _executor, _slots
+    with _lock:
+        _recover_once()
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.BACKTEST_MAX_CONCURRENT_JOBS,
+                thread_name_prefix='backtest',
+            )
+            _slots = threading.BoundedSemaphore(
+                settings.BACKTEST_MAX_CONCURRENT_JOBS + settings.BACKTEST_MAX_QUEUED_JOBS
+            )
+        return _executor, _slots
+
+
+def submit_job(job, cache_key=None):
+    """Queue a saved job on the worker pool.
+
+    At most ``BACKTEST_MAX_CONCURRENT_JOBS`` run at once and at most
+    ``BACKTEST_MAX_QUEUED_JOBS`` more wait; beyond that ``QueueFull`` is raised.
+    A successful result is stored in the result cache under ``cache_key``.
+    """
+    executor, slots = _get_executor()
+    if not slots.acquire(blocking=False):
+        raise QueueFull("Too many backtests in progress, please retry shortly")
+    job.worker = WORKER_ID
+    job.save(update_fields=['worker'])
+    future = executor.submit(run_job, job.pk, cache_key)
+    future.add_done_callback(lambda _: slots.release())
+    return future
+
+
+def _process_gone(worker):
+    """Whether the process that queued a job has exited; other hosts' processes count as alive."""
+    if worker == WORKER_ID:
+        # Before we queue anything, our own id means an earlier process with a reused pid
+        return True
+    host, _, pid = worker.rpartition(':')
+    if host != socket.gethostname():
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except (ProcessLookupError, ValueError):
+        return True
+    except PermissionError:
+        pass
+    return False
+
+
+def fail_orphaned_jobs():
+    """Mark PENDING/RUNNING jobs whose process has exited as FAILED.
+
+    Call before this process queues anything. Jobs from before the worker
+    column and jobs of dead processes on this host are failed. Jobs owned by
+    another host are left alone, since their process cannot be checked from here.
+    """
+    unfinished = BacktestJob.objects.filter(status__in=['PENDING', 'RUNNING'])
+    orphaned = [job.pk for job in unfinished.only('pk', 'worker') if not job.worker or _process_gone(job.worker)]
+    if orphaned:
+        BacktestJob.objects.filter(pk__in=orphaned, status__in=['PENDING', 'RUNNING']).update(
+            status='FAILED', error='Interrupted: the server restarted before the job finished',
+            finished_at=timezone.now(),
+        )
+        logger.warning(f"Marked {len(orphaned)} interrupted backtest jobs as failed")
+    return len(orphaned)
+
+
+_recovered = False
+
+
+def _recover_once():
+    # Called with _lock held, so nothing is queued here until the check is done
+    global _recovered
+    if _recovered:
+        return
+    _recovered = True
+    try:
+        fail_orphaned_jobs()
+    except DatabaseError as e:
+        logger.error(f"Could not check for interrupted backtest jobs: {str(e)}")
+
+
+def fail_orphaned_jobs_once(**kwargs):
+    """``request_started`` receiver: recover on the first request of the process."""
+    with _lock:
+        _recover_once()
+
+
+def _progress(job, rows, trades):
+    BacktestJob.objects.filter(pk=job.pk).update(rows_processed=rows, trades_found=trades)
+
+
+def _run_streaming(job):
+    """Stream a sorted single-ticker file, reporting progress after each block."""
+    state = CrossoverState(job.short_window, job.long_window)
+    trades = []
+    with job.csv_file.open('rb') as f:
+        for dates, close in iter_csv_blocks(f.chunks(STREAM_CHUNK_SIZE)):
+            trades.extend(state.update(dates, close))
+            _progress(job, state.rows, len(trades))
+    open_trade = state.open_trade()
+    if open_trade:
+        trades.append(open_trade)
+    return state.rows, {'trades': trades, 'total_profit': round(state.total_profit, 2)}
+
+
+def _run_in_memory(job):
+    with job.csv_file.open('rb') as f:
+        df = load_prices(f)
+    _progress(job, len(df), 0)
+    if 'Ticker' in df.columns:
+        result = run_portfolio(df, job.short_window, job.long_window)
+    else:
+        result = run_crossover(df['Date'].values, df['Close'].values, job.short_window, job.long_window)
+    return len(df), result
+
+
+def run_job(job_id, cache_key=None):
+    """Run one backtest job on a worker thread and store its result."""
+    close_old_connections()
+    job = BacktestJob.objects.get(pk=job_id)
+    job.status = 'RUNNING'
+    job.started_at = timezone.now()
+    job.save(update_fields=['status', 'started_at'])
+
+    # Progress counters are written by _progress; a failure must not overwrite them
+    fields = ['status', 'error', 'finished_at', 'csv_file']
+    try:
+        with job.csv_file.open('rb') as f:
+            header = f.readline().decode('utf-8-sig')
+        if 'Ticker' in [name.strip() for name in header.split(',')]:
+            rows, result = _run_in_memory(job)
+        else:
+            try:
+                rows, result = _run_streaming(job)
+            except UnsortedInputError:
+                rows, result = _run_in_memory(job)
+
+        result = {
+            'trades': result['trades'],
+            'summary': result.get('summary') or summarize(result['trades'], result['total_profit']),
+            'per_ticker': result.get('per_ticker'),
+            'equity_curve': result.get('equity_curve'),
+            'run_id': job.pk,
+        }
+        job.rows_processed = rows
+        store_result(result, job.short_window, job.long_window, job=job)
+        if cache_key:
+            result_cache.put(cache_key, summary_entry(result))
+        fields.append('rows_processed')
+    except Exception as e:
+        logger.error(f"Backtest job {job_id} failed: {str(e)}", exc_info=True)
+        job.error = str(e)
+        job.status = 'FAILED'
+    finally:
+        job.finished_at = timezone.now()
+        # The upload is no longer needed once the result is stored
+        job.csv_file.delete(save=False)
+        job.save(update_fields=fields)
+        close_old_connections()
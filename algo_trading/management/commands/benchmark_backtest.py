@@ -0,0 +1,37 @@
+import time
+import numpy as np
+from django.core.management.base import BaseCommand
+from algo_trading.engine import run_crossover
+
+
+def synthetic_bars(rows, seed=42):
+    """Generate a random-walk minute bar series starting at 100."""
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0, 0.001, rows)
+    close = 100 * np.exp(np.cumsum(returns))
+    dates = np.datetime64('2015-01-01T09:15') + np.arange(rows).astype('timedelta64[m]')
+    return dates, close
+
+
+class Command(BaseCommand):
+    help = "Benchmark the vectorized crossover engine on synthetic bars"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 10_000_000],
+                            help="Number of synthetic bars per run")
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per size (best time is reported)")
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'rows':>12} {'trades':>8} {'best (s)':>10} {'rows/sec':>14}")
+        for rows in options["rows"]:
+            dates, close = synthetic_bars(rows)
+            timings = []
+            for _ in range(options["repeat"]):
+                start = time.perf_counter()
+                result = run_crossover(dates, close)
+                timings.append(time.perf_counter() - start)
+
+            best = min(timings)
+            self.stdout.write(
+                f"{rows:>12,} {len(result['trades']):>8,} {best:>10.3f} {rows / best:>14,.0f}"
+            )
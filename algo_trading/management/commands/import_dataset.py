@@ -0,0 +1,43 @@
+import os
+from django.core.management.base import BaseCommand, CommandError
+from algo_trading.datasets import save_dataset
+from algo_trading.engine import load_prices
+from tradingSim_app.providers import YFinanceProvider
+
+
+class Command(BaseCommand):
+    help = "Store OHLCV data as a memory-mapped dataset, from a CSV file or Yahoo Finance"
+
+    def add_arguments(self, parser):
+        parser.add_argument("csv_path", nargs="?", help="CSV with Date,Open,High,Low,Close,Volume (and optional Ticker)")
+        parser.add_argument("--name", help="Dataset name (defaults to the file name or ticker)")
+        parser.add_argument("--ticker", help="Ticker to record for a single-series CSV, or to download with --yahoo")
+        parser.add_argument("--yahoo", action="store_true", help="Download --ticker from Yahoo Finance instead of reading a CSV")
+        parser.add_argument("--period", default="2y", help="History to download with --yahoo")
+
+    def handle(self, *args, **options):
+        if options["yahoo"]:
+            if not options["ticker"]:
+                raise CommandError("--yahoo needs --ticker")
+            df = self.download(options["ticker"], options["period"])
+            name = options["name"] or options["ticker"]
+        elif options["csv_path"]:
+            try:
+                df = load_prices(options["csv_path"])
+            except (OSError, ValueError) as e:
+                raise CommandError(str(e))
+            name = options["name"] or os.path.splitext(os.path.basename(options["csv_path"]))[0]
+        else:
+            raise CommandError("Give a CSV path or --yahoo --ticker <symbol>")
+
+        dataset = save_dataset(df, name, ticker=options["ticker"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Stored dataset {dataset.pk}: {dataset.rows} rows, {len(dataset.ticker_index)} tickers"
+        ))
+
+    def download(self, ticker, period):
+        """Fetch daily bars from Yahoo Finance, as stock_price_genrator.py does."""
+        try:
+            return YFinanceProvider().history(ticker, period)
+        except ValueError as e:
+            raise CommandError(str(e))
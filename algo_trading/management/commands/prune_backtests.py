@@ -0,0 +1,23 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from algo_trading.models import BacktestJob
+
+
+class Command(BaseCommand):
+    help = "Delete stored backtest runs, and their trades, older than a number of days (incremental runs are kept)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=14, help="Keep runs created within this many days")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["days"])
+        old = (
+            BacktestJob.objects.filter(created_at__lt=cutoff, incremental__isnull=True)
+            .exclude(status__in=['PENDING', 'RUNNING'])
+        )
+        deleted, by_model = old.delete()
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {by_model.get('algo_trading.BacktestJob', 0)} runs "
+            f"and {by_model.get('algo_trading.BacktestTrade', 0)} trades"
+        ))
@@ -0,0 +1,33 @@
+# Generated by Django 5.0.1 on 2026-10-18 09:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BacktestJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('DONE', 'Done'), ('FAILED', 'Failed')], default='PENDING', max_length=7)),
+                ('csv_file', models.FileField(blank=True, upload_to='backtests/')),
+                ('file_name', models.CharField(blank=True, max_length=255)),
+                ('short_window', models.PositiveIntegerField(default=50)),
+                ('long_window', models.PositiveIntegerField(default=200)),
+                ('rows_processed', models.BigIntegerField(default=0)),
+                ('trades_found', models.IntegerField(default=0)),
+                ('total_profit', models.FloatField(blank=True, null=True)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.0.1 on 2026-10-18 09:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('algo_trading', '0002_dataset'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BacktestTrade',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('seq', models.PositiveIntegerField()),
+                ('ticker', models.CharField(blank=True, max_length=20)),
+                ('buy_date', models.CharField(max_length=20)),
+                ('buy_price', models.FloatField()),
+                ('sell_date', models.CharField(max_length=20)),
+                ('sell_price', models.FloatField()),
+                ('profit', models.FloatField()),
+                ('profit_percentage', models.FloatField()),
+                ('ma_50', models.FloatField(blank=True, null=True)),
+                ('ma_200', models.FloatField(blank=True, null=True)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trades', to='algo_trading.backtestjob')),
+            ],
+            options={
+                'ordering': ['job', 'seq'],
+                'unique_together': {('job', 'seq')},
+            },
+        ),
+    ]
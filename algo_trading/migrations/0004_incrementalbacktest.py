@@ -0,0 +1,32 @@
+# Generated by Django 5.0.1 on 2026-10-18 09:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('algo_trading', '0003_backtesttrade'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IncrementalBacktest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ticker', models.CharField(max_length=20)),
+                ('short_window', models.PositiveIntegerField(default=50)),
+                ('long_window', models.PositiveIntegerField(default=200)),
+                ('state', models.JSONField(default=dict)),
+                ('closed_trades', models.IntegerField(default=0)),
+                ('winning_trades', models.IntegerField(default=0)),
+                ('losing_trades', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('run', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='incremental', to='algo_trading.backtestjob')),
+            ],
+            options={
+                'unique_together': {('ticker', 'short_window', 'long_window')},
+            },
+        ),
+    ]
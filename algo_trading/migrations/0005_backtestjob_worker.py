@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-18 10:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('algo_trading', '0004_incrementalbacktest'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='backtestjob',
+            name='worker',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+    ]
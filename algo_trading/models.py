@@ -1,3 +1,84 @@
 from django.db import models
 
-# Create your models here.
+
+class BacktestJob(models.Model):
+    STATUS_CHOICES = (
+        ('PENDING', 'Pending'),
+        ('RUNNING', 'Running'),
+        ('DONE', 'Done'),
+        ('FAILED', 'Failed'),
+    )
+
+    status = models.CharField(max_length=7, choices=STATUS_CHOICES, default='PENDING')
+    csv_file = models.FileField(upload_to='backtests/', blank=True)
+    file_name = models.CharField(max_length=255, blank=True)
+    short_window = models.PositiveIntegerField(default=50)
+    long_window = models.PositiveIntegerField(default=200)
+    rows_processed = models.BigIntegerField(default=0)
+    trades_found = models.IntegerField(default=0)
+    total_profit = models.FloatField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    # "host:pid" of the process whose in-memory queue holds the job
+    worker = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Backtest {self.pk} ({self.status}) {self.file_name}"
+
+
+class Dataset(models.Model):
+    name = models.CharField(max_length=255)
+    rows = models.BigIntegerField(default=0)
+    # Ticker -> [first row, end row) within the ticker-sorted column arrays
+    ticker_index = models.JSONField(default=dict)
+    start_date = models.DateTimeField(null=True, blank=True)
+    end_date = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.rows} rows, {len(self.ticker_index)} tickers)"
+
+
+class BacktestTrade(models.Model):
+    job = models.ForeignKey(BacktestJob, on_delete=models.CASCADE, related_name='trades')
+    seq = models.PositiveIntegerField()
+    ticker = models.CharField(max_length=20, blank=True)
+    buy_date = models.CharField(max_length=20)
+    buy_price = models.FloatField()
+    sell_date = models.CharField(max_length=20)
+    sell_price = models.FloatField()
+    profit = models.FloatField()
+    profit_percentage = models.FloatField()
+    ma_50 = models.FloatField(null=True, blank=True)
+    ma_200 = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['job', 'seq']
+        unique_together = ('job', 'seq')
+
+    def __str__(self):
+        return f"{self.ticker} {self.buy_date} -> {self.sell_date}: {self.profit}"
+
+
+class IncrementalBacktest(models.Model):
+    """Saved crossover state of one ticker, advanced as new bars are appended."""
+    ticker = models.CharField(max_length=20)
+    short_window = models.PositiveIntegerField(default=50)
+    long_window = models.PositiveIntegerField(default=200)
+    # Stored run holding this ticker's trades and summary
+    run = models.OneToOneField(BacktestJob, on_delete=models.CASCADE, related_name='incremental')
+    # CrossoverState.to_dict() at the last processed bar
+    state = models.JSONField(default=dict)
+    closed_trades = models.IntegerField(default=0)
+    winning_trades = models.IntegerField(default=0)
+    losing_trades = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('ticker', 'short_window', 'long_window')
+
+    def __str__(self):
+        return f"{self.ticker} {self.short_window}/{self.long_window} ({self.closed_trades} trades)"
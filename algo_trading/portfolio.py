@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+from .engine import trade_records, summarize, SHORT_WINDOW, LONG_WINDOW
+
+
+def group_offsets(tickers):
+    """Row offsets for a ticker column already sorted by ticker.
+
+    Returns ``(names, starts, position)`` where ``starts`` holds the first row
+    of each ticker (plus the total row count at the end) and ``position`` is
+    each row's index within its own ticker.
+    """
+    tickers = np.asarray(tickers)
+    boundaries = np.flatnonzero(tickers[1:] != tickers[:-1]) + 1
+    starts = np.concatenate(([0], boundaries, [len(tickers)]))
+    sizes = np.diff(starts)
+    position = np.arange(len(tickers)) - np.repeat(starts[:-1], sizes)
+    return tickers[starts[:-1]], starts, position
+
+
+def grouped_moving_average(close, starts, position, window):
+    """Per-ticker simple moving average over rows sorted by ticker and date.
+
+    Rows with fewer than ``window`` prices for their ticker are NaN. Prices are
+    offset by each ticker's first close so the shared cumulative sum stays small.
+    """
+    base = np.repeat(close[starts[:-1]], np.diff(starts))
+    csum = np.zeros(len(close) + 1)
+    np.cumsum(close - base, out=csum[1:])
+    ma = np.full(len(close), np.nan)
+    valid = np.flatnonzero(position >= window - 1)
+    ma[valid] = (csum[valid + 1] - csum[valid + 1 - window]) / window + base[valid]
+    return ma
+
+
+def grouped_crossover_rows(signal, position, group, last_row, long_window):
+    """Pair golden/death crosses per ticker in a single pass.
+
+    Returns ``(buy_rows, sell_rows, is_open)``; an open position is sold at
+    its ticker's last row for mark-to-market purposes.
+    """
+    # A cross needs both averages on this row and the previous one
+    change = np.zeros(len(signal), dtype=bool)
+    change[1:] = signal[1:] != signal[:-1]
+    change &= position >= long_window
+    events = np.flatnonzero(change)
+    event_group = group[events]
+    is_entry = signal[events]
+
+    # Transitions alternate per ticker, so only a ticker's first event can be
+    # an unmatched death cross
+    first = np.ones(len(events), dtype=bool)
+    first[1:] = event_group[1:] != event_group[:-1]
+    keep = ~(first & ~is_entry)
+    events, event_group, is_entry = events[keep], event_group[keep], is_entry[keep]
+
+    entry_at = np.flatnonzero(is_entry)
+    next_at = entry_at + 1
+    closed = next_at < len(events)
+    closed[closed] = event_group[next_at[closed]] == event_group[entry_at[closed]]
+
+    buy_rows = events[entry_at]
+    sell_rows = last_row[event_group[entry_at]]
+    sell_rows[closed] = events[next_at[closed]]
+    return buy_rows, sell_rows, ~closed
+
+
+def run_portfolio(df, short_window=SHORT_WINDOW, long_window=LONG_WINDOW):
+    """Run the crossover strategy for every ticker of a long-format frame.
+
+    ``df`` needs ``Ticker``, ``Date`` and ``Close`` columns. All tickers are
+    processed together with grouped array operations. Each trade holds one
+    share; the combined equity curve is the cumulative mark-to-market P&L of
+    all positions by date.
+    """
+    if not 0 < short_window < long_window:
+        raise ValueError("Short window must be positive and smaller than long window")
+    if df.empty:
+        raise ValueError("No price rows to backtest")
+
+    df = df.sort_values(['Ticker', 'Date'], kind='stable')
+    tickers = df['Ticker'].astype(str).to_numpy()
+    dates = df['Date'].to_numpy()
+    close = df['Close'].to_numpy(dtype=np.float64)
+
+    names, starts, position = group_offsets(tickers)
+    group = np.repeat(np.arange(len(names)), np.diff(starts))
+    last_row = starts[1:] - 1
+
+    ma_short = grouped_moving_average(close, starts, position, short_window)
+    ma_long = grouped_moving_average(close, starts, position, long_window)
+    signal = ma_short > ma_long
+
+    buy_rows, sell_rows, is_open = grouped_crossover_rows(signal, position, group, last_row, long_window)
+    closed = ~is_open
+
+    trades = trade_records(dates, close, buy_rows, sell_rows, is_open, indicators={
+        'ma_50': ma_short,
+        'ma_200': ma_long,
+    }, labels={'ticker': tickers[buy_rows].tolist()})
+
+    # Realized profit per ticker, ignoring open positions as run_crossover does
+    realized = np.where(closed, close[sell_rows] - close[buy_rows], 0.0)
+    realized_by_ticker = np.bincount(group[buy_rows], weights=realized, minlength=len(names))
+
+    # Hold one share from each buy row until its sell row
+    delta = np.zeros(len(close) + 1)
+    np.add.at(delta, buy_rows, 1)
+    np.add.at(delta, sell_rows[closed], -1)
+    np.add.at(delta, sell_rows[is_open] + 1, -1)
+    held = np.cumsum(delta[:-1])
+    pnl = np.zeros(len(close))
+    pnl[1:] = held[:-1] * np.diff(close)
+    pnl[position == 0] = 0.0
+    daily = pd.Series(pnl).groupby(dates).sum()
+    equity = daily.cumsum()
+
+    per_ticker = []
+    trades_by_ticker = {}
+    for trade in trades:
+        trades_by_ticker.setdefault(trade['ticker'], []).append(trade)
+    for index, name in enumerate(names.tolist()):
+        ticker_trades = trades_by_ticker.get(name, [])
+        per_ticker.append({
+            'ticker': name,
+            'rows': int(starts[index + 1] - starts[index]),
+            **summarize(ticker_trades, round(float(realized_by_ticker[index]), 2)),
+        })
+
+    total_profit = round(float(realized.sum()), 2)
+    drawdown = equity - equity.cummax()
+    summary = summarize(trades, total_profit)
+    summary.update({
+        'tickers': len(names),
+        'tickers_traded': len(trades_by_ticker),
+        'skipped_tickers': [row['ticker'] for row in per_ticker if row['rows'] < long_window],
+        'unrealized_profit': round(float(equity.iloc[-1] - realized.sum()), 2) if len(equity) else 0.0,
+        'max_drawdown': round(float(drawdown.min()), 2) if len(equity) else 0.0,
+    })
+
+    return {
+        'trades': trades,
+        'trades_by_ticker': trades_by_ticker,
+        'per_ticker': per_ticker,
+        'equity_curve': [
+            {'date': date.strftime('%Y-%m-%d'), 'equity': round(float(value), 2)}
+            for date, value in equity.items()
+        ],
+        'summary': summary,
+        'total_profit': total_profit,
+    }
@@ -0,0 +1,98 @@
+import csv
+from django.db import transaction
+from django.utils import timezone
+from .models import BacktestJob, BacktestTrade
+
+# Trades inserted per INSERT statement
+TRADE_BATCH_SIZE = 1000
+
+# Rows fetched per round trip when streaming a report
+REPORT_CHUNK_SIZE = 2000
+
+TRADE_FIELDS = [
+    'ticker', 'buy_date', 'buy_price', 'sell_date', 'sell_price',
+    'profit', 'profit_percentage', 'ma_50', 'ma_200',
+]
+
+
+def store_result(result, short_window, long_window, file_name='', job=None):
+    """Persist a finished run's trades as rows and its summary on the job.
+
+    Creates a finished ``BacktestJob`` unless one is given. Returns the job,
+    whose id is the run id used for downloads.
+    """
+    trades = result['trades']
+    if job is None:
+        now = timezone.now()
+        job = BacktestJob(
+            file_name=file_name,
+            short_window=short_window,
+            long_window=long_window,
+            started_at=now,
+            finished_at=now,
+        )
+    job.status = 'DONE'
+    job.trades_found = len(trades)
+    job.total_profit = result['summary']['total_profit']
+    job.result = {
+        'summary': result['summary'],
+        'per_ticker': result.get('per_ticker'),
+        'equity_curve': result.get('equity_curve'),
+    }
+    # Readers never see a finished job with only part of its trades: a new
+    # job commits with them, and an existing one is marked done after them
+    with transaction.atomic():
+        created = job.pk is None
+        if created:
+            job.save()
+        BacktestTrade.objects.bulk_create(
+            (
+                BacktestTrade(job=job, seq=seq, **{field: trade.get(field) for field in TRADE_FIELDS if field in trade})
+                for seq, trade in enumerate(trades)
+            ),
+            batch_size=TRADE_BATCH_SIZE,
+        )
+        if not created:
+            job.save(update_fields=['status', 'trades_found', 'total_profit', 'result'])
+    return job
+
+
+def load_trades(job):
+    """Trade dicts of a stored run, in their original order."""
+    rows = job.trades.values(*TRADE_FIELDS)
+    portfolio = bool(job.result and job.result.get('per_ticker'))
+    trades = []
+    for row in rows.iterator(chunk_size=REPORT_CHUNK_SIZE):
+        if not portfolio:
+            del row['ticker']
+        trades.append(row)
+    return trades
+
+
+class Echo:
+    """File-like object whose write() returns the value, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def iter_report(job):
+    """CSV lines of a stored run's report, fetched from the database in chunks."""
+    writer = csv.writer(Echo(), lineterminator='\n')
+    summary = (job.result or {}).get('summary') or {}
+    with_ticker = bool(job.result and job.result.get('per_ticker'))
+
+    header = ['Buy Date', 'Buy Price', 'Sell Date', 'Sell Price', 'Profit', 'Profit %',
+              f'{job.short_window} MA', f'{job.long_window} MA']
+    yield writer.writerow((['Ticker'] if with_ticker else []) + header)
+
+    columns = TRADE_FIELDS if with_ticker else TRADE_FIELDS[1:]
+    for row in job.trades.values_list(*columns).iterator(chunk_size=REPORT_CHUNK_SIZE):
+        yield writer.writerow(['' if value is None else value for value in row])
+
+    # Write summary at the end
+    yield "\n"
+    yield writer.writerow(['Total Profit/Loss', summary.get('total_profit', 0)])
+    yield writer.writerow(['Total Trades', summary.get('total_trades', 0)])
+    yield writer.writerow(['Winning Trades', summary.get('winning_trades', 0)])
+    yield writer.writerow(['Losing Trades', summary.get('losing_trades', 0)])
@@ -0,0 +1,211 @@
+import math
+import numpy as np
+import pandas as pd
+from .engine import crossover_indices, build_trades, summarize
+
+# Strategy name -> Strategy subclass
+STRATEGIES = {}
+
+
+def register(cls):
+    STRATEGIES[cls.name] = cls
+    return cls
+
+
+def get_strategy(name, params=None):
+    """Instantiate a registered strategy with parameter overrides."""
+    if name not in STRATEGIES:
+        raise ValueError(f"Unknown strategy: {name}")
+    return STRATEGIES[name](**(params or {}))
+
+
+def hold_signal(entry, exit):
+    """Turn entry/exit conditions into a 0/1 position signal.
+
+    The position opens on a row where ``entry`` holds and stays open until a
+    row where ``exit`` holds; an exit wins when both are true.
+    """
+    state = np.full(len(entry), np.nan)
+    state[entry] = 1.0
+    state[exit] = 0.0
+    return pd.Series(state).ffill().fillna(0).to_numpy(dtype=np.int8)
+
+
+class Strategy:
+    """Long-only strategy driven by a 0/1 position signal.
+
+    Subclasses set ``name``, ``description`` and ``defaults`` and implement
+    ``signal`` and ``warmup``; ``indicators`` names the values recorded with
+    each trade at its sell row.
+    """
+    name = None
+    description = ''
+    defaults = {}
+
+    def __init__(self, **params):
+        unknown = set(params) - set(self.defaults)
+        if unknown:
+            raise ValueError(f"Unknown parameters for {self.name}: {', '.join(sorted(unknown))}")
+        self.params = {**self.defaults, **{k: self.coerce(k, v) for k, v in params.items()}}
+
+    def coerce(self, name, value):
+        """A parameter override as its default's type; integer ones (windows, periods) must be >= 1."""
+        try:
+            if isinstance(value, bool):
+                raise TypeError
+            number = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{name} must be a number")
+        if not math.isfinite(number):
+            raise ValueError(f"{name} must be a finite number")
+        if isinstance(self.defaults[name], int):
+            if not number.is_integer() or number < 1:
+                raise ValueError(f"{name} must be a positive integer")
+            return int(number)
+        return number
+
+    def warmup(self):
+        """Rows needed before the signal is defined."""
+        raise NotImplementedError
+
+    def signal(self, cache):
+        raise NotImplementedError
+
+    def indicators(self, cache):
+        return {}
+
+    def run(self, dates, cache):
+        """Backtest over the series held by ``cache``; same result shape as ``run_crossover``."""
+        close = cache.close
+        start = self.warmup()
+        if len(close) <= start:
+            return {'trades': [], 'total_profit': 0.0, 'rows_evaluated': 0}
+
+        entries, exits, open_entry = crossover_indices(self.signal(cache)[start:])
+        entries = entries + start
+        exits = exits + start
+        if open_entry >= 0:
+            open_entry += start
+
+        trades = build_trades(dates, close, entries, exits, open_entry, self.indicators(cache))
+        total_profit = float(close[exits].sum() - close[entries].sum())
+        return {
+            'trades': trades,
+            'total_profit': round(total_profit, 2),
+            'rows_evaluated': len(close) - start,
+        }
+
+
+@register
+class SmaCrossover(Strategy):
+    name = 'sma_crossover'
+    description = 'Hold while the short simple moving average is above the long one'
+    defaults = {'short_window': 50, 'long_window': 200}
+
+    def __init__(self, **params):
+        super().__init__(**params)
+        if not 0 < self.params['short_window'] < self.params['long_window']:
+            raise ValueError("Short window must be positive and smaller than long window")
+
+    def warmup(self):
+        return self.params['long_window'] - 1
+
+    def signal(self, cache):
+        return cache.get('sma', self.params['short_window']) > cache.get('sma', self.params['long_window'])
+
+    def indicators(self, cache):
+        # Keys kept from the original 50/200 report columns
+        return {
+            'ma_50': cache.get('sma', self.params['short_window']),
+            'ma_200': cache.get('sma', self.params['long_window']),
+        }
+
+
+@register
+class EmaCrossover(SmaCrossover):
+    name = 'ema_crossover'
+    description = 'Hold while the short exponential moving average is above the long one'
+    defaults = {'short_window': 12, 'long_window': 26}
+
+    def signal(self, cache):
+        return cache.get('ema', self.params['short_window']) > cache.get('ema', self.params['long_window'])
+
+    def indicators(self, cache):
+        return {
+            'ma_50': cache.get('ema', self.params['short_window']),
+            'ma_200': cache.get('ema', self.params['long_window']),
+        }
+
+
+@register
+class RsiReversion(Strategy):
+    name = 'rsi'
+    description = 'Buy when RSI drops below the oversold level, sell when it rises above overbought'
+    defaults = {'period': 14, 'oversold': 30.0, 'overbought': 70.0}
+
+    def warmup(self):
+        return self.params['period']
+
+    def signal(self, cache):
+        rsi = cache.get('rsi', self.params['period'])
+        return hold_signal(rsi < self.params['oversold'], rsi > self.params['overbought'])
+
+    def indicators(self, cache):
+        return {'rsi': cache.get('rsi', self.params['period'])}
+
+
+@register
+class BollingerReversion(Strategy):
+    name = 'bollinger'
+    description = 'Buy below the lower Bollinger band, sell once price is back above the middle band'
+    defaults = {'window': 20, 'width': 2.0}
+
+    def warmup(self):
+        return self.params['window'] - 1
+
+    def signal(self, cache):
+        middle = cache.get('sma', self.params['window'])
+        lower = middle - self.params['width'] * cache.get('std', self.params['window'])
+        return hold_signal(cache.close < lower, cache.close > middle)
+
+    def indicators(self, cache):
+        return {'bollinger_middle': cache.get('sma', self.params['window'])}
+
+
+@register
+class Breakout(Strategy):
+    name = 'breakout'
+    description = 'Buy on a close above the prior N-bar high, sell on a close below the prior M-bar low'
+    defaults = {'entry_window': 20, 'exit_window': 10}
+
+    def warmup(self):
+        return max(self.params['entry_window'], self.params['exit_window'])
+
+    def signal(self, cache):
+        close = cache.close
+        prior_high = np.roll(cache.get('rolling_max', self.params['entry_window']), 1)
+        prior_low = np.roll(cache.get('rolling_min', self.params['exit_window']), 1)
+        prior_high[0] = prior_low[0] = np.nan
+        return hold_signal(close > prior_high, close < prior_low)
+
+    def indicators(self, cache):
+        return {'channel_high': cache.get('rolling_max', self.params['entry_window'])}
+
+
+def run_strategies(dates, cache, specs):
+    """Run several strategies over one indicator cache.
+
+    ``specs`` is a list of ``{'name': ..., 'params': {...}}`` dicts. Returns one
+    entry per spec with its parameters, summary and trades.
+    """
+    results = []
+    for spec in specs:
+        strategy = get_strategy(spec['name'], spec.get('params'))
+        result = strategy.run(dates, cache)
+        results.append({
+            'name': strategy.name,
+            'params': strategy.params,
+            'summary': summarize(result['trades'], result['total_profit']),
+            'trades': result['trades'],
+        })
+    return results
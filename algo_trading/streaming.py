@@ -0,0 +1,217 @@
+import io
+import numpy as np
+import pandas as pd
+from .engine import (
+    cumulative_sum, moving_average, pair_crossings, trade_records,
+    REQUIRED_COLUMNS, SHORT_WINDOW, LONG_WINDOW,
+)
+
+# Bytes read from the upload per chunk in streaming mode
+STREAM_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+class UnsortedInputError(ValueError):
+    """Raised when streamed rows are not in date order."""
+
+
+def iter_csv_blocks(chunks):
+    """Parse an iterable of CSV byte chunks into ``(dates, close)`` blocks.
+
+    Only complete lines are parsed; a partial trailing line is carried into
+    the next chunk, so memory stays bounded by the chunk size.
+    """
+    header = None
+    pending = b''
+    for chunk in chunks:
+        data = pending + chunk
+        cut = data.rfind(b'\n') + 1
+        data, pending = data[:cut], data[cut:]
+        if header is None:
+            if not data:
+                continue
+            first_line, data = data.split(b'\n', 1)
+            header = _parse_header(first_line)
+        if data.strip():
+            yield _parse_block(data, header)
+
+    if header is None and pending.strip():
+        first_line, pending = (pending.split(b'\n', 1) + [b''])[:2]
+        header = _parse_header(first_line)
+    if header is None:
+        raise pd.errors.EmptyDataError("No columns to parse from file")
+    if pending.strip():
+        yield _parse_block(pending, header)
+
+
+def _parse_header(line):
+    header = [name.strip() for name in line.decode('utf-8-sig').strip().split(',')]
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in header]
+    if missing_columns:
+        raise ValueError(f"CSV file is missing required columns: {', '.join(missing_columns)}")
+    if 'Ticker' in header:
+        raise ValueError("Streaming mode supports a single ticker; remove the Ticker column")
+    return header
+
+
+def _parse_block(data, header):
+    block = pd.read_csv(io.BytesIO(data), header=None, names=header, usecols=['Date', 'Close'])
+    block.dropna(subset=['Close'], inplace=True)
+    dates = pd.to_datetime(block['Date']).to_numpy()
+    return dates, block['Close'].to_numpy(dtype=np.float64)
+
+
+class CrossoverState:
+    """Crossover strategy state carried from one block of bars to the next.
+
+    Only the last ``long_window - 1`` closes are kept, in a fixed-size buffer,
+    together with the previous signal and any open position, so memory does
+    not grow with the number of rows processed.
+    """
+
+    def __init__(self, short_window=SHORT_WINDOW, long_window=LONG_WINDOW):
+        if not 0 < short_window < long_window:
+            raise ValueError("Short window must be positive and smaller than long window")
+        self.short_window = short_window
+        self.long_window = long_window
+        self.tail = np.empty(0)
+        self.rows = 0
+        self.prev_signal = None
+        self.last_date = None
+        self.last_close = None
+        self.last_ma = None
+        self.position = None
+        self.total_profit = 0.0
+
+    @property
+    def rows_evaluated(self):
+        return max(self.rows - self.long_window + 1, 0)
+
+    def update(self, dates, close):
+        """Process the next block of bars and return the trades it closed."""
+        if not len(close):
+            return []
+        if np.any(dates[1:] < dates[:-1]) or (self.last_date is not None and dates[0] < self.last_date):
+            raise UnsortedInputError("Streaming mode needs rows sorted by date")
+
+        # Prepend the buffered tail so the first rows see a full window
+        offset = len(self.tail)
+        ext_close = np.concatenate((self.tail, close))
+        ext_dates = np.concatenate((np.full(offset, dates[0]), dates))
+        csum = cumulative_sum(ext_close)
+        ma_short = moving_average(ext_close, self.short_window, csum)
+        ma_long = moving_average(ext_close, self.long_window, csum)
+
+        start = max(offset, self.long_window - 1 - (self.rows - offset))
+        trades = []
+        if start < len(ext_close):
+            signal = (ma_short[start:] > ma_long[start:]).astype(np.int8)
+            if self.prev_signal is not None:
+                signal = np.concatenate(([self.prev_signal], signal))
+                start -= 1
+            trades = self._pair(ext_dates, ext_close, ma_short, ma_long, signal, start)
+            self.prev_signal = int(signal[-1])
+            self.last_ma = (float(ma_short[-1]), float(ma_long[-1]))
+
+        self.rows += len(close)
+        self.tail = ext_close[-(self.long_window - 1):].copy()
+        self.last_date = dates[-1]
+        self.last_close = float(close[-1])
+        return trades
+
+    def _pair(self, dates, close, ma_short, ma_long, signal, start):
+        change = np.diff(signal)
+        entries = np.flatnonzero(change == 1) + 1 + start
+        exits = np.flatnonzero(change == -1) + 1 + start
+        trades = []
+
+        # A position carried in from an earlier block closes at the first exit
+        if self.position is not None and len(exits) and (not len(entries) or exits[0] < entries[0]):
+            row = exits[0]
+            buy_date, buy_price = self.position
+            trades.append(_trade(buy_date, buy_price, pd.Timestamp(dates[row]).strftime('%Y-%m-%d'),
+                                 close[row], ma_short[row], ma_long[row]))
+            self.total_profit += float(close[row] - buy_price)
+            self.position = None
+            exits = exits[1:]
+
+        entries, exits, open_entry = pair_crossings(entries, exits)
+        if len(exits):
+            trades.extend(trade_records(dates, close, entries, exits, indicators={
+                'ma_50': ma_short,
+                'ma_200': ma_long,
+            }))
+            self.total_profit += float(close[exits].sum() - close[entries].sum())
+        if open_entry >= 0:
+            self.position = (pd.Timestamp(dates[open_entry]).strftime('%Y-%m-%d'), float(close[open_entry]))
+        return trades
+
+    def to_dict(self):
+        """JSON-serializable snapshot, restored with ``from_dict``."""
+        return {
+            'short_window': self.short_window,
+            'long_window': self.long_window,
+            'tail': self.tail.tolist(),
+            'rows': self.rows,
+            'prev_signal': self.prev_signal,
+            'last_date': None if self.last_date is None else str(self.last_date),
+            'last_close': self.last_close,
+            'last_ma': None if self.last_ma is None else list(self.last_ma),
+            'position': None if self.position is None else list(self.position),
+            'total_profit': self.total_profit,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        state = cls(data['short_window'], data['long_window'])
+        state.tail = np.array(data['tail'], dtype=np.float64)
+        state.rows = data['rows']
+        state.prev_signal = data['prev_signal']
+        state.last_date = None if data['last_date'] is None else np.datetime64(data['last_date'])
+        state.last_close = data['last_close']
+        state.last_ma = None if data['last_ma'] is None else tuple(data['last_ma'])
+        state.position = None if data['position'] is None else tuple(data['position'])
+        state.total_profit = data['total_profit']
+        return state
+
+    def open_trade(self):
+        """The open position marked to the last close, or None."""
+        if self.position is None:
+            return None
+        buy_date, buy_price = self.position
+        return _trade(buy_date, buy_price, 'Open Position', self.last_close, *self.last_ma)
+
+
+def _trade(buy_date, buy_price, sell_date, sell_price, ma_short, ma_long):
+    """A single trade dict, rounded the same way as ``engine.trade_records``."""
+    profit = sell_price - buy_price
+    return {
+        'buy_date': buy_date,
+        'buy_price': float(np.round(buy_price, 2)),
+        'sell_date': sell_date,
+        'sell_price': float(np.round(sell_price, 2)),
+        'profit': float(np.round(profit, 2)),
+        'profit_percentage': float(np.round(profit / buy_price * 100, 2)),
+        'ma_50': float(np.round(ma_short, 2)),
+        'ma_200': float(np.round(ma_long, 2)),
+    }
+
+
+def run_stream(chunks, short_window=SHORT_WINDOW, long_window=LONG_WINDOW):
+    """Run the crossover strategy over CSV byte chunks in bounded memory.
+
+    The input must already be sorted by date. Returns the same dict as
+    ``engine.run_crossover`` plus the number of rows read.
+    """
+    state = CrossoverState(short_window, long_window)
+    trades = []
+    for dates, close in iter_csv_blocks(chunks):
+        trades.extend(state.update(dates, close))
+    open_trade = state.open_trade()
+    if open_trade:
+        trades.append(open_trade)
+    return {
+        'trades': trades,
+        'total_profit': round(state.total_profit, 2),
+        'rows_evaluated': state.rows_evaluated,
+        'rows': state.rows,
+    }
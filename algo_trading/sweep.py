@@ -0,0 +1,106 @@
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+from .engine import cumulative_sum, moving_average, crossover_stats
+
+# Window pairs handed to a worker per task
+PAIRS_PER_TASK = 256
+
+# Below this many pairs the pool start-up costs more than it saves
+MIN_PARALLEL_PAIRS = 64
+
+# One pool for the whole process, started lazily. Workers are spawned rather
+# than forked: the web process also runs backtest job threads.
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool(processes):
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+
+def _evaluate_rows(close, averages, pairs):
+    results = []
+    for short_window, long_window in pairs:
+        stats = crossover_stats(close, averages[short_window], averages[long_window], long_window - 1)
+        results.append({'short_window': short_window, 'long_window': long_window, **stats})
+    return results
+
+
+def _evaluate(block, rows, windows, pairs):
+    """Worker task: read close and the averages from the request's shared memory block."""
+    shm = SharedMemory(name=block)
+    try:
+        data = np.ndarray((len(windows) + 1, rows), dtype=np.float64, buffer=shm.buf)
+        averages = {window: data[i + 1] for i, window in enumerate(windows)}
+        results = _evaluate_rows(data[0], averages, pairs)
+        # Views of the block must be gone before it is closed
+        del data, averages
+        return results
+    finally:
+        shm.close()
+
+
+def window_pairs(short_windows, long_windows, rows):
+    """All (short, long) pairs with short < long and enough rows for the long MA."""
+    return [
+        (short_window, long_window)
+        for short_window in short_windows
+        for long_window in long_windows
+        if 0 < short_window < long_window <= rows
+    ]
+
+
+def sweep_windows(close, short_windows, long_windows, processes=None, max_pairs=None, max_windows=None):
+    """Grid-search crossover windows and rank the pairs by total profit.
+
+    Every distinct window's moving average is computed once, from one shared
+    cumulative sum, and written with the closes to a shared memory block that
+    the pool's workers read without copying. Raises ``ValueError`` when the
+    grid has more than ``max_pairs`` pairs or ``max_windows`` distinct
+    windows, since each window holds a full-length average in memory.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    pairs = window_pairs(short_windows, long_windows, len(close))
+    if not pairs:
+        return []
+    windows = sorted({w for pair in pairs for w in pair})
+    if max_pairs is not None and len(pairs) > max_pairs:
+        raise ValueError(f"The sweep has {len(pairs)} window pairs; at most {max_pairs} are allowed")
+    if max_windows is not None and len(windows) > max_windows:
+        raise ValueError(f"The sweep has {len(windows)} distinct windows; at most {max_windows} are allowed")
+
+    processes = processes or os.cpu_count() or 1
+    csum = cumulative_sum(close)
+    if processes == 1 or len(pairs) < MIN_PARALLEL_PAIRS:
+        averages = {w: moving_average(close, w, csum) for w in windows}
+        results = _evaluate_rows(close, averages, pairs)
+    else:
+        shm = SharedMemory(create=True, size=(len(windows) + 1) * len(close) * 8)
+        futures = []
+        try:
+            data = np.ndarray((len(windows) + 1, len(close)), dtype=np.float64, buffer=shm.buf)
+            data[0] = close
+            for i, window in enumerate(windows):
+                data[i + 1] = moving_average(close, window, csum)
+            del data
+            tasks = [pairs[i:i + PAIRS_PER_TASK] for i in range(0, len(pairs), PAIRS_PER_TASK)]
+            futures = [_get_pool(processes).submit(_evaluate, shm.name, len(close), windows, task) for task in tasks]
+            results = [row for future in futures for row in future.result()]
+        finally:
+            # No worker may still be reading the block when it is unlinked
+            for future in futures:
+                future.cancel()
+            wait(futures)
+            shm.close()
+            shm.unlink()
+
+    results.sort(key=lambda r: (r['total_profit'], r['win_rate']), reverse=True)
+    return results
@@ -1,3 +1,547 @@
-from django.test import TestCase
+import io
+import os
+import json
+import time
+import socket
+import tempfile
+import subprocess
+from datetime import timedelta
+from unittest import mock
+import numpy as np
+import pandas as pd
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
 
-# Create your tests here.
+from .engine import moving_average, crossover_indices, crossover_stats, run_crossover, summarize
+from .sweep import sweep_windows
+from .portfolio import run_portfolio
+from .streaming import CrossoverState, UnsortedInputError, run_stream
+from .models import BacktestJob, BacktestTrade, Dataset, IncrementalBacktest
+from .jobs import run_job, fail_orphaned_jobs
+from .results import store_result, load_trades
+from .incremental import append_bars
+from .cache import ResultCache, result_cache
+from .datasets import save_dataset, load_slice
+from .indicators import IndicatorCache
+from .strategies import STRATEGIES, get_strategy, run_strategies
+
+
+def random_walk(rows, seed=0, start='2020-01-01'):
+    """Dates and closes of a reproducible random-walk price series."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, rows)))
+    return pd.date_range(start, periods=rows, freq='D').values, close
+
+
+def price_csv(rows, seed=0, name='prices.csv'):
+    """An uploaded OHLCV CSV of a random walk."""
+    dates, close = random_walk(rows, seed)
+    df = pd.DataFrame({'Date': pd.DatetimeIndex(dates).strftime('%Y-%m-%d'), 'Open': close,
+                       'High': close, 'Low': close, 'Close': close, 'Volume': 1000})
+    return SimpleUploadedFile(name, df.to_csv(index=False).encode(), content_type='text/csv')
+
+
+class TempMedia:
+    """Gives every test its own empty MEDIA_ROOT (uploads, datasets)."""
+
+    def setUp(self):
+        super().setUp()
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.media = media.name
+        override = self.settings(MEDIA_ROOT=media.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+
+def loop_crossover(dates, close, short_window, long_window):
+    """The original row-by-row crossover loop, kept as the reference result."""
+    df = pd.DataFrame({'Date': dates, 'Close': close})
+    df['short'] = df['Close'].rolling(short_window).mean()
+    df['long'] = df['Close'].rolling(long_window).mean()
+    df = df.dropna().reset_index(drop=True)
+    df['Signal'] = (df['short'] > df['long']).astype(int)
+    df['Crossover'] = df['Signal'].diff()
+
+    trades, buy = [], None
+    for i in range(len(df)):
+        if df['Crossover'].iloc[i] == 1:
+            buy = i
+        elif df['Crossover'].iloc[i] == -1 and buy is not None:
+            trades.append((buy, i))
+            buy = None
+    closed = [
+        (df['Date'].iloc[b].strftime('%Y-%m-%d'), df['Date'].iloc[s].strftime('%Y-%m-%d'),
+         round(df['Close'].iloc[s] - df['Close'].iloc[b], 2))
+        for b, s in trades
+    ]
+    profit = round(sum(df['Close'].iloc[s] - df['Close'].iloc[b] for b, s in trades), 2)
+    return closed, buy is not None, profit
+
+
+class EngineTests(SimpleTestCase):
+    def test_moving_average_matches_pandas_rolling(self):
+        _, close = random_walk(500)
+        for window in (1, 5, 50, 500):
+            expected = pd.Series(close).rolling(window).mean().to_numpy()
+            np.testing.assert_allclose(moving_average(close, window), expected, equal_nan=True)
+
+    def test_crossover_indices_pairs_entries_with_later_exits(self):
+        entries, exits, open_entry = crossover_indices([1, 0, 1, 1, 0, 1])
+        self.assertEqual(list(entries), [2])
+        self.assertEqual(list(exits), [4])
+        self.assertEqual(open_entry, 5)
+
+    def test_matches_the_row_loop(self):
+        for seed in range(5):
+            dates, close = random_walk(1500, seed)
+            result = run_crossover(dates, close, 20, 60)
+            closed, still_open, profit = loop_crossover(dates, close, 20, 60)
+            trades = [t for t in result['trades'] if t['sell_date'] != 'Open Position']
+            self.assertEqual([(t['buy_date'], t['sell_date'], t['profit']) for t in trades], closed)
+            self.assertEqual(len(result['trades']) - len(trades), int(still_open))
+            self.assertAlmostEqual(result['total_profit'], profit, places=2)
+
+    def test_short_series_has_no_trades(self):
+        dates, close = random_walk(10)
+        self.assertEqual(run_crossover(dates, close, 5, 20)['trades'], [])
+
+    def test_rejects_windows_out_of_order(self):
+        dates, close = random_walk(100)
+        with self.assertRaises(ValueError):
+            run_crossover(dates, close, 20, 20)
+
+    def test_summarize_counts_wins_and_losses(self):
+        trades = [{'profit': 2.5}, {'profit': -1.0}, {'profit': 0.0}]
+        self.assertEqual(summarize(trades), {
+            'total_profit': 1.5, 'total_trades': 3, 'winning_trades': 1, 'losing_trades': 1,
+        })
+
+
+class SweepTests(SimpleTestCase):
+    def test_serial_results_match_single_runs(self):
+        _, close = random_walk(400)
+        results = sweep_windows(close, range(5, 30, 5), range(20, 80, 10), processes=1)
+        self.assertEqual(len(results), sum(1 for s in range(5, 30, 5) for l in range(20, 80, 10) if s < l))
+        for row in results[:5]:
+            expected = crossover_stats(close, moving_average(close, row['short_window']),
+                                       moving_average(close, row['long_window']), row['long_window'] - 1)
+            self.assertEqual({k: row[k] for k in expected}, expected)
+        profits = [row['total_profit'] for row in results]
+        self.assertEqual(profits, sorted(profits, reverse=True))
+
+    def test_parallel_results_match_serial(self):
+        _, close = random_walk(300, seed=1)
+        args = (close, range(2, 40, 2), range(10, 120, 5))
+        self.assertEqual(sweep_windows(*args, processes=2), sweep_windows(*args, processes=1))
+
+    def test_caps_grid_size(self):
+        _, close = random_walk(300)
+        with self.assertRaises(ValueError):
+            sweep_windows(close, range(1, 50), range(50, 100), max_pairs=100)
+        with self.assertRaises(ValueError):
+            sweep_windows(close, range(1, 50), range(50, 100), max_windows=20)
+
+
+class SweepViewTests(TestCase):
+    @override_settings(BACKTEST_SWEEP_MAX_WINDOWS=10)
+    def test_endpoint_rejects_oversized_grid(self):
+        response = self.client.post('/algo_trading/sweep/', {
+            'csv_file': price_csv(300), 'short_min': 1, 'short_max': 50, 'short_step': 1,
+        })
+        self.assertEqual(response.status_code, 400)
+
+    def test_endpoint_ranks_pairs(self):
+        response = self.client.post('/algo_trading/sweep/', {
+            'csv_file': price_csv(300), 'short_max': 20, 'long_max': 80, 'top': 3,
+        })
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['rows'], 300)
+        self.assertEqual(len(data['results']), 3)
+
+
+class PortfolioTests(SimpleTestCase):
+    def frame(self):
+        frames = []
+        for seed, (ticker, rows) in enumerate([('AAA', 600), ('BBB', 450), ('CCC', 30)]):
+            dates, close = random_walk(rows, seed)
+            frames.append(pd.DataFrame({'Ticker': ticker, 'Date': dates, 'Close': close}))
+        # Interleave the tickers' rows, as a long-format upload may
+        return pd.concat(frames).sample(frac=1, random_state=0)
+
+    def test_each_ticker_matches_a_single_series_run(self):
+        df = self.frame()
+        result = run_portfolio(df, 20, 60)
+        for ticker in ('AAA', 'BBB'):
+            rows = df[df['Ticker'] == ticker].sort_values('Date')
+            single = run_crossover(rows['Date'].values, rows['Close'].values, 20, 60)
+            trades = [{k: v for k, v in t.items() if k != 'ticker'} for t in result['trades'] if t['ticker'] == ticker]
+            self.assertEqual(trades, single['trades'])
+            row = next(r for r in result['per_ticker'] if r['ticker'] == ticker)
+            self.assertAlmostEqual(row['total_profit'], single['total_profit'], places=2)
+
+    def test_short_tickers_are_skipped(self):
+        result = run_portfolio(self.frame(), 20, 60)
+        self.assertEqual(result['summary']['tickers'], 3)
+        self.assertEqual(result['summary']['skipped_tickers'], ['CCC'])
+        self.assertFalse(any(t['ticker'] == 'CCC' for t in result['trades']))
+
+
+class StreamingTests(SimpleTestCase):
+    def csv_bytes(self, rows, seed=0):
+        return price_csv(rows, seed).read()
+
+    def test_chunked_stream_matches_in_memory_run(self):
+        data = self.csv_bytes(800)
+        df = pd.read_csv(io.BytesIO(data), parse_dates=['Date'])
+        expected = run_crossover(df['Date'].values, df['Close'].values, 20, 60)
+        for size in (97, 4096, len(data)):
+            chunks = [data[i:i + size] for i in range(0, len(data), size)]
+            result = run_stream(chunks, 20, 60)
+            self.assertEqual(result['trades'], expected['trades'])
+            self.assertAlmostEqual(result['total_profit'], expected['total_profit'], places=2)
+            self.assertEqual(result['rows'], 800)
+
+    def test_saved_state_resumes_where_it_stopped(self):
+        dates, close = random_walk(900, seed=2)
+        whole = CrossoverState(10, 40)
+        expected = whole.update(dates, close)
+
+        state, trades = CrossoverState(10, 40), []
+        for first in range(0, 900, 130):
+            state = CrossoverState.from_dict(state.to_dict())
+            trades.extend(state.update(dates[first:first + 130], close[first:first + 130]))
+        self.assertEqual(trades, expected)
+        self.assertEqual(state.open_trade(), whole.open_trade())
+        self.assertAlmostEqual(state.total_profit, whole.total_profit)
+
+    def test_unsorted_rows_are_rejected(self):
+        dates, close = random_walk(100)
+        with self.assertRaises(UnsortedInputError):
+            CrossoverState(5, 20).update(dates[::-1], close)
+
+
+class JobTests(TempMedia, TransactionTestCase):
+    # run_job closes its connection like any worker thread, so no wrapping transaction
+
+    def queued_job(self, rows=300):
+        job = BacktestJob(file_name='prices.csv', short_window=20, long_window=60)
+        job.csv_file.save('prices.csv', ContentFile(price_csv(rows).read()))
+        return job
+
+    def test_run_job_stores_the_result(self):
+        job = self.queued_job()
+        run_job(job.pk)
+        job.refresh_from_db()
+        dates, close = random_walk(300)
+        expected = run_crossover(dates, close, 20, 60)
+        self.assertEqual(job.status, 'DONE')
+        self.assertEqual(job.rows_processed, 300)
+        self.assertEqual(job.trades_found, len(expected['trades']))
+        self.assertFalse(job.csv_file)
+
+    def test_failed_job_keeps_its_progress(self):
+        job = self.queued_job()
+        with mock.patch('algo_trading.jobs.store_result', side_effect=RuntimeError('disk full')), \
+                self.assertLogs('algo_trading.jobs', 'ERROR'):
+            run_job(job.pk)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'FAILED')
+        self.assertEqual(job.error, 'disk full')
+        self.assertEqual(job.rows_processed, 300)
+
+    def test_jobs_of_exited_processes_are_failed(self):
+        exited = subprocess.Popen(['true'])
+        exited.wait()
+        dead = BacktestJob.objects.create(status='RUNNING', worker=f"{socket.gethostname()}:{exited.pid}")
+        legacy = BacktestJob.objects.create(status='PENDING')
+        remote = BacktestJob.objects.create(status='RUNNING', worker='elsewhere:1')
+        done = BacktestJob.objects.create(status='DONE', worker=f"{socket.gethostname()}:{exited.pid}")
+
+        with self.assertLogs('algo_trading.jobs', 'WARNING'):
+            self.assertEqual(fail_orphaned_jobs(), 2)
+        statuses = dict(BacktestJob.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses[dead.pk], 'FAILED')
+        self.assertEqual(statuses[legacy.pk], 'FAILED')
+        self.assertEqual(statuses[remote.pk], 'RUNNING')
+        self.assertEqual(statuses[done.pk], 'DONE')
+
+    def test_submitted_job_can_be_polled_to_completion(self):
+        response = self.client.post('/algo_trading/jobs/', {
+            'csv_file': price_csv(300, seed=5), 'short_window': 20, 'long_window': 60,
+        })
+        self.assertEqual(response.status_code, 202)
+        status_url = response.json()['status_url']
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            status = self.client.get(status_url).json()
+            if status['status'] in ('DONE', 'FAILED'):
+                break
+            time.sleep(0.05)
+        self.assertEqual(status['status'], 'DONE')
+        self.assertEqual(status['rows_processed'], 300)
+
+
+class ResultCacheTests(SimpleTestCase):
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = ResultCache(2)
+        cache.put('a', {'run_id': 1})
+        cache.put('b', {'run_id': 2})
+        cache.get('a')
+        cache.put('c', {'run_id': 3})
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), {'run_id': 1})
+        self.assertEqual(cache.stats()['evictions'], 1)
+        self.assertEqual(cache.stats()['hits'], 2)
+
+    def test_discard_run_drops_every_entry_of_the_run(self):
+        cache = ResultCache(4)
+        cache.put('a', {'run_id': 1})
+        cache.put('b', {'run_id': 1})
+        cache.put('c', {'run_id': 2})
+        cache.discard_run(1)
+        self.assertEqual(cache.stats()['entries'], 1)
+        self.assertIsNotNone(cache.get('c'))
+
+
+class UploadCacheTests(TempMedia, TestCase):
+    def setUp(self):
+        super().setUp()
+        result_cache.clear()
+
+    def upload(self):
+        return self.client.post('/algo_trading/', {'csv_file': price_csv(400), 'short_window': 20, 'long_window': 60})
+
+    def test_identical_upload_is_served_from_the_cache(self):
+        first = self.upload()
+        second = self.upload()
+        self.assertEqual(second.context['debug_info']['cache'], 'hit')
+        self.assertEqual(second.context['trades'], first.context['trades'])
+        self.assertEqual(second.context['run_id'], first.context['run_id'])
+        # Only the summary is cached; trades come back from the stored run
+        self.assertTrue(all('trades' not in entry for entry in result_cache._entries.values()))
+
+    def test_pruned_run_is_a_miss(self):
+        first = self.upload()
+        BacktestJob.objects.filter(pk=first.context['run_id']).delete()
+        second = self.upload()
+        self.assertEqual(second.context['debug_info']['cache'], 'miss')
+        self.assertNotEqual(second.context['run_id'], first.context['run_id'])
+        self.assertEqual(self.client.get(f"/algo_trading/download/{second.context['run_id']}/").status_code, 200)
+
+
+class DatasetTests(TempMedia, TestCase):
+    def long_frame(self):
+        frames = []
+        for seed, ticker in enumerate(['AAA', 'BBB']):
+            dates, close = random_walk(300, seed)
+            frames.append(pd.DataFrame({'Ticker': ticker, 'Date': dates, 'Open': close, 'High': close,
+                                        'Low': close, 'Close': close, 'Volume': 1.0}))
+        return pd.concat(frames)
+
+    def test_slices_read_back_the_stored_rows(self):
+        df = self.long_frame()
+        dataset = save_dataset(df, 'two tickers')
+        self.assertEqual(dataset.ticker_index, {'AAA': [0, 300], 'BBB': [300, 600]})
+
+        columns = load_slice(dataset, 'BBB', '2020-02-01', '2020-02-10')
+        expected = df[(df['Ticker'] == 'BBB') & df['Date'].between('2020-02-01', '2020-02-10')]
+        np.testing.assert_array_equal(columns['Close'], expected['Close'].to_numpy())
+        self.assertEqual(len(columns['Date']), 10)
+
+    def test_unknown_ticker_and_unfiltered_date_range_are_rejected(self):
+        dataset = save_dataset(self.long_frame(), 'two tickers')
+        with self.assertRaises(ValueError):
+            load_slice(dataset, 'ZZZ')
+        with self.assertRaises(ValueError):
+            load_slice(dataset, start='2020-02-01')
+
+    def test_failed_write_leaves_no_row_or_files(self):
+        with mock.patch('algo_trading.datasets.os.replace', side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                save_dataset(self.long_frame(), 'two tickers')
+        self.assertFalse(Dataset.objects.exists())
+        self.assertEqual(os.listdir(os.path.join(self.media, 'datasets')), [])
+
+    def test_run_matches_an_uploaded_run(self):
+        response = self.client.post('/algo_trading/datasets/', {'csv_file': price_csv(400), 'ticker': 'INFY'})
+        self.assertEqual(response.status_code, 201)
+        dataset_id = response.json()['id']
+        response = self.client.get(f'/algo_trading/datasets/{dataset_id}/run/', {'short_window': 20, 'long_window': 60})
+        dates, close = random_walk(400)
+        self.assertEqual(response.context['trades'], run_crossover(dates, close, 20, 60)['trades'])
+
+
+class StrategyTests(SimpleTestCase):
+    def test_sma_crossover_matches_the_engine(self):
+        dates, close = random_walk(600)
+        result = get_strategy('sma_crossover', {'short_window': 20, 'long_window': 60}).run(dates, IndicatorCache(close))
+        expected = run_crossover(dates, close, 20, 60)
+        self.assertEqual(result['trades'], expected['trades'])
+        self.assertEqual(result['total_profit'], expected['total_profit'])
+
+    def test_shared_indicators_are_computed_once(self):
+        dates, close = random_walk(600)
+        cache = IndicatorCache(close)
+        specs = [
+            {'name': 'sma_crossover', 'params': {'short_window': 20, 'long_window': 60}},
+            {'name': 'bollinger', 'params': {'window': 20}},
+            {'name': 'sma_crossover', 'params': {'short_window': 20, 'long_window': 60}},
+        ]
+        results = run_strategies(dates, cache, specs)
+        self.assertEqual(results[0]['trades'], results[2]['trades'])
+        # csum, sma 20, sma 60 and std 20; the second crossover and the bands reuse the SMAs
+        self.assertEqual(cache.stats()['computed'], 4)
+
+    def test_every_strategy_runs_with_its_defaults(self):
+        dates, close = random_walk(600)
+        cache = IndicatorCache(close)
+        for name in STRATEGIES:
+            result = get_strategy(name).run(dates, cache)
+            self.assertGreater(result['rows_evaluated'], 0, name)
+
+    def test_integer_parameters_must_be_positive_whole_numbers(self):
+        for name, params in [('rsi', {'period': 0}), ('bollinger', {'window': -3}), ('rsi', {'period': 2.5}),
+                             ('breakout', {'entry_window': True}), ('ema_crossover', {'short_window': 'x'})]:
+            with self.subTest(name=name, params=params), self.assertRaises(ValueError):
+                get_strategy(name, params)
+        self.assertEqual(get_strategy('rsi', {'period': '7', 'oversold': 25}).params['period'], 7)
+
+    def test_unknown_strategy_or_parameter_is_rejected(self):
+        with self.assertRaises(ValueError):
+            get_strategy('nope')
+        with self.assertRaises(ValueError):
+            get_strategy('rsi', {'window': 5})
+
+
+class StrategyViewTests(TempMedia, TestCase):
+    def post(self, dataset, body):
+        return self.client.post(f'/algo_trading/datasets/{dataset.pk}/strategies/', json.dumps(body),
+                                content_type='application/json')
+
+    def test_runs_strategies_over_a_dataset(self):
+        dates, close = random_walk(400)
+        dataset = save_dataset(pd.DataFrame({'Date': dates, 'Open': close, 'High': close, 'Low': close,
+                                             'Close': close, 'Volume': 1.0}), 'prices', ticker='INFY')
+        response = self.post(dataset, {'strategies': [{'name': 'rsi'}, {'name': 'breakout'}]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['ticker'], 'INFY')
+        self.assertEqual([r['name'] for r in response.json()['results']], ['rsi', 'breakout'])
+
+    def test_bad_parameters_are_a_400(self):
+        dates, close = random_walk(400)
+        dataset = save_dataset(pd.DataFrame({'Date': dates, 'Open': close, 'High': close, 'Low': close,
+                                             'Close': close, 'Volume': 1.0}), 'prices')
+        response = self.post(dataset, {'strategies': [{'name': 'rsi', 'params': {'period': 0}}]})
+        self.assertEqual(response.status_code, 400)
+
+    def test_multi_ticker_dataset_needs_a_ticker(self):
+        frames = [pd.DataFrame({'Ticker': t, 'Date': random_walk(100)[0], 'Open': 1.0, 'High': 1.0,
+                                'Low': 1.0, 'Close': 1.0, 'Volume': 1.0}) for t in ('AAA', 'BBB')]
+        dataset = save_dataset(pd.concat(frames), 'two tickers')
+        response = self.post(dataset, {'strategies': [{'name': 'rsi'}]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['error'], 'ticker is required for multi-ticker datasets')
+        self.assertEqual(self.post(dataset, {'ticker': 'AAA', 'strategies': [{'name': 'rsi'}]}).status_code, 200)
+
+
+class ResultStoreTests(TempMedia, TestCase):
+    def stored_run(self):
+        dates, close = random_walk(400)
+        result = run_crossover(dates, close, 20, 60)
+        result['summary'] = summarize(result['trades'], result['total_profit'])
+        return result, store_result(result, 20, 60, 'prices.csv')
+
+    def test_trades_round_trip_in_order(self):
+        result, job = self.stored_run()
+        self.assertEqual(job.status, 'DONE')
+        self.assertEqual(load_trades(job), result['trades'])
+
+    def test_failed_insert_leaves_the_job_unfinished(self):
+        dates, close = random_walk(400)
+        result = run_crossover(dates, close, 20, 60)
+        result['summary'] = summarize(result['trades'], result['total_profit'])
+        job = BacktestJob.objects.create(status='RUNNING')
+        bulk_create = BacktestTrade.objects.bulk_create
+
+        def insert_then_fail(*args, **kwargs):
+            bulk_create(*args, **kwargs)
+            raise DatabaseError("disk full")
+
+        with mock.patch.object(BacktestTrade.objects, 'bulk_create', insert_then_fail):
+            with self.assertRaises(DatabaseError):
+                store_result(result, 20, 60, job=job)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'RUNNING')
+        self.assertFalse(job.trades.exists())
+
+    def test_report_streams_every_trade_and_the_total(self):
+        result, job = self.stored_run()
+        response = self.client.get(f'/algo_trading/download/{job.pk}/')
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(',')[:2], ['Buy Date', 'Buy Price'])
+        self.assertEqual(lines[1].split(',')[0], result['trades'][0]['buy_date'])
+        self.assertIn(f"Total Profit/Loss,{result['summary']['total_profit']}", lines)
+        self.assertEqual(len([line for line in lines if line.count(',') == 7]), len(result['trades']) + 1)
+
+    def test_session_holds_only_the_run_id(self):
+        response = self.client.post('/algo_trading/', {'csv_file': price_csv(400), 'short_window': 20, 'long_window': 60})
+        self.assertEqual(dict(self.client.session), {'run_id': response.context['run_id']})
+        self.assertEqual(self.client.get('/algo_trading/download/').status_code, 200)
+
+    def test_unknown_run_is_a_404(self):
+        self.assertEqual(self.client.get('/algo_trading/download/').status_code, 404)
+        self.assertEqual(self.client.get('/algo_trading/download/999/').status_code, 404)
+
+    def test_prune_deletes_old_runs_only(self):
+        _, old = self.stored_run()
+        _, recent = self.stored_run()
+        running = BacktestJob.objects.create(status='RUNNING')
+        BacktestJob.objects.filter(pk__in=[old.pk, running.pk]).update(created_at=timezone.now() - timedelta(days=30))
+        call_command('prune_backtests', days=14, stdout=io.StringIO())
+        self.assertEqual(set(BacktestJob.objects.values_list('pk', flat=True)), {recent.pk, running.pk})
+        self.assertFalse(BacktestTrade.objects.filter(job_id=old.pk).exists())
+
+
+class IncrementalTests(TestCase):
+    def test_appends_with_overlap_match_one_full_run(self):
+        dates, close = random_walk(1000, seed=3)
+        for first, last in [(0, 400), (390, 650), (600, 1000)]:
+            tracker, added, closed, open_trade = append_bars('AAA', dates[first:last], close[first:last], 20, 60)
+        self.assertEqual(tracker.state['rows'], 1000)
+
+        expected = run_crossover(dates, close, 20, 60)
+        self.assertEqual(load_trades(tracker.run), expected['trades'])
+        self.assertEqual(tracker.run.result['summary'], summarize(expected['trades'], expected['total_profit']))
+
+    def test_resent_bars_are_skipped(self):
+        dates, close = random_walk(300)
+        append_bars('AAA', dates, close, 20, 60)
+        tracker, added, closed, _ = append_bars('AAA', dates[-50:], close[-50:], 20, 60)
+        self.assertEqual((added, closed), (0, []))
+        self.assertEqual(tracker.state['rows'], 300)
+
+    def test_concurrent_first_append_reuses_the_winners_tracker(self):
+        dates, close = random_walk(300)
+        append_bars('AAA', dates[:200], close[:200], 20, 60)
+        # As if another request created the tracker between our lookup and insert
+        with mock.patch('django.db.models.query.QuerySet.first', return_value=None):
+            tracker, added, _, _ = append_bars('AAA', dates, close, 20, 60)
+        self.assertEqual(added, 100)
+        self.assertEqual(tracker.state['rows'], 300)
+        self.assertEqual(IncrementalBacktest.objects.count(), 1)
+        self.assertEqual(BacktestJob.objects.count(), 1)
+
+    def test_endpoint_needs_a_ticker(self):
+        response = self.client.post('/algo_trading/incremental/', {'csv_file': price_csv(100)})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post('/algo_trading/incremental/', {
+            'csv_file': price_csv(100), 'ticker': 'INFY', 'short_window': 5, 'long_window': 20,
+        })
+        self.assertEqual(response.json()['results'][0]['bars_added'], 100)
@@ -1,7 +1,22 @@
 from django.urls import path
-from .views import upload_and_run, download_report
+from .views import (
+    upload_and_run, download_report, run_sweep, submit_backtest, job_status, job_result,
+    cache_stats, datasets, run_dataset, strategy_list, run_dataset_strategies,
+    append_backtest,
+)
 
 urlpatterns = [
     path('', upload_and_run, name='upload'),
     path('download/', download_report, name='download_report'),
+    path('download/<int:run_id>/', download_report, name='download_run_report'),
+    path('sweep/', run_sweep, name='run_sweep'),
+    path('jobs/', submit_backtest, name='submit_backtest'),
+    path('jobs/<int:job_id>/', job_status, name='job_status'),
+    path('jobs/<int:job_id>/result/', job_result, name='job_result'),
+    path('cache/', cache_stats, name='cache_stats'),
+    path('datasets/', datasets, name='datasets'),
+    path('datasets/<int:dataset_id>/run/', run_dataset, name='run_dataset'),
+    path('datasets/<int:dataset_id>/strategies/', run_dataset_strategies, name='run_dataset_strategies'),
+    path('incremental/', append_backtest, name='append_backtest'),
+    path('strategies/', strategy_list, name='strategy_list'),
 ]
\ No newline at end of file
@@ -2,13 +2,39 @@ import pandas as pd
 import traceback
 import logging
 import os
-from django.shortcuts import render
-from django.http import HttpResponse, JsonResponse
+import json
+from django.shortcuts import render, get_object_or_404
+from django.urls import reverse
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.conf import settings
+from django.views.decorators.csrf import csrf_exempt
+from .engine import run_crossover, summarize, load_prices, SHORT_WINDOW, LONG_WINDOW
+from .sweep import sweep_windows
+from .portfolio import run_portfolio
+from .streaming import run_stream, STREAM_CHUNK_SIZE
+from .models import BacktestJob, Dataset
+from .datasets import save_dataset, load_slice, ticker_column
+from .jobs import submit_job, QueueFull
+from .results import store_result, load_trades, iter_report
+from .incremental import append_bars
+from .cache import result_cache, cache_key, indicator_caches, summary_entry
+from .indicators import IndicatorCache
+from .strategies import STRATEGIES, run_strategies
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+def _int_param(data, name, default):
+    """Read a positive integer form field, falling back to a default."""
+    value = data.get(name) or default
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be an integer")
+    if value <= 0:
+        raise ValueError(f"{name} must be positive")
+    return value
+
 def upload_and_run(request):
     trades = []
     total_profit = 0.0
@@ -33,6 +59,30 @@ def upload_and_run(request):
             debug_info['file_present'] = True
             file = request.FILES['csv_file']
             
+            # Moving average windows, defaulting to the 50/200 crossover
+            try:
+                short_window = _int_param(request.POST, 'short_window', SHORT_WINDOW)
+                long_window = _int_param(request.POST, 'long_window', LONG_WINDOW)
+                if short_window >= long_window:
+                    raise ValueError("Short window must be smaller than long window")
+            except ValueError as e:
+                return render(request, "algo_trading/upload.html", {
+                    'error_message': str(e),
+                    'debug_info': debug_info,
+                })
+            debug_info['windows'] = [short_window, long_window]
+            
+            # An identical file and settings reuse the cached result without re-parsing
+            key = cache_key(file, short_window, long_window)
+            cached = _cached_result(key)
+            debug_info['cache'] = 'hit' if cached is not None else 'miss'
+            if cached is not None:
+                return _render_result(request, cached, short_window, long_window, debug_info)
+            
+            # Streaming mode reads the upload chunk by chunk without a temp file
+            if request.POST.get('streaming'):
+                return _run_streaming_upload(request, file, short_window, long_window, key, debug_info, file_info)
+            
             # Debug file information
             file_info = {
                 'name': file.name,
@@ -96,12 +146,17 @@ def upload_and_run(request):
                         'file_info': file_info,
                     })
                 
-                # Sort data
+                # Sort data and drop rows without a close price
                 df.sort_values('Date', inplace=True)
+                df.dropna(subset=['Close'], inplace=True)
+                
+                # Long-format uploads with a Ticker column run as one portfolio
+                if 'Ticker' in df.columns:
+                    return _run_portfolio_upload(request, df, short_window, long_window, key, debug_info, file_info)
                 
                 # Check data size for moving averages
-                if len(df) < 200:
-                    error_message = f"Not enough data points. Need at least 200 rows for 200-day MA, but got {len(df)}."
+                if len(df) < long_window:
+                    error_message = f"Not enough data points. Need at least {long_window} rows for {long_window}-day MA, but got {len(df)}."
                     debug_info['data_size_issue'] = True
                     return render(request, "algo_trading/upload.html", {
                         'error_message': error_message,
@@ -109,95 +164,21 @@ def upload_and_run(request):
                         'file_info': file_info,
                     })
                 
-                # Calculate moving averages
+                # Run the crossover strategy
                 debug_info['calculation_step'] = 'starting MA calculations'
-                df['MA_50'] = df['Close'].rolling(window=50).mean()
-                df['MA_200'] = df['Close'].rolling(window=200).mean()
+                result = run_crossover(df['Date'].values, df['Close'].values, short_window, long_window)
+                trades = result['trades']
+                total_profit = result['total_profit']
                 debug_info['ma_calculated'] = True
-                
-                # Remove NaN values
-                df = df.dropna()
-                debug_info['nan_removed'] = True
-                debug_info['rows_after_nan_removal'] = len(df)
-                
-                # Add a column to detect crossovers
-                df['Signal'] = 0
-                df.loc[df['MA_50'] > df['MA_200'], 'Signal'] = 1
-                
-                # Create a crossover signal
-                df['Crossover'] = df['Signal'].diff()
-                
-                # Start trading logic
-                debug_info['trading_logic'] = 'starting'
-                position = None
-                buy_price = 0
-                buy_date = None
-                
-                for i in range(len(df)):
-                    # Golden Cross: MA_50 crosses above MA_200
-                    if df['Crossover'].iloc[i] == 1:
-                        position = 'buy'
-                        buy_price = df['Close'].iloc[i]
-                        buy_date = df['Date'].iloc[i]
-                        
-                    # Death Cross: MA_50 crosses below MA_200
-                    elif df['Crossover'].iloc[i] == -1 and position == 'buy':
-                        sell_price = df['Close'].iloc[i]
-                        sell_date = df['Date'].iloc[i]
-                        profit = sell_price - buy_price
-                        total_profit += profit
-                        
-                        trades.append({
-                            'buy_date': buy_date.strftime('%Y-%m-%d'),
-                            'buy_price': round(buy_price, 2),
-                            'sell_date': sell_date.strftime('%Y-%m-%d'),
-                            'sell_price': round(sell_price, 2),
-                            'profit': round(profit, 2),
-                            'profit_percentage': round((profit / buy_price) * 100, 2),
-                            'ma_50': round(df['MA_50'].iloc[i], 2),
-                            'ma_200': round(df['MA_200'].iloc[i], 2),
-                        })
-                        
-                        position = None
-                
-                # Handle open position at the end
-                if position == 'buy':
-                    last_price = df['Close'].iloc[-1]
-                    last_date = df['Date'].iloc[-1]
-                    unrealized_profit = last_price - buy_price
-                    
-                    trades.append({
-                        'buy_date': buy_date.strftime('%Y-%m-%d'),
-                        'buy_price': round(buy_price, 2),
-                        'sell_date': 'Open Position',
-                        'sell_price': round(last_price, 2),
-                        'profit': round(unrealized_profit, 2),
-                        'profit_percentage': round((unrealized_profit / buy_price) * 100, 2),
-                        'ma_50': round(df['MA_50'].iloc[-1], 2),
-                        'ma_200': round(df['MA_200'].iloc[-1], 2),
-                    })
+                debug_info['rows_after_nan_removal'] = result['rows_evaluated']
                 
                 debug_info['trades_found'] = len(trades)
-                debug_info['total_profit'] = round(total_profit, 2)
-                
-                # Store trades in session for download
-                request.session['trades'] = trades
-                request.session['total_profit'] = round(total_profit, 2)
-                
-                # Check if there were any trades
-                if not trades:
-                    debug_info['no_trades'] = 'No crossover signals detected in the provided data'
+                debug_info['total_profit'] = total_profit
                 
                 # Return result
-                return render(request, "algo_trading/upload.html", {
-                    'trades': trades,
-                    'total_profit': round(total_profit, 2),
-                    'total_trades': len(trades),
-                    'winning_trades': len([t for t in trades if t['profit'] > 0]),
-                    'losing_trades': len([t for t in trades if t['profit'] < 0]),
-                    'debug_info': debug_info,
-                    'processing_complete': True,
-                })
+                result = {'trades': trades, 'summary': summarize(trades, total_profit)}
+                _store_result(key, result, short_window, long_window, file.name)
+                return _render_result(request, result, short_window, long_window, debug_info)
                 
             except pd.errors.EmptyDataError:
                 error_message = "The CSV file is empty."
@@ -219,25 +200,402 @@ def upload_and_run(request):
         'file_info': file_info,
     })
 
-def download_report(request):
-    trades = request.session.get('trades', [])
-    total_profit = request.session.get('total_profit', 0)
+def _run_streaming_upload(request, file, short_window, long_window, key, debug_info, file_info):
+    """Run the crossover over the upload's chunks in bounded memory and render it."""
+    debug_info['streaming'] = True
+    try:
+        result = run_stream(file.chunks(STREAM_CHUNK_SIZE), short_window, long_window)
+    except (ValueError, pd.errors.ParserError, pd.errors.EmptyDataError) as e:
+        return render(request, "algo_trading/upload.html", {
+            'error_message': str(e),
+            'debug_info': debug_info,
+            'file_info': file_info,
+        })
     
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="trading_report.csv"'
+    trades = result['trades']
+    debug_info['row_count'] = result['rows']
+    debug_info['ma_calculated'] = True
+    debug_info['rows_after_nan_removal'] = result['rows_evaluated']
+    debug_info['trades_found'] = len(trades)
+    debug_info['total_profit'] = result['total_profit']
+    
+    if result['rows'] < long_window:
+        debug_info['data_size_issue'] = True
+        return render(request, "algo_trading/upload.html", {
+            'error_message': f"Not enough data points. Need at least {long_window} rows for {long_window}-day MA, but got {result['rows']}.",
+            'debug_info': debug_info,
+            'file_info': file_info,
+        })
+    
+    result = {'trades': trades, 'summary': summarize(trades, result['total_profit'])}
+    _store_result(key, result, short_window, long_window, file.name)
+    return _render_result(request, result, short_window, long_window, debug_info)
+
+def _run_portfolio_upload(request, df, short_window, long_window, key, debug_info, file_info):
+    """Run the crossover for every ticker of a long-format upload and render it."""
+    debug_info['calculation_step'] = 'starting portfolio MA calculations'
+    result = run_portfolio(df, short_window, long_window)
+    summary = result['summary']
+    debug_info['ma_calculated'] = True
+    debug_info['tickers'] = summary['tickers']
+    debug_info['trades_found'] = len(result['trades'])
+    debug_info['total_profit'] = result['total_profit']
+    
+    if len(summary['skipped_tickers']) == summary['tickers']:
+        debug_info['data_size_issue'] = True
+        return render(request, "algo_trading/upload.html", {
+            'error_message': f"Not enough data points. Need at least {long_window} rows per ticker for {long_window}-day MA.",
+            'debug_info': debug_info,
+            'file_info': file_info,
+        })
+    
+    result = {
+        'trades': result['trades'],
+        'summary': summary,
+        'per_ticker': result['per_ticker'],
+        'equity_curve': result['equity_curve'],
+    }
+    _store_result(key, result, short_window, long_window, file_info.get('name', ''))
+    return _render_result(request, result, short_window, long_window, debug_info)
+
+def _store_result(key, result, short_window, long_window, file_name=''):
+    """Save a finished run server-side and cache it, with its run id, under key."""
+    job = store_result(result, short_window, long_window, file_name)
+    result['run_id'] = job.pk
+    result_cache.put(key, summary_entry(result))
+    return result
+
+def _cached_result(key, with_trades=True):
+    """A cached result with its trades reloaded, or None on a miss.
+
+    The cache may outlive its run (``prune_backtests`` deletes runs from
+    another process), so an entry whose run is gone is dropped and missed.
+    """
+    cached = result_cache.get(key)
+    if cached is None:
+        return None
+    job = BacktestJob.objects.filter(pk=cached['run_id'], status='DONE').first()
+    if job is None:
+        result_cache.discard_run(cached['run_id'])
+        return None
+    return {**cached, 'trades': load_trades(job)} if with_trades else cached
+
+def _render_result(request, result, short_window, long_window, debug_info=None):
+    """Remember a stored run for download and render it on the upload page."""
+    trades = result['trades']
+    summary = result['summary']
     
-    # Write header
-    response.write("Buy Date,Buy Price,Sell Date,Sell Price,Profit,Profit %,50 MA,200 MA\n")
+    # Only the run id goes in the session; trades stay in the result store
+    request.session['run_id'] = result['run_id']
     
-    # Write trade data
-    for trade in trades:
-        row = f"{trade['buy_date']},{trade['buy_price']},{trade['sell_date']},{trade['sell_price']},{trade['profit']},{trade.get('profit_percentage', 0)},{trade['ma_50']},{trade['ma_200']}\n"
-        response.write(row)
+    # Check if there were any trades
+    if not trades and debug_info is not None:
+        debug_info['no_trades'] = 'No crossover signals detected in the provided data'
     
-    # Write summary at the end
-    response.write(f"\nTotal Profit/Loss,{total_profit}\n")
-    response.write(f"Total Trades,{len(trades)}\n")
-    response.write(f"Winning Trades,{len([t for t in trades if t['profit'] > 0])}\n")
-    response.write(f"Losing Trades,{len([t for t in trades if t['profit'] < 0])}\n")
+    return render(request, "algo_trading/upload.html", {
+        'trades': trades,
+        **summary,
+        'portfolio': result.get('per_ticker'),
+        'equity_curve': result.get('equity_curve'),
+        'short_window': short_window,
+        'long_window': long_window,
+        'run_id': result['run_id'],
+        'debug_info': debug_info,
+        'processing_complete': True,
+    })
+
+def download_report(request, run_id=None):
+    """Stream a stored run's trades as CSV, by run id or the session's last run."""
+    run_id = run_id or request.session.get('run_id')
+    if not run_id:
+        raise Http404("No backtest results to download")
+    job = get_object_or_404(BacktestJob, pk=run_id, status='DONE')
     
-    return response
\ No newline at end of file
+    response = StreamingHttpResponse(iter_report(job), content_type='text/csv')
+    response['Content-Disposition'] = 'attachment; filename="trading_report.csv"'
+    return response
+
+@csrf_exempt
+def run_sweep(request):
+    """Grid-search short/long MA windows over one uploaded CSV.
+
+    Windows are given as ``short_min``/``short_max``/``short_step`` and
+    ``long_min``/``long_max``/``long_step``; ``top`` limits the ranked table.
+    """
+    if request.method != "POST":
+        return JsonResponse({"error": "POST a csv_file to run a sweep"}, status=405)
+    if 'csv_file' not in request.FILES:
+        return JsonResponse({"error": "No file uploaded. Please select a CSV file."}, status=400)
+
+    try:
+        short_windows = range(
+            _int_param(request.POST, 'short_min', 5),
+            _int_param(request.POST, 'short_max', 100) + 1,
+            _int_param(request.POST, 'short_step', 5),
+        )
+        long_windows = range(
+            _int_param(request.POST, 'long_min', 50),
+            _int_param(request.POST, 'long_max', 300) + 1,
+            _int_param(request.POST, 'long_step', 10),
+        )
+        top = _int_param(request.POST, 'top', 50)
+        # Bound the grid before enumerating it; the exact limits are checked on the pairs
+        max_windows = settings.BACKTEST_SWEEP_MAX_WINDOWS
+        if len(short_windows) > max_windows or len(long_windows) > max_windows:
+            raise ValueError(f"At most {max_windows} short and {max_windows} long windows are allowed")
+        df = load_prices(request.FILES['csv_file'])
+        results = sweep_windows(df['Close'].values, short_windows, long_windows,
+                                processes=settings.BACKTEST_SWEEP_PROCESSES,
+                                max_pairs=settings.BACKTEST_SWEEP_MAX_PAIRS,
+                                max_windows=max_windows)
+    except (ValueError, pd.errors.ParserError, pd.errors.EmptyDataError) as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    return JsonResponse({
+        'rows': len(df),
+        'combinations': len(results),
+        'results': results[:top],
+    })
+
+@csrf_exempt
+def submit_backtest(request):
+    """Queue a backtest on the background worker pool and return its job id."""
+    if request.method != "POST":
+        return JsonResponse({"error": "POST a csv_file to submit a backtest"}, status=405)
+    if 'csv_file' not in request.FILES:
+        return JsonResponse({"error": "No file uploaded. Please select a CSV file."}, status=400)
+
+    try:
+        short_window = _int_param(request.POST, 'short_window', SHORT_WINDOW)
+        long_window = _int_param(request.POST, 'long_window', LONG_WINDOW)
+        if short_window >= long_window:
+            raise ValueError("Short window must be smaller than long window")
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    file = request.FILES['csv_file']
+    key = cache_key(file, short_window, long_window)
+    cached = _cached_result(key, with_trades=False)
+    if cached is not None:
+        # Identical runs point straight at the stored result
+        return JsonResponse({
+            'job_id': cached['run_id'],
+            'status': 'DONE',
+            'status_url': reverse('job_status', args=[cached['run_id']]),
+            'result_url': reverse('job_result', args=[cached['run_id']]),
+        }, status=202)
+
+    job = BacktestJob.objects.create(
+        csv_file=file,
+        file_name=file.name,
+        short_window=short_window,
+        long_window=long_window,
+    )
+    try:
+        submit_job(job, cache_key=key)
+    except QueueFull as e:
+        job.csv_file.delete(save=False)
+        job.delete()
+        return JsonResponse({"error": str(e)}, status=503)
+
+    return JsonResponse({
+        'job_id': job.pk,
+        'status': job.status,
+        'status_url': reverse('job_status', args=[job.pk]),
+        'result_url': reverse('job_result', args=[job.pk]),
+    }, status=202)
+
+def job_status(request, job_id):
+    """Progress of a background backtest, for polling."""
+    job = get_object_or_404(BacktestJob, pk=job_id)
+    data = {
+        'job_id': job.pk,
+        'status': job.status,
+        'rows_processed': job.rows_processed,
+        'trades_found': job.trades_found,
+        'created_at': job.created_at,
+        'started_at': job.started_at,
+        'finished_at': job.finished_at,
+    }
+    if job.status == 'DONE':
+        data['summary'] = job.result['summary']
+    elif job.status == 'FAILED':
+        data['error'] = job.error
+    return JsonResponse(data)
+
+def job_result(request, job_id):
+    """Render a finished background backtest like a regular upload."""
+    job = get_object_or_404(BacktestJob, pk=job_id)
+    if job.status != 'DONE':
+        return render(request, "algo_trading/upload.html", {
+            'error_message': job.error or f"Backtest {job.pk} is {job.get_status_display().lower()}.",
+        })
+
+    result = {**job.result, 'trades': load_trades(job), 'run_id': job.pk}
+    return _render_result(request, result, job.short_window, job.long_window)
+
+def cache_stats(request):
+    """Hit/miss counters of this process's backtest result cache."""
+    return JsonResponse(result_cache.stats())
+
+def _dataset_info(dataset):
+    return {
+        'id': dataset.pk,
+        'name': dataset.name,
+        'rows': dataset.rows,
+        'tickers': sorted(dataset.ticker_index),
+        'start_date': dataset.start_date,
+        'end_date': dataset.end_date,
+        'run_url': reverse('run_dataset', args=[dataset.pk]),
+    }
+
+@csrf_exempt
+def datasets(request):
+    """List stored datasets, or store an uploaded CSV as a new one."""
+    if request.method == "POST":
+        if 'csv_file' not in request.FILES:
+            return JsonResponse({"error": "No file uploaded. Please select a CSV file."}, status=400)
+        file = request.FILES['csv_file']
+        name = request.POST.get('name') or os.path.splitext(file.name)[0]
+        try:
+            df = load_prices(file)
+            dataset = save_dataset(df, name, ticker=request.POST.get('ticker'))
+        except (ValueError, pd.errors.ParserError, pd.errors.EmptyDataError) as e:
+            return JsonResponse({"error": str(e)}, status=400)
+        return JsonResponse(_dataset_info(dataset), status=201)
+
+    return JsonResponse({
+        'datasets': [_dataset_info(dataset) for dataset in Dataset.objects.order_by('-created_at')],
+    })
+
+def run_dataset(request, dataset_id):
+    """Backtest a stored dataset by id, optionally for one ticker and date range."""
+    dataset = get_object_or_404(Dataset, pk=dataset_id)
+    params = request.POST if request.method == "POST" else request.GET
+    ticker = params.get('ticker') or None
+    start, end = params.get('start') or None, params.get('end') or None
+    try:
+        short_window = _int_param(params, 'short_window', SHORT_WINDOW)
+        long_window = _int_param(params, 'long_window', LONG_WINDOW)
+        if short_window >= long_window:
+            raise ValueError("Short window must be smaller than long window")
+
+        key = f"dataset:{dataset.pk}:{ticker}:{start}:{end}:{short_window}:{long_window}"
+        result = _cached_result(key)
+        if result is None:
+            if ticker is None and len(dataset.ticker_index) > 1:
+                columns = load_slice(dataset)
+                df = pd.DataFrame({'Ticker': ticker_column(dataset), **columns})
+                if start:
+                    df = df[df['Date'] >= pd.Timestamp(start)]
+                if end:
+                    df = df[df['Date'] <= pd.Timestamp(end)]
+                result = run_portfolio(df, short_window, long_window)
+            else:
+                columns = load_slice(dataset, ticker, start, end)
+                result = run_crossover(columns['Date'], columns['Close'], short_window, long_window)
+            result = {
+                'trades': result['trades'],
+                'summary': result.get('summary') or summarize(result['trades'], result['total_profit']),
+                'per_ticker': result.get('per_ticker'),
+                'equity_curve': result.get('equity_curve'),
+            }
+            _store_result(key, result, short_window, long_window, f"dataset {dataset.name}")
+    except ValueError as e:
+        return render(request, "algo_trading/upload.html", {'error_message': str(e)})
+
+    return _render_result(request, result, short_window, long_window)
+
+@csrf_exempt
+def append_backtest(request):
+    """Feed newly appended bars into each ticker's saved crossover state.
+
+    Takes a CSV of new bars (a ``Ticker`` column, or a ``ticker`` field for a
+    single series). Only bars after each ticker's last processed date are
+    evaluated; the first upload for a ticker seeds it with the full history.
+    """
+    if request.method != "POST":
+        return JsonResponse({"error": "POST a CSV of new bars"}, status=405)
+    if 'csv_file' not in request.FILES:
+        return JsonResponse({"error": "No file uploaded. Please select a CSV file."}, status=400)
+
+    try:
+        short_window = _int_param(request.POST, 'short_window', SHORT_WINDOW)
+        long_window = _int_param(request.POST, 'long_window', LONG_WINDOW)
+        if not 0 < short_window < long_window:
+            raise ValueError("Short window must be positive and smaller than long window")
+        df = load_prices(request.FILES['csv_file'])
+        if 'Ticker' not in df.columns:
+            if not request.POST.get('ticker'):
+                raise ValueError("Give a ticker field or a Ticker column")
+            df['Ticker'] = request.POST['ticker']
+    except (ValueError, pd.errors.ParserError, pd.errors.EmptyDataError) as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    results = []
+    for ticker, bars in df.groupby('Ticker', sort=True):
+        tracker, added, closed, open_trade = append_bars(
+            str(ticker),
+            bars['Date'].to_numpy(dtype='datetime64[ns]'),
+            bars['Close'].to_numpy(dtype=float),
+            short_window,
+            long_window,
+        )
+        results.append({
+            'ticker': tracker.ticker,
+            'run_id': tracker.run_id,
+            'bars_added': added,
+            'rows': tracker.state['rows'],
+            'new_trades': closed,
+            'open_position': open_trade,
+            'summary': tracker.run.result['summary'],
+            'download_url': reverse('download_run_report', args=[tracker.run_id]),
+        })
+    return JsonResponse({'results': results})
+
+def strategy_list(request):
+    """Registered strategies with their default parameters."""
+    return JsonResponse({
+        'strategies': [
+            {'name': name, 'description': cls.description, 'defaults': cls.defaults}
+            for name, cls in STRATEGIES.items()
+        ],
+    })
+
+@csrf_exempt
+def run_dataset_strategies(request, dataset_id):
+    """Run several strategies over one dataset slice with a shared indicator cache.
+
+    Expects a JSON body like ``{"ticker": "INFY", "start": "2024-01-01",
+    "strategies": [{"name": "sma_crossover", "params": {"short_window": 20}}]}``.
+    """
+    if request.method != "POST":
+        return JsonResponse({"error": "POST a JSON list of strategies"}, status=405)
+    dataset = get_object_or_404(Dataset, pk=dataset_id)
+    try:
+        body = json.loads(request.body)
+        specs = body['strategies']
+        ticker, start, end = body.get('ticker'), body.get('start'), body.get('end')
+        if ticker is None and len(dataset.ticker_index) > 1:
+            return JsonResponse({"error": "ticker is required for multi-ticker datasets"}, status=400)
+        if ticker is None and len(dataset.ticker_index) == 1:
+            ticker = next(iter(dataset.ticker_index))
+        columns = load_slice(dataset, ticker, start, end)
+
+        # Indicators are shared by every strategy run on the same slice
+        key = f"{dataset.pk}:{ticker}:{start}:{end}"
+        cache = indicator_caches.get(key)
+        if cache is None:
+            cache = IndicatorCache(columns['Close'])
+            indicator_caches.put(key, cache)
+        results = run_strategies(columns['Date'], cache, specs)
+    except (ValueError, KeyError, TypeError) as e:
+        return JsonResponse({"error": f"Invalid request: {str(e)}"}, status=400)
+
+    return JsonResponse({
+        'dataset': dataset.pk,
+        'ticker': ticker,
+        'rows': len(columns['Close']),
+        'indicators': cache.stats(),
+        'results': results,
+    })
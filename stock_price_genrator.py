@@ -1,18 +1,18 @@
-import yfinance as yf
 import pandas as pd
 from datetime import datetime, timedelta
+from tradingSim_app.providers import PROVIDERS
 
 # === CONFIGURATION ===
 ticker = "INFY.NS"  # INFY listed on NSE India
 period = "2y"       # Last 2 years of data
 csv_filename = "infy_stock_data.csv"
+backend = "yfinance"  # "synthetic" generates offline GBM data instead
 
 # === DOWNLOAD DATA ===
-data = yf.download(ticker, period=period)
+data = PROVIDERS[backend]().history(ticker, period)
 
 # === FORMAT COLUMNS ===
-data = data[['Open', 'High', 'Low', 'Close', 'Volume']]
-data.reset_index(inplace=True)  # Make Date a column instead of index
+data = data[['Date', 'Open', 'High', 'Low', 'Close', 'Volume']]
 data['Date'] = data['Date'].dt.strftime('%Y-%m-%d')  # Format date as string
 
 # === SAVE TO CSV ===
@@ -0,0 +1,136 @@
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+import pandas as pd
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from .models import Candle
+
+INTERVAL_SECONDS = {'1s': 1, '1m': 60, '5m': 300, '1h': 3600}
+
+# pandas frequency of each interval, for rolling up stored ticks
+INTERVAL_FREQ = {'1s': '1s', '1m': '1min', '5m': '5min', '1h': '1h'}
+
+CANDLE_BATCH_SIZE = 1000
+
+
+def bucket_start(when, seconds):
+    """Start of the candle holding ``when``, on TIME_ZONE wall-clock boundaries."""
+    offset = timezone.localtime(when).utcoffset().total_seconds()
+    local = when.timestamp() + offset
+    return datetime.fromtimestamp(local - local % seconds - offset, tz=dt_timezone.utc)
+
+
+class CandleAggregator:
+    """Open candle of every ticker and interval, updated tick by tick.
+
+    ``add`` updates one candle per interval in memory; ``changed`` returns
+    the candles touched since the previous call, still-open ones included,
+    as fresh ``Candle`` objects for ``merge_candles``. Their high, low and
+    ticks cover only the ticks added since that call, so several processes
+    can merge their parts of the same candle.
+    """
+
+    def __init__(self, intervals=INTERVAL_SECONDS):
+        self.intervals = intervals
+        # (ticker, interval) -> [start, open, high, low, close, ticks]
+        self._open = {}
+        self._dirty = set()
+
+    def add(self, ticker, when, price):
+        price = float(price)
+        for interval, seconds in self.intervals.items():
+            start = bucket_start(when, seconds)
+            candle = self._open.get((ticker, interval))
+            if candle is None or candle[0] != start:
+                candle = self._open[(ticker, interval)] = [start, price, price, price, price, 0]
+            candle[2] = max(candle[2], price)
+            candle[3] = min(candle[3], price)
+            candle[4] = price
+            candle[5] += 1
+            self._dirty.add((ticker, interval))
+
+    def changed(self):
+        dirty, self._dirty = self._dirty, set()
+        rows = []
+        for key in dirty:
+            candle = self._open[key]
+            rows.append(candle_row(*key, *candle))
+            # The next call reports only the ticks added after this one
+            candle[2], candle[3], candle[5] = float('-inf'), float('inf'), 0
+        return rows
+
+
+def candle_row(ticker, interval, start, open_, high, low, close, ticks):
+    price = lambda value: Decimal(str(round(value, 2)))
+    return Candle(
+        ticker=ticker, interval=interval, start=start,
+        open=price(open_), high=price(high), low=price(low), close=price(close), ticks=int(ticks),
+    )
+
+
+def save_candles(candles):
+    """Insert candles, or replace the high/low/close/ticks of ones already stored.
+
+    For candles rebuilt from every stored tick; live partial candles go
+    through ``merge_candles``.
+    """
+    Candle.objects.bulk_create(
+        candles,
+        batch_size=CANDLE_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=['ticker', 'interval', 'start'],
+        update_fields=['high', 'low', 'close', 'ticks'],
+    )
+
+
+MERGE_FIELDS = ('ticker', 'interval', 'start', 'open', 'high', 'low', 'close', 'ticks')
+
+
+def merge_candles(candles):
+    """Upsert partial candles, merging with what other processes already stored.
+
+    The database keeps the greater high, the lesser low and the sum of the
+    ticks in one ``INSERT ... ON CONFLICT`` statement, so concurrent writers
+    of the same candle do not overwrite each other. The first insert's open
+    is kept and the latest close wins. PostgreSQL and SQLite only.
+    """
+    if not candles:
+        return
+    greatest, least = ('MAX', 'MIN') if connection.vendor == 'sqlite' else ('GREATEST', 'LEAST')
+    table = connection.ops.quote_name(Candle._meta.db_table)
+    columns = [connection.ops.quote_name(name) for name in MERGE_FIELDS]
+    ticker, interval, start, _, high, low, close, ticks = columns
+    sql = (
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))}) "
+        f"ON CONFLICT ({ticker}, {interval}, {start}) DO UPDATE SET "
+        f"{high} = {greatest}({table}.{high}, EXCLUDED.{high}), "
+        f"{low} = {least}({table}.{low}, EXCLUDED.{low}), "
+        f"{close} = EXCLUDED.{close}, "
+        f"{ticks} = {table}.{ticks} + EXCLUDED.{ticks}"
+    )
+    fields = [Candle._meta.get_field(name) for name in MERGE_FIELDS]
+    rows = [
+        [field.get_db_prep_save(getattr(candle, field.attname), connection) for field in fields]
+        for candle in candles
+    ]
+    with connection.cursor() as cursor:
+        for first in range(0, len(rows), CANDLE_BATCH_SIZE):
+            cursor.executemany(sql, rows[first:first + CANDLE_BATCH_SIZE])
+
+
+def rollup_ticks(ticker, timestamps, prices, intervals=INTERVAL_SECONDS):
+    """Candles of stored ticks, one vectorized resample per interval."""
+    ticks = pd.Series(
+        pd.to_numeric(pd.Series(prices), errors='coerce').to_numpy(dtype=float),
+        index=pd.DatetimeIndex(timestamps).tz_convert(settings.TIME_ZONE),
+    ).sort_index()
+    candles = []
+    for interval in intervals:
+        bars = ticks.resample(INTERVAL_FREQ[interval]).agg(['first', 'max', 'min', 'last', 'count'])
+        bars = bars[bars['count'] > 0]
+        candles.extend(
+            candle_row(ticker, interval, start.to_pydatetime(), *row)
+            for start, row in zip(bars.index, bars.itertuples(index=False))
+        )
+    return candles
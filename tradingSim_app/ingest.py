@@ -0,0 +1,161 @@
+import io
+import csv
+import json
+from collections import defaultdict
+from decimal import Decimal, InvalidOperation
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .models import Trade
+from .positions import apply_trades
+from .serializers import TradeSerializer, MAX_QUANTITY
+
+SIDES = {side for side, _ in Trade.SIDE_CHOICES}
+MIN_PRICE = Decimal('0.01')
+MAX_PRICE = Decimal('1e8')  # DecimalField(max_digits=10, decimal_places=2)
+
+_serializer = TradeSerializer()
+
+
+def quick_trade(row):
+    """A ``Trade`` for a plainly well-formed row, or None to validate it in full.
+
+    Accepts only input that ``TradeSerializer`` would accept unchanged (same
+    ticker rule, price precision and bounds, choices), without its per-field
+    overhead. Anything unusual returns None and goes through the serializer.
+    """
+    if not isinstance(row, dict):
+        return None
+    ticker, price, quantity, side = row.get('ticker'), row.get('price'), row.get('quantity'), row.get('side')
+    if not isinstance(ticker, str) or not ticker.isalpha() or len(ticker) > 10:
+        return None
+    if type(quantity) is not int or not 1 <= quantity <= MAX_QUANTITY or side not in SIDES:
+        return None
+    if type(price) not in (str, int, float):
+        return None
+    try:
+        price = Decimal(str(price).strip())
+    except InvalidOperation:
+        return None
+    if not price.is_finite() or price.as_tuple().exponent < -2 or not MIN_PRICE <= price < MAX_PRICE:
+        return None
+
+    fields = {'ticker': _serializer.validate_ticker(ticker), 'price': price, 'quantity': quantity, 'side': side}
+    if 'timestamp' in row:
+        timestamp = parse_datetime(row['timestamp']) if isinstance(row['timestamp'], str) else None
+        if timestamp is None:
+            return None
+        fields['timestamp'] = timezone.make_aware(timestamp) if timezone.is_naive(timestamp) else timestamp
+    return Trade(**fields)
+
+
+def clean_trade(row):
+    """``(trade, None)`` for a valid row or ``(None, errors)`` with the serializer's messages."""
+    trade = quick_trade(row)
+    if trade is not None:
+        return trade, None
+    serializer = TradeSerializer(data=row)
+    if serializer.is_valid():
+        return Trade(**serializer.validated_data), None
+    return None, serializer.errors
+
+
+def ndjson_rows(lines):
+    """Records of an NDJSON stream; a line that is not JSON yields an ``InvalidRow``."""
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield InvalidRow(f"Invalid JSON: {e}")
+
+
+class InvalidRow:
+    def __init__(self, message):
+        self.errors = {'non_field_errors': [message]}
+
+
+COPY_COLUMNS = ('ticker', 'price', 'quantity', 'side', 'timestamp')
+
+
+def copy_trades(trades):
+    """Insert trades with one COPY (PostgreSQL), skipping the ORM's per-row INSERT compilation."""
+    table = connection.ops.quote_name(Trade._meta.db_table)
+    sql = f"COPY {table} ({', '.join(COPY_COLUMNS)}) FROM STDIN"
+    with connection.cursor() as cursor:
+        raw = cursor.cursor
+        if hasattr(raw, 'copy'):  # psycopg 3
+            with raw.copy(sql) as copy:
+                for trade in trades:
+                    copy.write_row([getattr(trade, column) for column in COPY_COLUMNS])
+        else:  # psycopg2
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for trade in trades:
+                writer.writerow([
+                    trade.timestamp.isoformat() if column == 'timestamp' else getattr(trade, column)
+                    for column in COPY_COLUMNS
+                ])
+            buffer.seek(0)
+            raw.copy_expert(f"{sql} WITH (FORMAT csv)", buffer)
+
+
+def insert_trades(trades, chunk_size):
+    """Insert one chunk in its own transaction, so a failure leaves none of it behind."""
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            copy_trades(trades)
+        else:
+            Trade.objects.bulk_create(trades, batch_size=chunk_size)
+
+
+def ingest_trades(rows, chunk_size, max_rows):
+    """Validate and insert trades chunk by chunk; bad rows are reported, not fatal.
+
+    Returns ``(created, errors)``, where each error is ``{"row": index,
+    "errors": {...}}`` with the row's 0-based position in the request. A
+    chunk the database rejects is rolled back whole and each of its rows is
+    reported. The inserted trades are then folded into their tickers'
+    positions; only a ticker whose batch is back-dated is replayed.
+    """
+    created, errors, chunk, indexes = 0, [], [], []
+    fills = defaultdict(list)
+
+    def flush():
+        nonlocal created
+        try:
+            insert_trades(chunk, chunk_size)
+        except DatabaseError as e:
+            message = f"Not inserted: the chunk holding this row failed ({e})"
+            errors.extend({'row': i, 'errors': {'non_field_errors': [message]}} for i in indexes)
+            return
+        created += len(chunk)
+        for trade in chunk:
+            fills[trade.ticker].append((trade.timestamp, trade.side, trade.quantity, trade.price))
+
+    for index, row in enumerate(rows):
+        if index == max_rows:
+            errors.append({'row': index, 'errors': {'non_field_errors': [
+                f"Only {max_rows} trades are accepted per request; the rest were not read"
+            ]}})
+            break
+        if isinstance(row, InvalidRow):
+            errors.append({'row': index, 'errors': row.errors})
+            continue
+        trade, row_errors = clean_trade(row)
+        if row_errors:
+            errors.append({'row': index, 'errors': row_errors})
+            continue
+        chunk.append(trade)
+        indexes.append(index)
+        if len(chunk) >= chunk_size:
+            flush()
+            chunk, indexes = [], []
+    if chunk:
+        flush()
+    for ticker in sorted(fills):
+        apply_trades(ticker, fills[ticker])
+    errors.sort(key=lambda error: error['row'])
+    return created, errors
@@ -0,0 +1,114 @@
+import json
+import time
+from datetime import timedelta
+from statistics import median
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from tradingSim_app.models import Trade
+from tradingSim_app.views import trade_date_range
+
+TABLE = "trade_benchmark"
+
+
+def plan_nodes(plan):
+    """Every node of an EXPLAIN (FORMAT JSON) plan, depth first."""
+    yield plan
+    for child in plan.get("Plans", ()):
+        yield from plan_nodes(child)
+
+
+def scan_summary(plan):
+    return ", ".join(
+        f"{node['Node Type']} on {node.get('Index Name') or node.get('Relation Name')}"
+        for node in plan_nodes(plan) if "Scan" in node["Node Type"]
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Load a synthetic trade table (50M rows by default) next to the real one and compare "
+        "EXPLAIN ANALYZE of the old date-cast filters with the half-open timestamp ranges the "
+        "trades API now uses. PostgreSQL only."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=50_000_000, help="Trades to generate")
+        parser.add_argument("--tickers", type=int, default=500, help="Distinct tickers (T0, T1, ...)")
+        parser.add_argument("--days", type=int, default=365, help="Spread trades over this many days up to now")
+        parser.add_argument("--range-days", type=int, default=7, help="Length of the queried date range")
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per query; the median is reported")
+        parser.add_argument("--batch", type=int, default=5_000_000, help="Rows per INSERT while loading")
+        parser.add_argument("--reuse", action="store_true", help=f"Query an existing {TABLE} table instead of reloading")
+        parser.add_argument("--keep", action="store_true", help=f"Keep the {TABLE} table afterwards")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("The query benchmark needs PostgreSQL (EXPLAIN ANALYZE plans and generate_series)")
+
+        try:
+            if not options["reuse"]:
+                self.load(options)
+            self.compare(options)
+        finally:
+            if not options["keep"]:
+                with connection.cursor() as cursor:
+                    cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+
+    def load(self, options):
+        """Fill an unlogged copy of the trade table, then build the model's indexes on it."""
+        rows, now = options["rows"], timezone.now()
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+            cursor.execute(f'CREATE UNLOGGED TABLE {TABLE} (LIKE "{Trade._meta.db_table}")')
+            started = time.monotonic()
+            for first in range(1, rows + 1, options["batch"]):
+                last = min(first + options["batch"] - 1, rows)
+                cursor.execute(
+                    f"""
+                    INSERT INTO {TABLE} (id, ticker, price, quantity, side, timestamp)
+                    SELECT g, 'T' || (g %% %s), round((10 + random() * 990)::numeric, 2),
+                           1 + (random() * 99)::int, CASE WHEN g %% 2 = 0 THEN 'BUY' ELSE 'SELL' END,
+                           %s::timestamptz - random() * %s * interval '1 day'
+                    FROM generate_series(%s, %s) AS g
+                    """,
+                    [options["tickers"], now, options["days"], first, last],
+                )
+                self.stdout.write(f"Loaded {last:,} / {rows:,} trades ({time.monotonic() - started:.0f}s)")
+
+            cursor.execute(f"ALTER TABLE {TABLE} ADD PRIMARY KEY (id)")
+            for index in Trade._meta.indexes:
+                columns = ", ".join(f'"{field}"' for field in index.fields)
+                cursor.execute(f"CREATE INDEX {index.name}_bench ON {TABLE} ({columns})")
+            cursor.execute(f"ANALYZE {TABLE}")
+            self.stdout.write(f"Indexed and analyzed in {time.monotonic() - started:.0f}s total")
+
+    def compare(self, options):
+        end = timezone.localdate()
+        start = end - timedelta(days=options["range_days"] - 1)
+        start_date, end_date = start.isoformat(), end.isoformat()
+        old = {"timestamp__date__gte": start_date, "timestamp__date__lte": end_date}
+        new = trade_date_range(start_date, end_date)
+
+        self.stdout.write(f"\nTrades from {start_date} to {end_date} ({options['range_days']} days)")
+        self.stdout.write(f"{'query':<32} {'filter':<10} {'median ms':>10} {'buffers':>10}  scans")
+        for label, filters in (("ticker + dates, count", {"ticker": "T1"}), ("dates only, count", {})):
+            for name, dates in (("date cast", old), ("range", new)):
+                queryset = Trade.objects.filter(**filters, **dates)
+                sql, params = queryset.query.sql_with_params()
+                sql = sql.replace(f'"{Trade._meta.db_table}"', TABLE)
+                # The paginated list view counts every match before fetching a page
+                timings, plan = [], None
+                with connection.cursor() as cursor:
+                    for _ in range(options["repeat"]):
+                        cursor.execute(
+                            f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) SELECT count(*) FROM ({sql}) matches", params
+                        )
+                        result = cursor.fetchone()[0]
+                        plan = (result if isinstance(result, list) else json.loads(result))[0]
+                        timings.append(plan["Execution Time"])
+                # Buffer counts of a node include its children's
+                buffers = plan["Plan"]["Shared Hit Blocks"] + plan["Plan"]["Shared Read Blocks"]
+                self.stdout.write(
+                    f"{label:<32} {name:<10} {median(timings):>10,.1f} {buffers:>10,}  {scan_summary(plan['Plan'])}"
+                )
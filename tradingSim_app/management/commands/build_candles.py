@@ -0,0 +1,35 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from tradingSim_app.candles import INTERVAL_SECONDS, rollup_ticks, save_candles
+from tradingSim_app.models import StockPrice
+
+
+class Command(BaseCommand):
+    help = "Roll stored StockPrice ticks up into candles (live ticks are rolled up as they arrive)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ticker", action="append", help="Ticker to roll up (repeatable; default all)")
+        parser.add_argument("--days", type=float, default=1, help="How far back to read ticks")
+        parser.add_argument("--interval", action="append", choices=list(INTERVAL_SECONDS),
+                            help="Interval to build (repeatable; default all)")
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(days=options["days"])
+        ticks = StockPrice.objects.filter(timestamp__gte=since).exclude(price__lte=0)
+        tickers = options["ticker"] or ticks.values_list("ticker", flat=True).distinct()
+        intervals = options["interval"] or list(INTERVAL_SECONDS)
+
+        total = 0
+        for ticker in tickers:
+            rows = list(ticks.filter(ticker=ticker).values_list("timestamp", "price"))
+            if not rows:
+                continue
+            timestamps, prices = zip(*rows)
+            candles = rollup_ticks(ticker, timestamps, prices, intervals)
+            save_candles(candles)
+            total += len(candles)
+            self.stdout.write(f"{ticker}: {len(rows)} ticks -> {len(candles)} candles")
+        if not total:
+            raise CommandError("No ticks found in the requested range")
+        self.stdout.write(self.style.SUCCESS(f"Stored {total} candles"))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from tradingSim_app.positions import rebuild_positions
+
+
+class Command(BaseCommand):
+    help = "Recompute positions and FIFO realized P&L from the full trade history"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ticker", action="append", help="Ticker to rebuild (repeatable; default all)")
+
+    def handle(self, *args, **options):
+        tickers = [ticker.upper() for ticker in options["ticker"]] if options["ticker"] else None
+        positions = rebuild_positions(tickers)
+        for ticker, position in positions.items():
+            self.stdout.write(str(position) if position else f"{ticker}: no trades, position removed")
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(positions)} positions"))
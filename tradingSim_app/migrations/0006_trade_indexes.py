@@ -0,0 +1,21 @@
+# Generated by Django 5.0.1 on 2026-10-18 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tradingSim_app', '0005_candle'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='trade',
+            index=models.Index(fields=['ticker', 'timestamp'], name='trade_ticker_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trade',
+            index=models.Index(fields=['timestamp'], name='trade_ts_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.1 on 2026-10-18 10:33
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tradingSim_app', '0007_position'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='stockprice',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
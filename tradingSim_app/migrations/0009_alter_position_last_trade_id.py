@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-18 10:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tradingSim_app', '0008_stockprice_tick_timestamp'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='position',
+            name='last_trade_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -13,6 +13,12 @@ class Trade(models.Model):
     quantity = models.IntegerField(validators=[MinValueValidator(1)])
     side = models.CharField(max_length=4, choices=SIDE_CHOICES)
     timestamp = models.DateTimeField(default=timezone.now)
+    class Meta:
+        # Listings filter on ticker and/or a timestamp range
+        indexes = [
+            models.Index(fields=['ticker', 'timestamp'], name='trade_ticker_ts_idx'),
+            models.Index(fields=['timestamp'], name='trade_ts_idx'),
+        ]
     
     def __str__(self):
         return f"{self.side} {self.quantity} {self.ticker} @ {self.price}"
@@ -20,9 +26,46 @@ class Trade(models.Model):
 class StockPrice(models.Model):
     ticker = models.CharField(max_length=10)
     price = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(0.01)])
-    timestamp = models.DateTimeField(auto_now=True)
+    # Set by the tick writer when the tick arrives, not when its batch is flushed
+    timestamp = models.DateTimeField(default=timezone.now)
     moving_average_5min = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     class Meta:
         unique_together = ('ticker', 'timestamp')
     def __str__(self):
-        return f"{self.ticker}: {self.price} ({self.timestamp}) (MA: {self.moving_average_5min})"
\ No newline at end of file
+        return f"{self.ticker}: {self.price} ({self.timestamp}) (MA: {self.moving_average_5min})"
+class Candle(models.Model):
+    INTERVAL_CHOICES = (
+        ('1s', '1 second'),
+        ('1m', '1 minute'),
+        ('5m', '5 minutes'),
+        ('1h', '1 hour'),
+    )
+
+    ticker = models.CharField(max_length=10)
+    interval = models.CharField(max_length=2, choices=INTERVAL_CHOICES)
+    start = models.DateTimeField()
+    open = models.DecimalField(max_digits=10, decimal_places=2)
+    high = models.DecimalField(max_digits=10, decimal_places=2)
+    low = models.DecimalField(max_digits=10, decimal_places=2)
+    close = models.DecimalField(max_digits=10, decimal_places=2)
+    ticks = models.IntegerField(default=0)
+    class Meta:
+        unique_together = ('ticker', 'interval', 'start')
+    def __str__(self):
+        return f"{self.ticker} {self.interval} {self.start}: O {self.open} H {self.high} L {self.low} C {self.close}"
+
+class Position(models.Model):
+    ticker = models.CharField(max_length=10, unique=True)
+    # Net shares: positive long, negative short
+    quantity = models.IntegerField(default=0)
+    average_cost = models.DecimalField(max_digits=14, decimal_places=4, default=0)
+    realized_pnl = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    # Open FIFO lots, oldest first: [[signed quantity, "price"], ...]
+    lots = models.JSONField(default=list)
+    trade_count = models.IntegerField(default=0)
+    # (timestamp, id) of the last trade applied; later ones are applied incrementally
+    last_timestamp = models.DateTimeField(null=True, blank=True)
+    last_trade_id = models.BigIntegerField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    def __str__(self):
+        return f"{self.ticker}: {self.quantity} @ {self.average_cost} (realized {self.realized_pnl})"
@@ -0,0 +1,140 @@
+from collections import deque
+from decimal import Decimal
+from operator import itemgetter
+from django.db import transaction
+from .models import Position, Trade
+
+COST_PLACES = Decimal('0.0001')
+PNL_PLACES = Decimal('0.01')
+
+
+class FifoBook:
+    """Open lots of one ticker and the P&L realized by closing them first in, first out.
+
+    Lots carry a signed quantity: positive long, negative short. A trade
+    against the open direction closes the oldest lots first and any
+    remainder opens a lot the other way.
+    """
+
+    def __init__(self, lots=(), realized=0):
+        self.lots = deque([int(quantity), Decimal(price)] for quantity, price in lots)
+        self.realized = Decimal(realized)
+
+    def apply(self, side, quantity, price):
+        signed = quantity if side == 'BUY' else -quantity
+        price = Decimal(price)
+        while signed and self.lots and (self.lots[0][0] > 0) != (signed > 0):
+            lot = self.lots[0]
+            direction = 1 if lot[0] > 0 else -1
+            closed = min(abs(signed), abs(lot[0]))
+            self.realized += (price - lot[1]) * closed * direction
+            lot[0] -= closed * direction
+            signed += closed * direction
+            if lot[0] == 0:
+                self.lots.popleft()
+        if signed:
+            self.lots.append([signed, price])
+
+    @property
+    def quantity(self):
+        return sum(quantity for quantity, _ in self.lots)
+
+    @property
+    def average_cost(self):
+        shares = sum(abs(quantity) for quantity, _ in self.lots)
+        if not shares:
+            return Decimal(0)
+        cost = sum(abs(quantity) * price for quantity, price in self.lots)
+        return (cost / shares).quantize(COST_PLACES)
+
+    def store(self, position):
+        position.quantity = self.quantity
+        position.average_cost = self.average_cost
+        position.realized_pnl = self.realized.quantize(PNL_PLACES)
+        position.lots = [[quantity, str(price)] for quantity, price in self.lots]
+
+
+def apply_trade(trade):
+    """Fold a newly created trade into its ticker's position.
+
+    A trade later than the last one applied only touches the open lots. One
+    that sorts earlier changes the FIFO order, so the ticker is replayed.
+    """
+    with transaction.atomic():
+        position, _ = Position.objects.select_for_update().get_or_create(ticker=trade.ticker)
+        if position.last_timestamp is not None and (
+            (trade.timestamp, trade.pk) < (position.last_timestamp, position.last_trade_id)
+        ):
+            return rebuild_position(trade.ticker)
+
+        book = FifoBook(position.lots, position.realized_pnl)
+        book.apply(trade.side, trade.quantity, trade.price)
+        book.store(position)
+        position.trade_count += 1
+        position.last_timestamp, position.last_trade_id = trade.timestamp, trade.pk
+        position.save()
+        return position
+
+
+def apply_trades(ticker, fills):
+    """Fold a batch of newly inserted trades of one ticker into its position.
+
+    ``fills`` are ``(timestamp, side, quantity, price)`` tuples in insertion
+    order. When all of them are later than the last trade applied, they go
+    on top of the open lots in timestamp order; a back-dated batch replays
+    the ticker instead.
+    """
+    # Stable sort: trades with the same timestamp keep their insertion (id) order
+    fills = sorted(fills, key=itemgetter(0))
+    with transaction.atomic():
+        position, _ = Position.objects.select_for_update().get_or_create(ticker=ticker)
+        if position.last_timestamp is not None and fills[0][0] <= position.last_timestamp:
+            return rebuild_position(ticker)
+
+        book = FifoBook(position.lots, position.realized_pnl)
+        for _, side, quantity, price in fills:
+            book.apply(side, quantity, price)
+        book.store(position)
+        position.trade_count += len(fills)
+        position.last_timestamp = fills[-1][0]
+        # COPY returns no ids: the last trade applied is the newest one at its timestamp
+        position.last_trade_id = (
+            Trade.objects.filter(ticker=ticker, timestamp=position.last_timestamp)
+            .order_by('-id').values_list('id', flat=True).first()
+        )
+        position.save()
+        return position
+
+
+def rebuild_position(ticker):
+    """Recompute a ticker's position by replaying its trades; None once it has none."""
+    with transaction.atomic():
+        position = Position.objects.select_for_update().filter(ticker=ticker).first() or Position(ticker=ticker)
+        book, count, last = FifoBook(), 0, (None, None)
+        trades = (
+            Trade.objects.filter(ticker=ticker)
+            .order_by('timestamp', 'id')
+            .values_list('side', 'quantity', 'price', 'timestamp', 'id')
+        )
+        for side, quantity, price, timestamp, pk in trades.iterator(chunk_size=10000):
+            book.apply(side, quantity, price)
+            count += 1
+            last = (timestamp, pk)
+
+        if not count:
+            if position.pk:
+                position.delete()
+            return None
+        book.store(position)
+        position.trade_count = count
+        position.last_timestamp, position.last_trade_id = last
+        position.save()
+        return position
+
+
+def rebuild_positions(tickers=None):
+    """Rebuild the given tickers, or every ticker with trades or a stored position."""
+    if tickers is None:
+        tickers = set(Trade.objects.values_list('ticker', flat=True).distinct())
+        tickers |= set(Position.objects.values_list('ticker', flat=True))
+    return {ticker: rebuild_position(ticker) for ticker in sorted(tickers)}
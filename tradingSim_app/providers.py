@@ -0,0 +1,239 @@
+import re
+import time
+import zlib
+import threading
+import numpy as np
+import pandas as pd
+import yfinance as yf
+from django.conf import settings
+
+HISTORY_COLUMNS = ['Date', 'Open', 'High', 'Low', 'Close', 'Volume']
+
+
+class MarketDataProvider:
+    """Source of live quotes and daily price history.
+
+    ``quote`` returns ``{"ticker", "open", "price"}``: the session's opening
+    price and the latest one. ``history`` returns daily bars with
+    ``HISTORY_COLUMNS``. Both raise ``ValueError`` when there is no data.
+    """
+
+    def quote(self, ticker):
+        raise NotImplementedError
+
+    def quotes(self, tickers):
+        """Quote several tickers; a ticker that failed maps to its exception."""
+        results = {}
+        for ticker in tickers:
+            try:
+                results[ticker] = self.quote(ticker)
+            except Exception as e:
+                results[ticker] = e
+        return results
+
+    def history(self, ticker, period="2y"):
+        raise NotImplementedError
+
+
+class YFinanceProvider(MarketDataProvider):
+    """Live data from Yahoo Finance."""
+
+    def quote(self, ticker):
+        data = yf.Ticker(ticker).history(period="1d", interval="1m")
+        if data.empty:
+            raise ValueError("No data found")
+        return {"ticker": ticker, "open": float(data["Open"].iloc[0]), "price": float(data["Close"].iloc[-1])}
+
+    def quotes(self, tickers):
+        """All tickers' intraday bars in one batched download rather than a call per ticker."""
+        tickers = list(tickers)
+        try:
+            data = yf.download(tickers, period="1d", interval="1m", group_by="ticker", progress=False, threads=True)
+        except Exception as e:
+            return {ticker: e for ticker in tickers}
+
+        results = {}
+        for ticker in tickers:
+            if data is None or data.empty:
+                bars = None
+            elif data.columns.nlevels > 1:
+                bars = data[ticker] if ticker in data.columns.get_level_values(0) else None
+            else:
+                bars = data if len(tickers) == 1 else None
+            opens = bars["Open"].dropna() if bars is not None else ()
+            closes = bars["Close"].dropna() if bars is not None else ()
+            if not len(opens) or not len(closes):
+                results[ticker] = ValueError("No data found")
+                continue
+            results[ticker] = {"ticker": ticker, "open": float(opens.iloc[0]), "price": float(closes.iloc[-1])}
+        return results
+
+    def history(self, ticker, period="2y"):
+        data = yf.download(ticker, period=period)
+        if data.empty:
+            raise ValueError(f"No data found for {ticker}")
+        # Newer yfinance versions return (field, ticker) columns even for one ticker
+        if data.columns.nlevels > 1:
+            data.columns = data.columns.get_level_values(0)
+        return data[HISTORY_COLUMNS[1:]].reset_index()
+
+
+class ReplayProvider(MarketDataProvider):
+    """Replays stored daily bars as live quotes, ``speed`` bars per second.
+
+    Reads a CSV (``infy_stock_data.csv`` by default) or a stored dataset. A
+    single series is served for every ticker; a ``Ticker`` column or a
+    multi-ticker dataset gives each ticker its own series. Replay loops back
+    to the first bar after the last one.
+    """
+
+    def __init__(self, path=None, dataset=None, speed=1.0):
+        self.speed = float(speed)
+        self.series = {}
+        if dataset is not None:
+            from algo_trading.models import Dataset
+            from algo_trading.datasets import load_slice
+
+            stored = Dataset.objects.get(pk=dataset)
+            for ticker in stored.ticker_index:
+                columns = load_slice(stored, ticker, columns=HISTORY_COLUMNS)
+                self.series[ticker] = pd.DataFrame(columns)
+        else:
+            df = pd.read_csv(path or settings.BASE_DIR / "infy_stock_data.csv", parse_dates=['Date'])
+            df = df.dropna(subset=['Close']).sort_values('Date')
+            if 'Ticker' in df.columns:
+                for ticker, bars in df.groupby('Ticker'):
+                    self.series[str(ticker)] = bars[HISTORY_COLUMNS].reset_index(drop=True)
+            else:
+                self.series[None] = df[HISTORY_COLUMNS].reset_index(drop=True)
+        if not self.series:
+            raise ValueError("Nothing to replay")
+        self.started = time.monotonic()
+
+    def _bars(self, ticker):
+        if ticker in self.series:
+            return self.series[ticker]
+        if len(self.series) == 1:
+            return next(iter(self.series.values()))
+        raise ValueError("No data found")
+
+    def quote(self, ticker):
+        bars = self._bars(ticker)
+        row = int((time.monotonic() - self.started) * self.speed) % len(bars)
+        return {"ticker": ticker, "open": float(bars['Open'].iat[row]), "price": float(bars['Close'].iat[row])}
+
+    def history(self, ticker, period="2y"):
+        bars = self._bars(ticker)
+        return bars.tail(period_days(period)).reset_index(drop=True)
+
+
+class SyntheticProvider(MarketDataProvider):
+    """Geometric Brownian motion prices for any number of tickers.
+
+    Every ticker advances one step per ``tick_seconds`` of wall time, all of
+    them with a single vectorized draw, so thousands of symbols cost one numpy
+    call per tick. Starting prices and draws are seeded, so the price paths
+    are reproducible.
+    """
+
+    def __init__(self, seed=0, volatility=0.001, drift=0.0, tick_seconds=1.0):
+        self.seed = seed
+        self.volatility = volatility
+        self.drift = drift
+        self.tick_seconds = tick_seconds
+        self.rng = np.random.default_rng(seed)
+        self._index = {}
+        self._open = np.empty(0)
+        self._price = np.empty(0)
+        self._last_step = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _register(self, tickers):
+        new = [t for t in dict.fromkeys(tickers) if t not in self._index]
+        if new:
+            start = np.array([start_price(t) for t in new])
+            for ticker in new:
+                self._index[ticker] = len(self._index)
+            self._open = np.concatenate((self._open, start))
+            self._price = np.concatenate((self._price, start))
+
+    def step(self, steps=1):
+        """Advance every ticker by ``steps`` ticks at once."""
+        shocks = self.rng.standard_normal(len(self._price))
+        sigma = self.volatility
+        self._price *= np.exp((self.drift - 0.5 * sigma ** 2) * steps + sigma * np.sqrt(steps) * shocks)
+
+    def quotes(self, tickers):
+        with self._lock:
+            self._register(tickers)
+            steps = int((time.monotonic() - self._last_step) / self.tick_seconds)
+            if steps:
+                self.step(steps)
+                self._last_step += steps * self.tick_seconds
+            rows = np.array([self._index[t] for t in tickers], dtype=np.intp)
+            opens, prices = self._open[rows].tolist(), self._price[rows].tolist()
+        return {t: {"ticker": t, "open": o, "price": p} for t, o, p in zip(tickers, opens, prices)}
+
+    def quote(self, ticker):
+        return self.quotes([ticker])[ticker]
+
+    def history(self, ticker, period="2y"):
+        days = period_days(period)
+        rng = np.random.default_rng([self.seed, zlib.crc32(ticker.encode())])
+        sigma = 0.02
+        close = start_price(ticker) * np.exp(np.cumsum(rng.normal(-0.5 * sigma ** 2, sigma, days)))
+        open_ = np.concatenate(([start_price(ticker)], close[:-1]))
+        spread = np.abs(rng.normal(0, sigma / 2, days)) * close
+        return pd.DataFrame({
+            'Date': pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=days),
+            'Open': open_,
+            'High': np.maximum(open_, close) + spread,
+            'Low': np.minimum(open_, close) - spread,
+            'Close': close,
+            'Volume': rng.integers(100_000, 10_000_000, days),
+        })
+
+
+def start_price(ticker):
+    """Stable starting price between 50 and 500 for a synthetic ticker."""
+    return 50.0 + zlib.crc32(ticker.encode()) % 45000 / 100
+
+
+def period_days(period):
+    """Trading days in a yfinance-style period such as ``5d``, ``6mo`` or ``2y``."""
+    match = re.fullmatch(r"(\d+)(d|mo|y)", period)
+    if not match:
+        raise ValueError(f"Unsupported period: {period}")
+    count, unit = int(match.group(1)), match.group(2)
+    return count * {"d": 1, "mo": 21, "y": 252}[unit]
+
+
+PROVIDERS = {
+    'yfinance': YFinanceProvider,
+    'replay': ReplayProvider,
+    'synthetic': SyntheticProvider,
+}
+
+_provider = None
+_provider_lock = threading.RLock()
+
+
+def configure_provider(backend, **options):
+    """Replace this process's provider, e.g. with synthetic data for a benchmark."""
+    global _provider
+    if backend not in PROVIDERS:
+        raise ValueError(f"Unknown market data backend: {backend}")
+    provider = PROVIDERS[backend](**options)
+    with _provider_lock:
+        _provider = provider
+    return provider
+
+
+def get_provider():
+    """The provider from ``settings.MARKET_DATA_PROVIDER``, created once per process."""
+    if _provider is None:
+        config = settings.MARKET_DATA_PROVIDER
+        with _provider_lock:
+            if _provider is None:
+                configure_provider(config['BACKEND'], **config.get('OPTIONS', {}))
+    return _provider
@@ -1,5 +1,8 @@
 from rest_framework import serializers
-from .models import Trade
+from .models import Trade, Candle, Position
+
+# Trade.quantity is a 32-bit integer column
+MAX_QUANTITY = 2 ** 31 - 1
 
 class TradeSerializer(serializers.ModelSerializer):
     class Meta:
@@ -11,7 +14,23 @@ class TradeSerializer(serializers.ModelSerializer):
         if not value.isalpha():
             raise serializers.ValidationError("Ticker must contain only letters")
         return value.upper()
+
+    def validate_quantity(self, value):
+        # Larger values pass the IntegerField but fail at insert
+        if value > MAX_QUANTITY:
+            raise serializers.ValidationError(f"Ensure this value is less than or equal to {MAX_QUANTITY}.")
+        return value
         
     def validate(self, data):
         # You can add cross-field validations here if needed
-        return data
\ No newline at end of file
+        return data
+
+class CandleSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Candle
+        fields = ['ticker', 'interval', 'start', 'open', 'high', 'low', 'close', 'ticks']
+
+class PositionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Position
+        fields = ['ticker', 'quantity', 'average_cost', 'realized_pnl', 'trade_count', 'updated_at']
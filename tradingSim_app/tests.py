@@ -1,3 +1,440 @@
-from django.test import TestCase
+import io
+import os
+import json
+import time
+import tempfile
+import threading
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.test import SimpleTestCase, TestCase, override_settings
+from . import providers, top_stocks
+from .candles import CandleAggregator, bucket_start, merge_candles, rollup_ticks
+from .models import Candle, Position, StockPrice, Trade
+from .pagination import TimestampCursorPagination
+from .positions import FifoBook, apply_trades, rebuild_position
+from .providers import HISTORY_COLUMNS, ReplayProvider, SyntheticProvider
 
-# Create your tests here.
+
+class ProviderTests(SimpleTestCase):
+    def test_synthetic_paths_are_seeded(self):
+        with mock.patch('tradingSim_app.providers.time.monotonic', return_value=1000.0):
+            first, second = SyntheticProvider(seed=3), SyntheticProvider(seed=3)
+            quotes = first.quotes(['AAPL', 'MSFT'])
+        self.assertEqual(quotes['AAPL']['price'], providers.start_price('AAPL'))
+        self.assertTrue(50 <= quotes['MSFT']['open'] < 500)
+
+        # Ten ticks of wall time advance every ticker, identically for the same seed
+        with mock.patch('tradingSim_app.providers.time.monotonic', return_value=1010.0):
+            moved = first.quotes(['AAPL', 'MSFT'])
+            again = second.quotes(['AAPL', 'MSFT'])
+        self.assertNotEqual(moved['AAPL']['price'], quotes['AAPL']['price'])
+        self.assertEqual(moved['AAPL']['open'], quotes['AAPL']['open'])
+        self.assertEqual(moved, again)
+
+    def test_synthetic_history(self):
+        history = SyntheticProvider().history('AAPL', period='3mo')
+        self.assertEqual(list(history.columns), HISTORY_COLUMNS)
+        self.assertEqual(len(history), 63)
+        self.assertTrue((history['High'] >= history[['Open', 'Close']].max(axis=1)).all())
+        self.assertTrue(history.equals(SyntheticProvider().history('AAPL', period='3mo')))
+
+    def test_replay_serves_each_ticker_its_own_bars(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'bars.csv')
+            with open(path, 'w') as f:
+                f.write("Date,Ticker,Open,High,Low,Close,Volume\n")
+                for day in range(1, 4):
+                    f.write(f"2024-01-0{day},AAA,{day},{day},{day},{day * 10},100\n")
+                    f.write(f"2024-01-0{day},BBB,{day},{day},{day},{day * 100},100\n")
+            provider = ReplayProvider(path=path, speed=1)
+
+        with mock.patch('tradingSim_app.providers.time.monotonic', return_value=provider.started + 1.5):
+            self.assertEqual(provider.quote('AAA')['price'], 20.0)
+            self.assertEqual(provider.quote('BBB')['price'], 200.0)
+        # Replay loops back to the first bar after the last
+        with mock.patch('tradingSim_app.providers.time.monotonic', return_value=provider.started + 3):
+            self.assertEqual(provider.quote('AAA')['price'], 10.0)
+        self.assertIsInstance(provider.quotes(['AAA', 'CCC'])['CCC'], ValueError)
+        self.assertEqual(len(provider.history('BBB', period='2d')), 2)
+
+    def test_unknown_backend_and_period(self):
+        with self.assertRaises(ValueError):
+            providers.configure_provider('nope')
+        with self.assertRaises(ValueError):
+            providers.period_days('2w')
+        self.assertEqual(providers.period_days('2y'), 504)
+
+
+def utc(hour, minute=0, second=0):
+    return datetime(2024, 3, 4, hour, minute, second, tzinfo=dt_timezone.utc)
+
+
+class CandleTests(TestCase):
+    def test_buckets_follow_local_wall_clock(self):
+        # 10:29:59 UTC is 15:59:59 in Asia/Kolkata, so its hour began at 10:30 UTC the hour before
+        self.assertEqual(bucket_start(utc(10, 29, 59), 3600), utc(9, 30))
+        self.assertEqual(bucket_start(utc(10, 31, 5), 300), utc(10, 30))
+        self.assertEqual(bucket_start(utc(10, 31, 5), 1), utc(10, 31, 5))
+
+    def test_aggregator_matches_a_rollup_of_the_same_ticks(self):
+        ticks = [(utc(10, 0, 1), 100), (utc(10, 0, 30), 104), (utc(10, 0, 59), 99), (utc(10, 1, 2), 101)]
+        aggregator = CandleAggregator({'1m': 60})
+        for when, price in ticks:
+            aggregator.add('AAPL', when, price)
+        live = aggregator.changed()
+        self.assertEqual(len(live), 1)  # Only the candle still open is reported
+
+        rolled = rollup_ticks('AAPL', *zip(*ticks), intervals=['1m'])
+        self.assertEqual([(c.start, c.open, c.high, c.low, c.close, c.ticks) for c in rolled], [
+            (utc(10, 0), 100, 104, 99, 99, 3),
+            (utc(10, 1), 101, 101, 101, 101, 1),
+        ])
+        self.assertEqual((live[0].start, live[0].close, live[0].ticks), (utc(10, 1), 101, 1))
+        self.assertEqual(aggregator.changed(), [])
+
+    def test_merge_combines_partial_candles_of_several_writers(self):
+        first, second = CandleAggregator({'1m': 60}), CandleAggregator({'1m': 60})
+        first.add('AAPL', utc(10, 0, 1), 100)
+        first.add('AAPL', utc(10, 0, 2), 105)
+        merge_candles(first.changed())
+        second.add('AAPL', utc(10, 0, 3), 98)
+        merge_candles(second.changed())
+        first.add('AAPL', utc(10, 0, 4), 102)
+        merge_candles(first.changed())
+
+        candle = Candle.objects.get()
+        self.assertEqual(
+            (candle.open, candle.high, candle.low, candle.close, candle.ticks),
+            (100, 105, 98, 102, 4),
+        )
+
+    def test_build_candles_replaces_stored_candles(self):
+        StockPrice.objects.bulk_create([
+            StockPrice(ticker='AAPL', price=price, timestamp=when)
+            for when, price in [(utc(10, 0, 1), 100), (utc(10, 0, 2), 0), (utc(10, 0, 30), 103)]
+        ])
+        Candle.objects.create(ticker='AAPL', interval='1m', start=utc(10), open=1, high=1, low=1, close=1, ticks=9)
+        with mock.patch('tradingSim_app.management.commands.build_candles.timezone.now', return_value=utc(12)):
+            call_command('build_candles', '--interval', '1m', stdout=io.StringIO())
+
+        # Failed fetches, stored with a 0 price, are left out
+        candle = Candle.objects.get()
+        self.assertEqual((candle.low, candle.high, candle.ticks), (100, 103, 2))
+
+
+class CandleViewTests(TestCase):
+    def setUp(self):
+        Candle.objects.bulk_create([
+            Candle(ticker='AAPL', interval='1m', start=utc(10, minute), open=100, high=101, low=99, close=100 + minute, ticks=1)
+            for minute in range(5)
+        ])
+
+    def test_latest_candles_of_the_range_oldest_first(self):
+        response = self.client.get('/api/candles/', {'ticker': 'AAPL', 'limit': 2, 'end': '2024-03-04T15:34:00'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['close'] for row in response.json()], ['102.00', '103.00'])
+
+        response = self.client.get('/api/candles/', {'ticker': 'AAPL', 'start': '2024-03-04T10:03:00+00:00'})
+        self.assertEqual(len(response.json()), 2)
+
+    def test_bad_parameters(self):
+        for params in [
+            {},
+            {'ticker': 'AAPL', 'interval': '2m'},
+            {'ticker': 'AAPL', 'limit': 0},
+            {'ticker': 'AAPL', 'limit': 'ten'},
+            {'ticker': 'AAPL', 'start': 'yesterday'},
+        ]:
+            self.assertEqual(self.client.get('/api/candles/', params).status_code, 400, params)
+
+
+def trade(ticker, when, side='BUY', quantity=1, price=100):
+    return Trade(ticker=ticker, price=price, quantity=quantity, side=side, timestamp=when)
+
+
+class TradeDateRangeTests(TestCase):
+    def test_dates_are_whole_local_days(self):
+        # 4 March in Asia/Kolkata runs from 18:30 UTC on the 3rd to 18:30 UTC on the 4th
+        Trade.objects.bulk_create([
+            trade('AAPL', datetime(2024, 3, 3, 18, 29, 59, tzinfo=dt_timezone.utc)),
+            trade('AAPL', datetime(2024, 3, 3, 18, 30, tzinfo=dt_timezone.utc)),
+            trade('AAPL', datetime(2024, 3, 4, 18, 29, 59, tzinfo=dt_timezone.utc)),
+            trade('MSFT', datetime(2024, 3, 4, 12, 0, tzinfo=dt_timezone.utc)),
+            trade('AAPL', datetime(2024, 3, 4, 18, 30, tzinfo=dt_timezone.utc)),
+        ])
+        day = {'start_date': '2024-03-04', 'end_date': '2024-03-04'}
+        self.assertEqual(self.client.get('/api/trades/', day).json()['count'], 3)
+        self.assertEqual(self.client.get('/api/trades/', {**day, 'ticker': 'aapl'}).json()['count'], 2)
+        self.assertEqual(self.client.get('/api/trades/', {'start_date': '2024-03-05'}).json()['count'], 1)
+        self.assertEqual(self.client.get('/api/trades/', {'end_date': '2024-03-03'}).json()['count'], 1)
+
+    def test_invalid_date(self):
+        response = self.client.get('/api/trades/', {'start_date': '2024-02-30'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('start_date', response.json())
+
+
+@mock.patch.object(TimestampCursorPagination, 'page_size', 4)
+class CursorPaginationTests(TestCase):
+    def setUp(self):
+        # Runs of trades sharing a timestamp straddle the page edges
+        Trade.objects.bulk_create([trade('AAPL', utc(10, i // 3)) for i in range(14)])
+        self.expected = list(Trade.objects.order_by('-timestamp', '-id').values_list('id', flat=True))
+
+    def pages(self, url, link):
+        pages = []
+        while url:
+            body = self.client.get(url).json()
+            pages.append([row['id'] for row in body['results']])
+            url = body[link]
+        return pages, body
+
+    def test_pages_forward_and_back_without_gaps(self):
+        forward, last = self.pages('/api/trades/?pagination=cursor', 'next')
+        self.assertEqual([len(page) for page in forward], [4, 4, 4, 2])
+        self.assertEqual(sum(forward, []), self.expected)
+        self.assertIsNone(last['next'])
+
+        backward, first = self.pages(last['previous'], 'previous')
+        self.assertEqual(backward, forward[-2::-1])
+        self.assertIsNone(first['previous'])
+        self.assertIsNotNone(first['next'])
+
+    def test_filters_apply_and_bad_cursors_are_rejected(self):
+        Trade.objects.create(ticker='MSFT', price=100, quantity=1, side='BUY', timestamp=utc(10))
+        forward, _ = self.pages('/api/trades/?pagination=cursor&ticker=AAPL', 'next')
+        self.assertEqual(sum(forward, []), self.expected)
+        self.assertEqual(self.client.get('/api/trades/', {'cursor': 'not-a-cursor'}).status_code, 404)
+
+
+def fill(ticker='AAPL', side='BUY', quantity=10, price='100.00', **extra):
+    return {'ticker': ticker, 'side': side, 'quantity': quantity, 'price': price, **extra}
+
+
+@override_settings(TRADE_BULK_CHUNK_SIZE=2)
+class BulkIngestTests(TestCase):
+    def post(self, rows, content_type='application/json'):
+        body = rows if isinstance(rows, str) else json.dumps(rows)
+        return self.client.post('/api/trades/bulk/', body, content_type=content_type)
+
+    def test_valid_rows_are_created(self):
+        response = self.post([fill(), fill(side='SELL', quantity=4, price=110), fill('msft', price=300.5)])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json(), {'created': 3, 'failed': 0, 'errors': []})
+        self.assertEqual(Trade.objects.filter(ticker='MSFT').count(), 1)
+        self.assertEqual(Position.objects.get(ticker='AAPL').quantity, 6)
+
+    def test_bad_rows_are_reported_by_index(self):
+        rows = [fill(), fill(quantity=0), fill(price='1.234'), fill(side='HOLD'), fill(quantity=2 ** 31), fill()]
+        response = self.post(rows)
+        self.assertEqual(response.status_code, 207)
+        body = response.json()
+        self.assertEqual((body['created'], body['failed']), (2, 4))
+        self.assertEqual([error['row'] for error in body['errors']], [1, 2, 3, 4])
+        self.assertIn('quantity', body['errors'][3]['errors'])
+
+        self.assertEqual(self.post([fill(quantity=-1)]).status_code, 400)
+        self.assertEqual(self.post({'ticker': 'AAPL'}).status_code, 400)
+        self.assertEqual(Trade.objects.count(), 2)
+
+    def test_ndjson_stream(self):
+        lines = '\n'.join([json.dumps(fill()), '{not json', '', json.dumps(fill(side='SELL', quantity=3))])
+        response = self.post(lines, content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.json()['errors'][0]['row'], 1)
+        self.assertEqual(Position.objects.get(ticker='AAPL').quantity, 7)
+
+    @override_settings(TRADE_BULK_MAX_ROWS=2, TRADE_BULK_MAX_BYTES=1000)
+    def test_request_limits(self):
+        response = self.post([fill()] * 3)
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.json()['errors'][0]['row'], 2)
+        self.assertEqual(self.post([fill()] * 20).status_code, 413)
+
+    def test_a_failed_chunk_is_rolled_back_and_reported(self):
+        bulk_create = Trade.objects.bulk_create
+        calls = []
+
+        def fail_second_chunk(trades, **kwargs):
+            # Inserted, then failed, inside the chunk's transaction
+            calls.append(bulk_create(trades, **kwargs))
+            if len(calls) == 2:
+                raise DatabaseError("disk full")
+
+        with mock.patch.object(Trade.objects, 'bulk_create', fail_second_chunk):
+            response = self.post([fill(quantity=quantity) for quantity in range(1, 6)])
+        body = response.json()
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual((body['created'], [error['row'] for error in body['errors']]), (3, [2, 3]))
+        self.assertIn('disk full', body['errors'][0]['errors']['non_field_errors'][0])
+        self.assertEqual(sorted(Trade.objects.values_list('quantity', flat=True)), [1, 2, 5])
+        self.assertEqual(Position.objects.get(ticker='AAPL').quantity, 8)
+
+
+def position_state(position):
+    lots = [(quantity, Decimal(price)) for quantity, price in position.lots]
+    return (position.quantity, position.average_cost, position.realized_pnl, lots, position.trade_count)
+
+
+class FifoBookTests(SimpleTestCase):
+    def test_oldest_lots_close_first(self):
+        book = FifoBook()
+        book.apply('BUY', 10, '100')
+        book.apply('BUY', 10, '110')
+        book.apply('SELL', 15, '120')  # Closes 10 @ 100 and 5 @ 110
+        self.assertEqual(book.realized, Decimal('250'))
+        self.assertEqual((book.quantity, book.average_cost), (5, Decimal('110.0000')))
+
+    def test_selling_through_zero_opens_a_short(self):
+        book = FifoBook([[5, '110']], realized='250')
+        book.apply('SELL', 8, '90')
+        book.apply('BUY', 2, '80')  # Covers 2 of the 3 short @ 90
+        self.assertEqual(book.realized, Decimal('170'))
+        self.assertEqual([(quantity, str(price)) for quantity, price in book.lots], [(-1, '90')])
+
+
+class PositionTests(TestCase):
+    def post(self, **row):
+        response = self.client.post('/api/trades/', fill(**row), content_type='application/json')
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.json()
+
+    def assertMatchesRebuild(self, ticker):
+        position = Position.objects.get(ticker=ticker)
+        self.assertEqual(position_state(position), position_state(rebuild_position(ticker)))
+
+    def test_trades_update_the_position_as_they_arrive(self):
+        self.post(quantity=10, price=100, timestamp='2024-03-04T10:00:00Z')
+        self.post(side='SELL', quantity=4, price=110, timestamp='2024-03-04T11:00:00Z')
+
+        response = self.client.get('/api/positions/aapl/')
+        self.assertEqual(response.json()['quantity'], 6)
+        self.assertEqual(response.json()['realized_pnl'], '40.00')
+        self.assertMatchesRebuild('AAPL')
+
+    def test_back_dated_edits_and_deletes_replay_the_ticker(self):
+        self.post(quantity=10, price=100, timestamp='2024-03-04T10:00:00Z')
+        self.post(side='SELL', quantity=10, price=120, timestamp='2024-03-04T12:00:00Z')
+        early = self.post(quantity=10, price=90, timestamp='2024-03-04T09:00:00Z')
+        # The sell now closes the 90 lot first
+        self.assertEqual(Position.objects.get(ticker='AAPL').realized_pnl, Decimal('300.00'))
+        self.assertMatchesRebuild('AAPL')
+
+        self.client.patch(f"/api/trades/{early['id']}/", {'ticker': 'MSFT'}, content_type='application/json')
+        self.assertEqual(Position.objects.get(ticker='AAPL').realized_pnl, Decimal('200.00'))
+        self.assertEqual(Position.objects.get(ticker='MSFT').quantity, 10)
+
+        self.client.delete(f"/api/trades/{early['id']}/")
+        self.assertFalse(Position.objects.filter(ticker='MSFT').exists())
+
+    def test_bulk_batches_fold_in_like_a_rebuild(self):
+        def insert(*rows):
+            trades = Trade.objects.bulk_create([
+                trade('AAPL', utc(*when), side, quantity, price) for when, side, quantity, price in rows
+            ])
+            return apply_trades('AAPL', [(t.timestamp, t.side, t.quantity, Decimal(t.price)) for t in trades])
+
+        insert(((10,), 'BUY', 10, 100), ((10,), 'BUY', 5, 101), ((11,), 'SELL', 12, 105))
+        self.assertMatchesRebuild('AAPL')
+        position = insert(((12,), 'SELL', 10, 110))
+        self.assertEqual(position.quantity, -7)
+        self.assertMatchesRebuild('AAPL')
+
+        # A batch reaching back before the last trade applied replays the ticker
+        with mock.patch('tradingSim_app.positions.rebuild_position', wraps=rebuild_position) as replay:
+            insert(((13,), 'BUY', 7, 100), ((9,), 'BUY', 1, 95))
+        replay.assert_called_once_with('AAPL')
+        self.assertMatchesRebuild('AAPL')
+
+    def test_rebuild_positions_command(self):
+        Trade.objects.bulk_create([trade('AAPL', utc(10), quantity=3), trade('MSFT', utc(10))])
+        Position.objects.create(ticker='GONE', quantity=1)
+        out = io.StringIO()
+        call_command('rebuild_positions', stdout=out)
+
+        self.assertIn('Rebuilt 3 positions', out.getvalue())
+        self.assertEqual(dict(Position.objects.values_list('ticker', 'quantity')), {'AAPL': 3, 'MSFT': 1})
+
+
+class FakeProvider:
+    def __init__(self, price=110.0):
+        self.calls = 0
+        self.price = price
+        self.release = threading.Event()
+        self.release.set()
+
+    def quotes(self, tickers):
+        self.calls += 1
+        self.release.wait(5)
+        if self.price is None:
+            return {ticker: ValueError("No data found") for ticker in tickers}
+        return {ticker: {'ticker': ticker, 'open': 100.0, 'price': self.price} for ticker in tickers}
+
+
+@override_settings(TOP_STOCKS_TICKERS=['AAA', 'BBB'], MARKET_DATA_TIMEOUT=0.1)
+class TopStocksTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.provider = FakeProvider()
+        patcher = mock.patch.object(top_stocks, 'get_provider', return_value=self.provider)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.provider.release.set)
+
+    def wait_for_refresh(self):
+        top_stocks._refresher.submit(lambda: None).result()
+
+    def test_rows_are_fetched_once_and_cached(self):
+        response = self.client.get('/api/top-stocks/')
+        self.assertEqual(response.json()[0], {'ticker': 'AAA', 'price': 110.0, 'change': 10.0, 'percent_change': 10.0})
+        self.client.get('/api/top-stocks/')
+        self.assertEqual(self.provider.calls, 1)
+
+    def test_stale_rows_are_served_while_one_refresh_runs(self):
+        stale = [{'ticker': 'AAA', 'price': 1.0}]
+        cache.set(top_stocks.CACHE_KEY, {'rows': stale, 'fetched_at': time.time() - 60})
+        self.assertEqual(top_stocks.top_stocks(), stale)
+        self.assertEqual(top_stocks.top_stocks(), stale)  # The lock is held: no second refresh
+        self.wait_for_refresh()
+
+        self.assertEqual(self.provider.calls, 1)
+        self.assertEqual(top_stocks.top_stocks()[0]['price'], 110.0)
+        self.assertIsNone(cache.get(top_stocks.REFRESH_LOCK_KEY))
+
+    def test_failed_refresh_keeps_the_last_good_rows(self):
+        top_stocks.top_stocks()
+        self.provider.price = None
+        cache.add(top_stocks.REFRESH_LOCK_KEY, 1)
+        self.assertEqual(top_stocks.refresh()[0]['price'], 110.0)
+
+        with mock.patch.object(top_stocks, 'refresh', side_effect=RuntimeError("cache down")):
+            with self.assertLogs('tradingSim_app.top_stocks', 'ERROR'):
+                top_stocks._background_refresh()
+
+    def test_a_hung_provider_times_out(self):
+        self.provider.release.clear()
+        rows = top_stocks.top_stocks()
+        self.assertTrue(all('No quotes after' in row['error'] for row in rows))
+
+    def test_timed_out_calls_do_not_pile_up(self):
+        self.provider.release.clear()
+        for _ in range(3):
+            self.assertTrue(all(isinstance(quote, TimeoutError) for quote in top_stocks.fetch_quotes(['AAA']).values()))
+        self.provider.release.set()
+        top_stocks._fetcher.submit(lambda: None).result()
+        self.assertEqual(self.provider.calls, 1)
+
+        # Once it has finished, the next refresh makes a fresh call
+        self.assertEqual(top_stocks.fetch_quotes(['AAA'])['AAA']['price'], 110.0)
+        self.assertEqual(self.provider.calls, 2)
+
+    def test_waiters_do_not_refresh_without_the_lock(self):
+        cache.add(top_stocks.REFRESH_LOCK_KEY, 1, 60)
+        rows = top_stocks.top_stocks()
+        self.assertEqual(self.provider.calls, 0)
+        self.assertTrue(all('still being fetched' in row['error'] for row in rows))
@@ -0,0 +1,138 @@
+import math
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from django.conf import settings
+from django.core.cache import cache
+from .providers import get_provider
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY = "top-stocks"
+# Held while one caller refreshes, so a burst of requests triggers one upstream fetch
+REFRESH_LOCK_KEY = "top-stocks:refreshing"
+
+_refresher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="top-stocks")
+# Runs the provider call so a refresh can stop waiting for it after MARKET_DATA_TIMEOUT.
+# At most one call is in flight: while it hangs, later refreshes wait on that same
+# call (and time out) rather than queueing calls of their own behind it
+_fetcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="top-stocks-fetch")
+_fetch_lock = threading.Lock()
+_in_flight = None
+
+
+def stock_row(ticker, quote):
+    """Dashboard row for one provider quote, or an error row."""
+    try:
+        if isinstance(quote, Exception):
+            raise quote
+
+        open_price = quote["open"]
+        close_price = quote["price"]
+
+        # Sanitize data
+        if not all(map(lambda x: isinstance(x, (int, float)) and math.isfinite(x), [open_price, close_price])):
+            raise ValueError("Invalid price values")
+
+        change = close_price - open_price
+        percent_change = (change / open_price) * 100
+
+        return {
+            "ticker": ticker,
+            "price": round(close_price, 2),
+            "change": round(change, 2),
+            "percent_change": round(percent_change, 2)
+        }
+
+    except Exception as e:
+        return {
+            "ticker": ticker,
+            "error": str(e)
+        }
+
+
+def fetch_quotes(tickers):
+    """One batched provider call, given up on after ``MARKET_DATA_TIMEOUT`` seconds.
+
+    A call still running from an earlier refresh is waited on instead of
+    starting another; tickers it did not cover are missing from the result.
+    """
+    global _in_flight
+    with _fetch_lock:
+        future = _in_flight
+        if future is None or future.done():
+            future = _in_flight = _fetcher.submit(lambda: get_provider().quotes(tickers))
+    try:
+        return future.result(timeout=settings.MARKET_DATA_TIMEOUT)
+    except FutureTimeout:
+        error = TimeoutError(f"No quotes after {settings.MARKET_DATA_TIMEOUT}s")
+        return {ticker: error for ticker in tickers}
+
+
+def refresh():
+    """Fetch every ticker in one provider call and store the rows in the cache.
+
+    The caller must hold ``REFRESH_LOCK_KEY``; it is released here.
+    """
+    try:
+        tickers = settings.TOP_STOCKS_TICKERS
+        quotes = fetch_quotes(tickers)
+        rows = [stock_row(ticker, quotes.get(ticker, ValueError("No data found"))) for ticker in tickers]
+        if all("error" in row for row in rows):
+            # Upstream is down: keep serving the last good rows until the next interval
+            previous = cache.get(CACHE_KEY)
+            if previous is not None:
+                rows = previous["rows"]
+        cache.set(
+            CACHE_KEY,
+            {"rows": rows, "fetched_at": time.time()},
+            settings.TOP_STOCKS_CACHE_TTL + settings.TOP_STOCKS_STALE_TTL,
+        )
+        return rows
+    finally:
+        cache.delete(REFRESH_LOCK_KEY)
+
+
+def _background_refresh():
+    try:
+        refresh()
+    except Exception as e:
+        # The stale rows keep being served; the next request retries
+        logger.exception(f"Refreshing top stocks failed: {str(e)}")
+
+
+def top_stocks():
+    """Rows for the top-stocks dashboard, served from a shared cache.
+
+    Rows younger than ``TOP_STOCKS_CACHE_TTL`` are returned as they are.
+    Older ones, up to ``TOP_STOCKS_STALE_TTL`` past that, are still returned
+    at once while a single background refresh replaces them. Only an empty
+    cache makes a caller wait for upstream. The refresh lock lives in the
+    cache itself, so with a shared backend (Redis, Memcached) there is at
+    most one refresh per interval across all processes.
+    """
+    # Outlives the provider call's own MARKET_DATA_TIMEOUT, so a lock never expires mid-fetch
+    lock_timeout = settings.MARKET_DATA_TIMEOUT * 2
+    entry = cache.get(CACHE_KEY)
+    if entry is not None:
+        if time.time() - entry["fetched_at"] > settings.TOP_STOCKS_CACHE_TTL and cache.add(REFRESH_LOCK_KEY, 1, lock_timeout):
+            _refresher.submit(_background_refresh)
+        return entry["rows"]
+
+    if cache.add(REFRESH_LOCK_KEY, 1, lock_timeout):
+        return refresh()
+    # Someone else is fetching: wait for their rows rather than calling upstream too
+    deadline = time.monotonic() + lock_timeout
+    while time.monotonic() < deadline:
+        time.sleep(0.1)
+        entry = cache.get(CACHE_KEY)
+        if entry is not None:
+            return entry["rows"]
+        # That fetch failed or its lock expired: take over, still one caller at a time
+        if cache.add(REFRESH_LOCK_KEY, 1, lock_timeout):
+            return refresh()
+    return [
+        {"ticker": ticker, "error": "Quotes are still being fetched; try again shortly"}
+        for ticker in settings.TOP_STOCKS_TICKERS
+    ]
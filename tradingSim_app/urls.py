@@ -1,9 +1,16 @@
 from django.urls import path
-from .views import TradeListCreateView, TradeDetailView, fetch_trade_analysis, TopStocksView
+from .views import (
+    TradeListCreateView, TradeBulkCreateView, TradeDetailView, fetch_trade_analysis, TopStocksView, CandleListView,
+    PositionListView, PositionDetailView,
+)
 
 urlpatterns = [
     path('trades/', TradeListCreateView.as_view(), name='trade-list'),
+    path('trades/bulk/', TradeBulkCreateView.as_view(), name='trade-bulk'),
     path('trades/<int:pk>/', TradeDetailView.as_view(), name='trade-detail'),
     path("trade-analysis/", fetch_trade_analysis, name="fetch_trade_analysis"),
     path("top-stocks/", TopStocksView.as_view(), name="top-stocks"), 
+    path("positions/", PositionListView.as_view(), name="position-list"),
+    path("positions/<str:ticker>/", PositionDetailView.as_view(), name="position-detail"),
+    path("candles/", CandleListView.as_view(), name="candle-list"),
 ]
\ No newline at end of file
@@ -1,17 +1,41 @@
+from datetime import datetime, time, timedelta
 from rest_framework import generics
-from .models import Trade
-from .serializers import TradeSerializer
+from rest_framework.exceptions import ValidationError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.db import transaction
+from django.shortcuts import get_object_or_404
+from .models import Trade, Candle, Position
+from .serializers import TradeSerializer, CandleSerializer, PositionSerializer
+from .positions import apply_trade, rebuild_position
+from .candles import INTERVAL_SECONDS
+from .pagination import TimestampCursorPagination
+from .ingest import ingest_trades, ndjson_rows
+from rest_framework import status
+import json
 import requests
 from django.http import JsonResponse
 from django.conf import settings
-import yfinance as yf
+from .top_stocks import top_stocks
 from rest_framework.views import APIView
 from rest_framework.response import Response
-import math
 # Handles GET (list all trades) and POST (create a trade)
 class TradeListCreateView(generics.ListCreateAPIView):
     queryset = Trade.objects.all()
     serializer_class = TradeSerializer
+
+    @property
+    def pagination_class(self):
+        # ?pagination=cursor (and the cursor links it returns) switch to keyset pages
+        params = self.request.query_params
+        if params.get('pagination') == 'cursor' or 'cursor' in params:
+            return TimestampCursorPagination
+        return generics.GenericAPIView.pagination_class
+
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            trade = serializer.save()
+            apply_trade(trade)
     
     def get_queryset(self):
         queryset = Trade.objects.all()
@@ -24,20 +48,150 @@ class TradeListCreateView(generics.ListCreateAPIView):
         # Filter by date range if provided
         start_date = self.request.query_params.get('start_date', None)
         end_date = self.request.query_params.get('end_date', None)
-        
-        if start_date:
-            queryset = queryset.filter(timestamp__date__gte=start_date)
-                
-        if end_date:
-            queryset = queryset.filter(timestamp__date__lte=end_date)
+        queryset = queryset.filter(**trade_date_range(start_date, end_date))
                 
         return queryset
 
+# Handles POST of many trades at once, as a JSON array or NDJSON (one trade per line)
+class TradeBulkCreateView(APIView):
+    ndjson_types = ('application/x-ndjson', 'application/ndjson', 'application/jsonl')
+
+    def post(self, request):
+        chunk_size = settings.TRADE_BULK_CHUNK_SIZE
+        max_rows = settings.TRADE_BULK_MAX_ROWS
+        # Read from the stream: request.body would load NDJSON whole and
+        # trip DATA_UPLOAD_MAX_MEMORY_SIZE on large bursts
+        stream = request.stream
+        if stream is None:
+            return Response({"error": "Send a JSON array or NDJSON of trades"}, status=status.HTTP_400_BAD_REQUEST)
+
+        if request.content_type.split(';')[0].strip() in self.ndjson_types:
+            rows = ndjson_rows(stream)
+        else:
+            if int(request.META.get('CONTENT_LENGTH') or 0) > settings.TRADE_BULK_MAX_BYTES:
+                return Response(
+                    {"error": f"JSON arrays are limited to {settings.TRADE_BULK_MAX_BYTES} bytes; send NDJSON for larger batches"},
+                    status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                )
+            try:
+                rows = json.load(stream)
+            except ValueError as e:
+                return Response({"error": f"Invalid JSON: {e}"}, status=status.HTTP_400_BAD_REQUEST)
+            if not isinstance(rows, list):
+                return Response({"error": "Expected a JSON array of trades"}, status=status.HTTP_400_BAD_REQUEST)
+
+        created, errors = ingest_trades(rows, chunk_size, max_rows)
+        if not errors:
+            code = status.HTTP_201_CREATED
+        elif created:
+            code = status.HTTP_207_MULTI_STATUS
+        else:
+            code = status.HTTP_400_BAD_REQUEST
+        return Response({"created": created, "failed": len(errors), "errors": errors}, status=code)
+
+def local_midnight(value, name, days=0):
+    """Aware start of the TIME_ZONE day ``value`` (YYYY-MM-DD), shifted by ``days``."""
+    try:
+        day = parse_date(value)
+    except ValueError:
+        day = None
+    if day is None:
+        raise ValidationError({name: f"Invalid date: {value}"})
+    return timezone.make_aware(datetime.combine(day + timedelta(days=days), time.min))
+
+def trade_date_range(start_date=None, end_date=None):
+    """Lookups for trades on local dates ``start_date`` to ``end_date``, both inclusive.
+
+    Compares the raw timestamp against a half-open range of local midnights
+    (start <= timestamp < day after end) rather than casting each row to a
+    date, so the (ticker, timestamp) and timestamp indexes can be used.
+    """
+    lookups = {}
+    if start_date:
+        lookups['timestamp__gte'] = local_midnight(start_date, 'start_date')
+    if end_date:
+        lookups['timestamp__lt'] = local_midnight(end_date, 'end_date', days=1)
+    return lookups
+
+def parse_local_time(value, name):
+    """Aware datetime from an ISO date or datetime; naive values are in TIME_ZONE."""
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            day = parse_date(value)
+            parsed = datetime.combine(day, time.min) if day else None
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValidationError({name: f"Invalid date or datetime: {value}"})
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+# Handles GET (candles of one ticker and interval, oldest first)
+class CandleListView(generics.ListAPIView):
+    serializer_class = CandleSerializer
+    pagination_class = None
+    default_limit = 500
+    max_limit = 5000
+
+    def get_queryset(self):
+        params = self.request.query_params
+        ticker = params.get('ticker', None)
+        interval = params.get('interval', '1m')
+        if not ticker:
+            raise ValidationError({'ticker': 'This query parameter is required.'})
+        if interval not in INTERVAL_SECONDS:
+            raise ValidationError({'interval': f"Use one of {', '.join(INTERVAL_SECONDS)}"})
+        queryset = Candle.objects.filter(ticker=ticker, interval=interval)
+
+        # Half-open range on the candle start: start <= t < end
+        if params.get('start'):
+            queryset = queryset.filter(start__gte=parse_local_time(params['start'], 'start'))
+        if params.get('end'):
+            queryset = queryset.filter(start__lt=parse_local_time(params['end'], 'end'))
+
+        try:
+            limit = int(params.get('limit', self.default_limit))
+        except ValueError:
+            raise ValidationError({'limit': 'Must be an integer.'})
+        if limit < 1:
+            raise ValidationError({'limit': 'Must be at least 1.'})
+        limit = min(limit, self.max_limit)
+        # The latest `limit` candles of the range
+        return list(reversed(queryset.order_by('-start')[:limit]))
+
 # Handles GET (single trade), PUT/PATCH (update) and DELETE (remove)
 class TradeDetailView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Trade.objects.all()
     serializer_class = TradeSerializer
 
+    # Editing or removing a past fill changes the FIFO order, so its ticker is replayed
+    def perform_update(self, serializer):
+        old_ticker = serializer.instance.ticker
+        with transaction.atomic():
+            trade = serializer.save()
+            rebuild_position(trade.ticker)
+            if old_ticker != trade.ticker:
+                rebuild_position(old_ticker)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
+            rebuild_position(instance.ticker)
+
+# Handles GET (net position, average cost and realized FIFO P&L of every ticker traded)
+class PositionListView(generics.ListAPIView):
+    queryset = Position.objects.order_by('ticker')
+    serializer_class = PositionSerializer
+
+# Handles GET (position of one ticker)
+class PositionDetailView(generics.RetrieveAPIView):
+    serializer_class = PositionSerializer
+
+    def get_object(self):
+        return get_object_or_404(Position, ticker=self.kwargs['ticker'].upper())
+
 
 
 def fetch_trade_analysis(request):
@@ -60,40 +214,5 @@ def fetch_trade_analysis(request):
 
 class TopStocksView(APIView):
     def get(self, request):
-        tickers = ["AAPL", "MSFT", "GOOGL", "AMZN", "META", 
-                   "TSLA", "NVDA", "BRK-B", "JPM", "V", 
-                   "JNJ", "PG", "MA", "HD", "DIS"]
-
-        response_data = []
-
-        for ticker in tickers:
-            try:
-                data = yf.Ticker(ticker).history(period="1d", interval="1m")
-
-                if data.empty:
-                    raise ValueError("No data found")
-
-                open_price = data["Open"].iloc[0]
-                close_price = data["Close"].iloc[-1]
-
-                # Sanitize data
-                if not all(map(lambda x: isinstance(x, (int, float)) and math.isfinite(x), [open_price, close_price])):
-                    raise ValueError("Invalid price values")
-
-                change = close_price - open_price
-                percent_change = (change / open_price) * 100
-
-                response_data.append({
-                    "ticker": ticker,
-                    "price": round(close_price, 2),
-                    "change": round(change, 2),
-                    "percent_change": round(percent_change, 2)
-                })
-
-            except Exception as e:
-                response_data.append({
-                    "ticker": ticker,
-                    "error": str(e)
-                })
-
-        return Response(response_data)
\ No newline at end of file
+        # Cached for TOP_STOCKS_CACHE_TTL seconds; tickers come from TOP_STOCKS_TICKERS
+        return Response(top_stocks())
\ No newline at end of file
@@ -10,14 +10,20 @@ https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
 import os
 from django.core.asgi import get_asgi_application
 from channels.routing import ProtocolTypeRouter, URLRouter
-import websocket_app.routing
 
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tradingSim_project.settings")
 
+# Set up Django before importing consumers, which use the ORM
+django_asgi_app = get_asgi_application()
+
+import websocket_app.routing  # noqa: E402
+from websocket_app.writer import lifespan  # noqa: E402
+
 application = ProtocolTypeRouter(
     {
-        "http": get_asgi_application(),  # Handles HTTP requests
+        "http": django_asgi_app,  # Handles HTTP requests
         "websocket": URLRouter(websocket_app.routing.websocket_urlpatterns),  # Handles WebSocket requests
+        "lifespan": lifespan,  # Flushes buffered ticks on shutdown (Daphne relies on atexit)
     }
 )
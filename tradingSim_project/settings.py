@@ -144,6 +144,69 @@ USE_TZ = True
 
 AWS_LAMBDA_API_URL = "https://9rio214r4j.execute-api.ap-southeast-2.amazonaws.com/Tradingapp"
 
+# Bulk trade uploads (api/trades/bulk/): rows validated and inserted per chunk,
+# rows accepted per request, and the largest JSON array body (NDJSON is streamed)
+TRADE_BULK_CHUNK_SIZE = 5000
+TRADE_BULK_MAX_ROWS = 100000
+TRADE_BULK_MAX_BYTES = 50 * 1024 * 1024
+
+# Algo trading backtests
+# Worker processes for MA window sweeps (None uses every CPU)
+BACKTEST_SWEEP_PROCESSES = None
+# Largest sweep grid accepted; every distinct window keeps a full-length average in memory
+BACKTEST_SWEEP_MAX_PAIRS = 5000
+BACKTEST_SWEEP_MAX_WINDOWS = 200
+# Background backtest jobs running at once, and how many more may wait
+BACKTEST_MAX_CONCURRENT_JOBS = 2
+BACKTEST_MAX_QUEUED_JOBS = 20
+# Backtest results kept in each process's LRU cache, keyed by file hash and parameters
+BACKTEST_CACHE_SIZE = 128
+# Dataset slices whose computed indicators are kept for later strategy runs
+BACKTEST_INDICATOR_CACHE_SIZE = 8
+
+# Market data for live prices and top stocks: "yfinance", "replay" (stored bars
+# replayed at OPTIONS["speed"] bars/sec) or "synthetic" (seeded GBM ticks)
+MARKET_DATA_PROVIDER = {
+    "BACKEND": os.environ.get("MARKET_DATA_BACKEND", "yfinance"),
+    "OPTIONS": {},
+}
+# Provider calls run on this many threads and are given up after the timeout (seconds)
+MARKET_DATA_MAX_WORKERS = 8
+MARKET_DATA_TIMEOUT = 5
+
+# Top stocks dashboard (api/top-stocks/): tickers fetched in one batched call,
+# rows cached for TOP_STOCKS_CACHE_TTL seconds, then served stale for up to
+# TOP_STOCKS_STALE_TTL more while one background refresh runs
+TOP_STOCKS_TICKERS = [
+    "AAPL", "MSFT", "GOOGL", "AMZN", "META",
+    "TSLA", "NVDA", "BRK-B", "JPM", "V",
+    "JNJ", "PG", "MA", "HD", "DIS",
+]
+TOP_STOCKS_CACHE_TTL = 30
+TOP_STOCKS_STALE_TTL = 300
+
+# Live stock prices
+# Seconds between price polls; each ticker has one poller shared by all its sockets
+STOCK_POLL_INTERVAL = 1
+# Multi-ticker sockets (ws/stocks/) send one batched frame per interval
+STOCK_BATCH_INTERVAL = 1
+STOCK_MAX_SUBSCRIPTIONS = 200
+# Alerts and replies queued per socket for a slow client; more are dropped
+# (price updates are conflated to the latest per ticker instead)
+STOCK_MAX_PENDING_MESSAGES = 100
+# Frames a socket may send ahead of the client's {"action": "ack"} messages;
+# while a client is this far behind, its updates are conflated instead of sent
+STOCK_MAX_UNACKED_FRAMES = 8
+# Alert rules (percent_move, level_cross, ma_cross) a socket may register
+STOCK_MAX_ALERTS_PER_CONNECTION = 50
+# Ticks are stored in batches of up to this many rows, at least every N ms
+STOCK_WRITE_BATCH_SIZE = 500
+STOCK_WRITE_INTERVAL_MS = 500
+# Ticks held in memory while the database catches up; beyond this they are dropped
+STOCK_WRITE_MAX_PENDING = 10000
+# Store polled ticks and their candles; the websocket benchmark's server runs with this off
+STOCK_PERSIST_TICKS = os.environ.get("STOCK_PERSIST_TICKS", "1") != "0"
+
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.0/howto/static-files/
 
@@ -0,0 +1,207 @@
+import itertools
+import numpy as np
+
+# Rule kinds
+PERCENT_MOVE = 0
+LEVEL_CROSS = 1
+MA_CROSS = 2
+RULE_KINDS = {"percent_move": PERCENT_MOVE, "level_cross": LEVEL_CROSS, "ma_cross": MA_CROSS}
+
+# Directions: either way, upward only, downward only
+DIRECTIONS = {"any": 0, "up": 1, "down": -1}
+
+_ids = itertools.count(1)
+
+
+class TickerAlerts:
+    """Every subscriber's alert rules for one ticker, in parallel numpy arrays.
+
+    ``evaluate`` checks all rules against a tick in one vectorized pass and
+    only builds messages for the rules that fired. Rules live in the first
+    ``size`` slots; removing one moves the last rule into its slot, so adds
+    and removes stay O(1). A percent-move rule fires once when the move
+    reaches its threshold and re-arms only after the move falls back below.
+    """
+
+    def __init__(self, ticker, capacity=64):
+        self.ticker = ticker
+        self.size = 0
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.kinds = np.zeros(capacity, dtype=np.int8)
+        self.directions = np.zeros(capacity, dtype=np.int8)
+        self.thresholds = np.zeros(capacity)
+        self.windows = np.zeros(capacity)
+        # Percent-move rules waiting for the move to reach their threshold
+        self.armed = np.zeros(capacity, dtype=bool)
+        self.owners = []
+        self.slots = {}
+        # Recent ticks for percent-move rules, oldest first
+        self.times = np.empty(0)
+        self.prices = np.empty(0)
+        self.prev_price = None
+        self.prev_ma = None
+
+    def _grow(self):
+        for name in ("ids", "kinds", "directions", "thresholds", "windows", "armed"):
+            column = getattr(self, name)
+            setattr(self, name, np.concatenate((column, np.zeros_like(column))))
+
+    def add(self, owner, kind, threshold, window=0.0, direction=0):
+        if self.size == len(self.ids):
+            self._grow()
+        slot = self.size
+        rule_id = next(_ids)
+        self.ids[slot] = rule_id
+        self.kinds[slot] = kind
+        self.directions[slot] = direction
+        self.thresholds[slot] = threshold
+        self.windows[slot] = window
+        self.armed[slot] = True
+        self.owners.append(owner)
+        self.slots[rule_id] = slot
+        self.size += 1
+        return rule_id
+
+    def remove(self, rule_id):
+        slot = self.slots.pop(rule_id, None)
+        if slot is None:
+            return False
+        last = self.size - 1
+        if slot != last:
+            for column in (self.ids, self.kinds, self.directions, self.thresholds, self.windows, self.armed):
+                column[slot] = column[last]
+            self.owners[slot] = self.owners[last]
+            self.slots[int(self.ids[slot])] = slot
+        self.owners.pop()
+        self.size -= 1
+        return True
+
+    def rules(self, owner):
+        return [
+            {
+                "id": int(self.ids[i]),
+                "ticker": self.ticker,
+                "rule": next(name for name, kind in RULE_KINDS.items() if kind == self.kinds[i]),
+                "threshold": float(self.thresholds[i]),
+                "window": float(self.windows[i]),
+                "direction": next(name for name, d in DIRECTIONS.items() if d == self.directions[i]),
+            }
+            for i in range(self.size) if self.owners[i] == owner
+        ]
+
+    def evaluate(self, now, price, ma=None):
+        """Check every rule against a tick; returns ``(owner, rule_id, message)`` for each that fired."""
+        n = self.size
+        fired = np.zeros(n, dtype=bool)
+        change = np.zeros(n)
+        kinds, directions, thresholds = self.kinds[:n], self.directions[:n], self.thresholds[:n]
+
+        moves = kinds == PERCENT_MOVE
+        if moves.any() and len(self.prices):
+            # Reference price: the last tick at or before now - window (the oldest one if history is shorter)
+            rows = np.searchsorted(self.times, now - self.windows[:n][moves], side="right") - 1
+            reference = self.prices[np.maximum(rows, 0)]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                change[moves] = (price - reference) / reference * 100
+            signed = np.where(directions[moves] == 0, np.abs(change[moves]), directions[moves] * change[moves])
+            over = signed >= thresholds[moves]
+            armed = self.armed[:n]
+            fired[moves] = over & armed[moves]
+            armed[moves] = ~over
+
+        if self.prev_price is not None:
+            fired |= (kinds == LEVEL_CROSS) & crossed(self.prev_price, price, thresholds, thresholds, directions)
+            if ma is not None and self.prev_ma is not None:
+                fired |= (kinds == MA_CROSS) & crossed(self.prev_price, price, self.prev_ma, ma, directions)
+
+        # Keep only the history the longest percent-move window needs
+        horizon = self.windows[:n][moves].max() if moves.any() else 0.0
+        keep = self.times >= now - horizon
+        keep[-1:] = True
+        self.times = np.append(self.times[keep], now)
+        self.prices = np.append(self.prices[keep], price)
+        self.prev_price, self.prev_ma = price, ma
+
+        alerts = []
+        for slot in np.flatnonzero(fired):
+            kind = kinds[slot]
+            if kind == PERCENT_MOVE:
+                message = f"{self.ticker} moved {change[slot]:+.2f}% in {self.windows[slot]:g}s"
+            elif kind == LEVEL_CROSS:
+                message = f"{self.ticker} crossed {thresholds[slot]:g} at {price}"
+            else:
+                message = f"{self.ticker} crossed its 5-minute moving average at {price}"
+            alerts.append((self.owners[slot], int(self.ids[slot]), message))
+        return alerts
+
+
+def crossed(prev, current, prev_level, level, directions):
+    """Whether a move from ``prev`` to ``current`` crossed ``level`` in each rule's direction."""
+    up = (prev < prev_level) & (current >= level)
+    down = (prev > prev_level) & (current <= level)
+    return np.where(directions > 0, up, np.where(directions < 0, down, up | down))
+
+
+# Ticker -> its rules, and owner channel -> tickers it has rules on, in this process
+_tickers = {}
+_owners = {}
+
+
+def add_rule(owner, ticker, rule, threshold, window=0.0, direction="any"):
+    """Register a rule from a client message; raises ``ValueError`` on bad input."""
+    if rule not in RULE_KINDS:
+        raise ValueError(f"Unknown rule {rule}; use one of {', '.join(RULE_KINDS)}")
+    if direction not in DIRECTIONS:
+        raise ValueError(f"Unknown direction {direction}; use one of {', '.join(DIRECTIONS)}")
+    threshold, window = float(threshold), float(window)
+    if window < 0 or not np.isfinite([threshold, window]).all():
+        raise ValueError("Threshold and window must be finite, and window not negative")
+    alerts = _tickers.get(ticker)
+    if alerts is None:
+        alerts = _tickers[ticker] = TickerAlerts(ticker)
+    _owners.setdefault(owner, set()).add(ticker)
+    return alerts.add(owner, RULE_KINDS[rule], threshold, window, DIRECTIONS[direction])
+
+
+def remove_rule(owner, rule_id):
+    for ticker in _owners.get(owner, ()):
+        alerts = _tickers.get(ticker)
+        slot = alerts.slots.get(rule_id) if alerts is not None else None
+        if slot is not None and alerts.owners[slot] == owner:
+            return alerts.remove(rule_id)
+    return False
+
+
+def owner_rules(owner):
+    return [
+        rule
+        for ticker in sorted(_owners.get(owner, ())) if ticker in _tickers
+        for rule in _tickers[ticker].rules(owner)
+    ]
+
+
+def remove_owner(owner, ticker=None):
+    """Drop a client's rules, on one ticker or (after a disconnect) all of them."""
+    tickers = _owners.get(owner, set())
+    for ticker in [ticker] if ticker is not None else list(tickers):
+        if ticker not in tickers:
+            continue
+        tickers.discard(ticker)
+        alerts = _tickers.get(ticker)
+        if alerts is None:
+            continue
+        for rule_id in [int(alerts.ids[i]) for i in range(alerts.size) if alerts.owners[i] == owner]:
+            alerts.remove(rule_id)
+        if not alerts.size:
+            del _tickers[ticker]
+    if not tickers:
+        _owners.pop(owner, None)
+
+
+def evaluate(ticker, now, price, ma=None):
+    alerts = _tickers.get(ticker)
+    return alerts.evaluate(now, price, ma) if alerts is not None else []
+
+
+def rule_count():
+    return sum(alerts.size for alerts in _tickers.values())
@@ -1,86 +1,229 @@
+import re
 import json
 import asyncio
-import yfinance as yf
+from django.conf import settings
 from channels.generic.websocket import AsyncWebsocketConsumer
-from asgiref.sync import sync_to_async
-from tradingSim_app.models import StockPrice  # Import the model
+from collections import deque
+from . import pollers, alerts
+from .outbox import Outbox, frame_format
 
-class StockPriceConsumer(AsyncWebsocketConsumer):
+# Ticker format of the ws/stocks/<ticker>/ route, within StockPrice.ticker's length
+TICKER_PATTERN = re.compile(r"[\w\.\-]{1,10}")
+
+ALERT_ACTIONS = ("add_alert", "remove_alert", "list_alerts")
+
+
+def acked_frames(message):
+    """Frames acknowledged by an ``{"action": "ack", "frames": n}`` message (1 by default)."""
+    frames = message.get("frames", 1)
+    if type(frames) is not int or frames < 1:
+        raise ValueError
+    return frames
+
+
+class AlertRulesMixin:
+    """Alert rule messages accepted by both stock consumers.
+
+    ``{"action": "add_alert", "ticker": "AAPL", "rule": "percent_move",
+    "threshold": 2, "window": 60, "direction": "any"}`` registers a rule on a
+    subscribed ticker (rules: percent_move, level_cross, ma_cross);
+    ``remove_alert`` takes its ``id`` and ``list_alerts`` lists them.
+    """
+
+    async def alert_action(self, message, subscribed):
+        action = message["action"]
+        try:
+            if action == "add_alert":
+                ticker = message.get("ticker")
+                if ticker not in subscribed:
+                    raise ValueError(f"Subscribe to {ticker} before adding alerts on it")
+                if len(alerts.owner_rules(self.channel_name)) >= settings.STOCK_MAX_ALERTS_PER_CONNECTION:
+                    raise ValueError(f"At most {settings.STOCK_MAX_ALERTS_PER_CONNECTION} alerts per connection")
+                rule_id = alerts.add_rule(
+                    self.channel_name, ticker, message.get("rule"), message.get("threshold"),
+                    message.get("window", 0), message.get("direction", "any"),
+                )
+                await self.reply({"alert_added": rule_id})
+            elif action == "remove_alert":
+                await self.reply({"alert_removed": alerts.remove_rule(self.channel_name, message.get("id"))})
+            else:
+                await self.reply({"alerts": alerts.owner_rules(self.channel_name)})
+        except (ValueError, TypeError) as e:
+            await self.reply({"error": str(e)})
+
+
+class StockPriceConsumer(AlertRulesMixin, AsyncWebsocketConsumer):
     async def connect(self):
         """Handles new WebSocket connection."""
         self.ticker = self.scope["url_route"]["kwargs"]["ticker"]
+        self.group = pollers.group_name(self.ticker)
+
         await self.accept()  # Accept WebSocket connection
-        await self.send(json.dumps({"message": f"Connected to {self.ticker} WebSocket"}))
-
-        # Start streaming stock prices
-        await self.stream_stock_data()
-
-    async def stream_stock_data(self):
-        """Fetch real-time stock data and send updates to WebSocket clients."""
-        last_price = None
-        self.connected = True
-
-        while self.connected:
-            data = await self.get_real_stock_data()
-            await self.send(json.dumps(data))
-
-            # Save data to the database
-            await self.save_to_db(data)
-
-            # Trigger alert if price changes by more than 2%
-            if last_price and abs((data["price"] - last_price) / last_price) * 100 > 2:
-                await self.send(json.dumps({"alert": "Stock price changed more than 2%!"}))
-
-            last_price = data["price"]
-            await asyncio.sleep(1)  # Wait for 1 second before fetching new data
-
-    async def get_real_stock_data(self):
-        stock = yf.Ticker(self.ticker)
-        history_data = stock.history(period="1d", interval="1m")
-        if history_data.empty:
-            return {
-                "ticker": self.ticker,
-                "price": 0.0,
-                "timestamp": self.get_timestamp(),
-                "error": f"No data found for {self.ticker}"
-            }
-        data = history_data.iloc[-1]
-        return {
-            "ticker": self.ticker,
-            "price": round(data["Close"], 2),
-            "timestamp": self.get_timestamp(),
-        }
-
-    async def save_to_db(self, data):
-        """Save stock data to the database."""
-        ma_5min = await self.calculate_moving_average(data["ticker"])
-        await sync_to_async(StockPrice.objects.create)(
-            ticker=data["ticker"], 
-            price=data["price"], 
-            timestamp=data["timestamp"],
-            moving_average_5min=ma_5min
-        )
-    async def calculate_moving_average(self, ticker):
-        from datetime import datetime, timedelta
-        from django.utils.timezone import now
-
-        five_minutes_ago = now() - timedelta(minutes=5)
-        
-        recent_prices = await sync_to_async(list)(
-            StockPrice.objects.filter(ticker=ticker, timestamp__gte=five_minutes_ago)
-            .order_by("-timestamp")
-            .values_list("price", flat=True)
-        )
-        if recent_prices:
-            return round(sum(recent_prices) / len(recent_prices), 2)
-        return None
-
-    def get_timestamp(self):
-        """Generate a formatted timestamp."""
-        from datetime import datetime
-        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            self.outbox = Outbox(
+                self, frame_format(self.scope), settings.STOCK_MAX_PENDING_MESSAGES, settings.STOCK_MAX_UNACKED_FRAMES,
+            )
+        except ValueError as e:
+            await self.send(json.dumps({"error": str(e)}))
+            await self.close()
+            return
+
+        # Join the ticker's group; one shared poller feeds every subscriber
+        await self.channel_layer.group_add(self.group, self.channel_name)
+        self.outbox.put({"message": f"Connected to {self.ticker} WebSocket"})
+        pollers.subscribe(self.ticker)
+
+    async def reply(self, message):
+        self.outbox.put(message)
+
+    async def receive(self, text_data=None, bytes_data=None):
+        """Frame acks and alert rule messages; ``ticker`` defaults to this socket's ticker."""
+        try:
+            message = json.loads(text_data or "")
+            if message["action"] == "ack":
+                self.outbox.ack(acked_frames(message))
+                return
+            if message["action"] not in ALERT_ACTIONS:
+                raise ValueError
+        except (ValueError, KeyError, TypeError):
+            await self.reply({"error": f"Expected an action of ack, {', '.join(ALERT_ACTIONS)}"})
+            return
+        message.setdefault("ticker", self.ticker)
+        await self.alert_action(message, {self.ticker})
+
+    async def stock_update(self, event):
+        """Forward a price update broadcast by the ticker's poller."""
+        self.outbox.put_update(self.ticker, event["data"])
+
+    async def stock_alert(self, event):
+        alert = {"alert": event["message"]}
+        if "alert_id" in event:
+            alert["alert_id"] = event["alert_id"]
+        self.outbox.put(alert)
 
     async def disconnect(self, close_code):
         """Handles WebSocket disconnection properly."""
         print(f"Disconnected: {close_code}")
-        self.connected = False  # Stop the loop
+        if not hasattr(self, "outbox"):
+            return
+        self.outbox.close()
+        alerts.remove_owner(self.channel_name)
+        await self.channel_layer.group_discard(self.group, self.channel_name)
+        pollers.unsubscribe(self.ticker)  # Stops the poller after its last subscriber
+
+
+class MultiStockConsumer(AlertRulesMixin, AsyncWebsocketConsumer):
+    """One socket for any set of tickers, sent as one batched frame per interval.
+
+    Clients send ``{"action": "subscribe", "tickers": ["AAPL", "MSFT"]}`` or
+    ``{"action": "unsubscribe", ...}``, plus frame acks and the alert rule
+    actions. Updates received between frames are collected per ticker, and
+    only the latest price of each is sent.
+    """
+
+    async def connect(self):
+        self.tickers = set()
+        self.updates = {}
+        self.alerts = deque(maxlen=settings.STOCK_MAX_PENDING_MESSAGES)
+        await self.accept()
+        try:
+            self.outbox = Outbox(
+                self, frame_format(self.scope), settings.STOCK_MAX_PENDING_MESSAGES, settings.STOCK_MAX_UNACKED_FRAMES,
+            )
+        except ValueError as e:
+            await self.send(json.dumps({"error": str(e)}))
+            await self.close()
+            return
+        await self.reply({"message": "Connected. Send subscribe/unsubscribe messages with a list of tickers."})
+        self.sender = asyncio.get_running_loop().create_task(self.send_batches())
+
+    async def reply(self, message):
+        self.outbox.put(message)
+
+    async def receive(self, text_data=None, bytes_data=None):
+        try:
+            message = json.loads(text_data or "")
+            action = message["action"]
+            if action == "ack":
+                self.outbox.ack(acked_frames(message))
+                return
+            if action in ALERT_ACTIONS:
+                await self.alert_action(message, self.tickers)
+                return
+            tickers = message["tickers"]
+            if action not in ("subscribe", "unsubscribe") or not isinstance(tickers, list):
+                raise ValueError
+        except (ValueError, KeyError, TypeError):
+            await self.reply({"error": 'Expected {"action": "subscribe" or "unsubscribe", "tickers": [...]}, an ack or an alert action'})
+            return
+
+        invalid = [t for t in tickers if not isinstance(t, str) or not TICKER_PATTERN.fullmatch(t)]
+        if invalid:
+            await self.reply({"error": f"Invalid tickers: {invalid}"})
+            return
+
+        if action == "subscribe":
+            added = [t for t in dict.fromkeys(tickers) if t not in self.tickers]
+            if len(self.tickers) + len(added) > settings.STOCK_MAX_SUBSCRIPTIONS:
+                await self.reply({"error": f"At most {settings.STOCK_MAX_SUBSCRIPTIONS} tickers per connection"})
+                return
+            for ticker in added:
+                await self.channel_layer.group_add(pollers.group_name(ticker), self.channel_name)
+                pollers.subscribe(ticker)
+                self.tickers.add(ticker)
+        else:
+            for ticker in set(tickers) & self.tickers:
+                await self.leave(ticker)
+        await self.reply({"subscribed": sorted(self.tickers)})
+
+    async def leave(self, ticker):
+        await self.channel_layer.group_discard(pollers.group_name(ticker), self.channel_name)
+        pollers.unsubscribe(ticker)
+        alerts.remove_owner(self.channel_name, ticker)
+        self.tickers.discard(ticker)
+        self.updates.pop(ticker, None)
+
+    async def stock_update(self, event):
+        ticker = event["data"]["ticker"]
+        if ticker in self.tickers:
+            self.updates[ticker] = event["data"]
+
+    async def stock_alert(self, event):
+        if len(self.alerts) == self.alerts.maxlen:
+            self.outbox.count_drop()
+        alert = {"ticker": event.get("ticker"), "alert": event["message"]}
+        if "alert_id" in event:
+            alert["alert_id"] = event["alert_id"]
+        self.alerts.append(alert)
+
+    async def send_batches(self):
+        """Send everything collected since the last frame, once per interval.
+
+        The batch is queued as one conflatable update, so a client still
+        reading the previous frame gets the newer batch merged into it.
+        """
+        while True:
+            await asyncio.sleep(settings.STOCK_BATCH_INTERVAL)
+            if not self.updates and not self.alerts:
+                continue
+            pending = self.outbox.updates.get("batch")
+            updates = {u["ticker"]: u for u in pending["updates"]} if pending else {}
+            updates.update(self.updates)
+            frame = {"updates": list(updates.values())}
+            alerts = (pending or {}).get("alerts", []) + list(self.alerts)
+            if alerts:
+                trimmed = len(alerts) - settings.STOCK_MAX_PENDING_MESSAGES
+                if trimmed > 0:
+                    self.outbox.count_drop(trimmed)
+                frame["alerts"] = alerts[-settings.STOCK_MAX_PENDING_MESSAGES:]
+            self.updates = {}
+            self.alerts.clear()
+            self.outbox.put_update("batch", frame)
+
+    async def disconnect(self, close_code):
+        if not hasattr(self, "outbox"):
+            return
+        self.sender.cancel()
+        self.outbox.close()
+        for ticker in list(self.tickers):
+            await self.leave(ticker)
@@ -0,0 +1,62 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from tradingSim_app.providers import get_provider
+
+# Ticker -> provider call still running, shared by everyone waiting on it
+_in_flight = {}
+_executor = None
+
+stats = {"calls": 0, "coalesced": 0, "timeouts": 0, "errors": 0}
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.MARKET_DATA_MAX_WORKERS,
+            thread_name_prefix="market-data",
+        )
+    return _executor
+
+
+def _finished(ticker, future):
+    if _in_flight.get(ticker) is future:
+        del _in_flight[ticker]
+    # Mark the outcome as seen even if every waiter already timed out
+    if not future.cancelled() and future.exception() is not None:
+        stats["errors"] += 1
+
+
+def _quote(ticker):
+    # Runs on the pool: the provider is built on first use, and the replay
+    # backend reads its CSV or dataset rows then, which must stay off the loop
+    return get_provider().quote(ticker)
+
+
+async def fetch_quote(ticker):
+    """Provider quote for ``ticker`` without blocking the event loop.
+
+    The blocking provider call runs on a bounded thread pool
+    (``MARKET_DATA_MAX_WORKERS``) and callers give up after
+    ``MARKET_DATA_TIMEOUT`` seconds with ``asyncio.TimeoutError``. While a
+    call for a ticker is in flight, further requests for it wait on that same
+    call rather than starting another, so a slow upstream ties up at most one
+    worker per ticker.
+    """
+    future = _in_flight.get(ticker)
+    if future is None:
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(_get_executor(), _quote, ticker)
+        _in_flight[ticker] = future
+        future.add_done_callback(lambda f: _finished(ticker, f))
+        stats["calls"] += 1
+    else:
+        stats["coalesced"] += 1
+
+    try:
+        # Shielded so one caller timing out does not cancel the shared call
+        return await asyncio.wait_for(asyncio.shield(future), settings.MARKET_DATA_TIMEOUT)
+    except asyncio.TimeoutError:
+        stats["timeouts"] += 1
+        raise
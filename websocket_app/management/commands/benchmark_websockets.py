@@ -0,0 +1,209 @@
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import resource
+import subprocess
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+
+def process_usage(pid):
+    """CPU seconds used so far and resident memory (MB) of a local process, from /proc."""
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    cpu = (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    rss = int(fields[21]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    return cpu, rss
+
+
+def percentiles_ms(values, points=(50, 99, 99.9)):
+    if not values:
+        return [None] * len(points)
+    return [round(float(v) * 1000, 2) for v in np.percentile(values, points)]
+
+
+class RunStats:
+    def __init__(self):
+        self.connect = []
+        self.latency = []
+        self.failed = 0
+        self.closed = 0
+        self.messages = 0
+        self.measuring = False
+
+
+class Command(BaseCommand):
+    help = (
+        "Open N simulated clients on ws/stocks/<ticker>/ and report connect time, message rate, "
+        "tick-to-client latency and server CPU/memory. By default a Daphne server with synthetic "
+        "market data is started for the run; it does not store the ticks it polls."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clients", type=int, nargs="+", default=[1000], help="Concurrent clients per run")
+        parser.add_argument("--tickers", type=int, default=1, help="Spread clients over this many tickers")
+        parser.add_argument("--duration", type=float, default=30, help="Seconds measured once every client is connected")
+        parser.add_argument("--url", help="Base ws:// URL of a running server instead of starting one")
+        parser.add_argument("--server-pid", type=int, help="PID of the --url server, for CPU/memory")
+        parser.add_argument("--port", type=int, default=8765, help="Port of the Daphne server started for the run")
+        parser.add_argument("--connect-concurrency", type=int, default=200, help="Handshakes in flight at once")
+        parser.add_argument("--json", dest="json_path", help="Also write the report rows to this file")
+
+    def handle(self, *args, **options):
+        try:
+            import websockets  # noqa: F401
+        except ImportError:
+            raise CommandError("The benchmark client needs the websockets package: pip install websockets")
+
+        # Every client is a socket; raise the open-file limit as far as allowed
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+        server = None
+        url, server_pid = options["url"], options["server_pid"]
+        if url is None:
+            server = self.start_server(options["port"])
+            url, server_pid = f"ws://127.0.0.1:{options['port']}", server.pid
+
+        rows = []
+        try:
+            self.stdout.write(
+                f"{'clients':>8} {'failed':>7} {'conn p50':>9} {'conn p99':>9} {'msgs/s':>10} "
+                f"{'lat p50':>8} {'lat p99':>8} {'lat p999':>9} {'srv cpu%':>9} {'srv MB':>8} {'gen cpu%':>9}"
+            )
+            for clients in options["clients"]:
+                row = asyncio.run(self.run(url, server_pid, clients, options))
+                rows.append(row)
+                self.stdout.write(
+                    f"{row['clients']:>8,} {row['failed']:>7,} {fmt(row['connect_ms_p50']):>9} "
+                    f"{fmt(row['connect_ms_p99']):>9} {row['messages_per_sec']:>10,.0f} "
+                    f"{fmt(row['latency_ms_p50']):>8} {fmt(row['latency_ms_p99']):>8} "
+                    f"{fmt(row['latency_ms_p999']):>9} {fmt(row['server_cpu_pct']):>9} "
+                    f"{fmt(row['server_rss_mb']):>8} {fmt(row['loadgen_cpu_pct']):>9}"
+                )
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=30)
+
+        if options["json_path"]:
+            with open(options["json_path"], "w") as f:
+                json.dump({"tickers": options["tickers"], "duration": options["duration"], "runs": rows}, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['json_path']}"))
+
+    def start_server(self, port):
+        """Start Daphne on synthetic market data and wait until it accepts connections.
+
+        Tick persistence is turned off, so the synthetic ``T0..Tn`` ticks and
+        candles never reach the configured database.
+        """
+        env = {**os.environ, "MARKET_DATA_BACKEND": "synthetic", "STOCK_PERSIST_TICKS": "0"}
+        server = subprocess.Popen(
+            [sys.executable, "-m", "daphne", "-b", "127.0.0.1", "-p", str(port), "tradingSim_project.asgi:application"],
+            env=env,
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError("The Daphne server exited during startup")
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                return server
+            except OSError:
+                time.sleep(0.2)
+        server.terminate()
+        raise CommandError("The Daphne server did not start within 30 seconds")
+
+    async def run(self, url, server_pid, clients, options):
+        stats = RunStats()
+        stop = asyncio.Event()
+        handshakes = asyncio.Semaphore(options["connect_concurrency"])
+        tasks = [
+            asyncio.create_task(self.client(f"{url}/ws/stocks/T{i % options['tickers']}/", stats, stop, handshakes))
+            for i in range(clients)
+        ]
+        # Wait for every handshake to succeed or fail before measuring
+        while len(stats.connect) + stats.failed < clients:
+            await asyncio.sleep(0.1)
+
+        stats.measuring = True
+        started = time.monotonic()
+        gen_start = resource.getrusage(resource.RUSAGE_SELF)
+        server_cpu, server_rss = process_usage(server_pid) if server_pid else (None, None)
+        peak_rss = server_rss
+        while time.monotonic() - started < options["duration"]:
+            await asyncio.sleep(1)
+            if server_pid:
+                peak_rss = max(peak_rss, process_usage(server_pid)[1])
+        elapsed = time.monotonic() - started
+        stats.measuring = False
+        gen_end = resource.getrusage(resource.RUSAGE_SELF)
+
+        server_cpu_pct = None
+        if server_pid:
+            server_cpu_pct = round((process_usage(server_pid)[0] - server_cpu) / elapsed * 100, 1)
+        gen_cpu = (gen_end.ru_utime + gen_end.ru_stime) - (gen_start.ru_utime + gen_start.ru_stime)
+
+        stop.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        connect = percentiles_ms(stats.connect)
+        latency = percentiles_ms(stats.latency)
+        return {
+            "clients": clients,
+            "connected": len(stats.connect),
+            "failed": stats.failed,
+            "closed_by_server": stats.closed,
+            "connect_ms_p50": connect[0],
+            "connect_ms_p99": connect[1],
+            "messages": stats.messages,
+            "messages_per_sec": round(stats.messages / elapsed, 1),
+            "latency_ms_p50": latency[0],
+            "latency_ms_p99": latency[1],
+            "latency_ms_p999": latency[2],
+            "server_cpu_pct": server_cpu_pct,
+            "server_rss_mb": None if peak_rss is None else round(peak_rss, 1),
+            "loadgen_cpu_pct": round(gen_cpu / elapsed * 100, 1),
+        }
+
+    async def client(self, url, stats, stop, handshakes):
+        import websockets
+
+        try:
+            async with handshakes:
+                # Timed once through the semaphore: only the handshake itself counts
+                started = time.perf_counter()
+                ws = await websockets.connect(url, open_timeout=60, ping_interval=None)
+                stats.connect.append(time.perf_counter() - started)
+        except Exception:
+            stats.failed += 1
+            return
+
+        receiver = asyncio.create_task(self.receive(ws, stats))
+        await stop.wait()
+        receiver.cancel()
+        await ws.close()
+
+    async def receive(self, ws, stats):
+        import websockets
+
+        try:
+            async for raw in ws:
+                received = time.time()
+                # Sockets hold back frames the client has not acknowledged
+                await ws.send('{"action": "ack"}')
+                if not stats.measuring:
+                    continue
+                stats.messages += 1
+                message = json.loads(raw)
+                if "ts" in message:
+                    stats.latency.append(received - message["ts"])
+        except websockets.ConnectionClosed:
+            stats.closed += 1
+
+
+def fmt(value):
+    return "-" if value is None else f"{value:,}"
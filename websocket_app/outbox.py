@@ -0,0 +1,106 @@
+import json
+import asyncio
+from collections import deque
+from urllib.parse import parse_qs
+
+try:
+    import msgpack
+except ImportError:  # Optional: only needed for ?format=msgpack sockets
+    msgpack = None
+
+FORMATS = ("json", "msgpack")
+
+# Totals across every connection in this process, for the stats view
+totals = {"frames": 0, "conflated": 0, "dropped": 0}
+
+
+def frame_format(scope):
+    """Frame encoding requested with ``?format=json|msgpack`` (JSON by default)."""
+    query = parse_qs(scope.get("query_string", b"").decode())
+    return query.get("format", ["json"])[-1]
+
+
+class Outbox:
+    """Per-connection outbound queue that conflates price updates.
+
+    A single sender task drains the queue one frame at a time, and only
+    while the client has fewer than ``max_unacked`` frames it has not
+    acknowledged: clients send ``{"action": "ack"}`` (or ``"frames": n``)
+    once they have handled frames. Daphne's ``send()`` returns as soon as a
+    frame is buffered, so these acks are the only sign that a client is
+    keeping up. While it is behind, newer price updates replace older ones
+    for the same ticker instead of piling up, and other messages (alerts,
+    replies) keep their order, up to ``max_messages``, and are dropped and
+    counted beyond that. ``max_unacked=None`` sends without waiting.
+    """
+
+    def __init__(self, consumer, encoding, max_messages, max_unacked=None):
+        if encoding not in FORMATS:
+            raise ValueError(f"Unknown format {encoding}; use one of {', '.join(FORMATS)}")
+        if encoding == "msgpack" and msgpack is None:
+            raise ValueError("msgpack frames need the msgpack package installed on the server")
+        self.consumer = consumer
+        self.encoding = encoding
+        self.messages = deque()
+        self.max_messages = max_messages
+        self.max_unacked = max_unacked
+        self.unacked = 0
+        self.updates = {}
+        self.conflated = 0
+        self.dropped = 0
+        self._ready = asyncio.Event()
+        self._credit = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def put(self, message):
+        if len(self.messages) >= self.max_messages:
+            self.count_drop()
+            return False
+        self.messages.append(message)
+        self._ready.set()
+        return True
+
+    def count_drop(self, count=1):
+        self.dropped += count
+        totals["dropped"] += count
+
+    def put_update(self, key, data):
+        """Queue a price update, replacing one for the same key not yet sent."""
+        if key in self.updates:
+            self.conflated += 1
+            totals["conflated"] += 1
+        self.updates[key] = data
+        self._ready.set()
+
+    def ack(self, frames=1):
+        """Count ``frames`` as handled by the client, letting that many more be sent."""
+        self.unacked = max(0, self.unacked - frames)
+        self._credit.set()
+
+    async def _run(self):
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            while self.messages or self.updates:
+                # Wait for the client to catch up; updates keep conflating meanwhile
+                while self.max_unacked is not None and self.unacked >= self.max_unacked:
+                    self._credit.clear()
+                    await self._credit.wait()
+                self.unacked += 1
+                if self.messages:
+                    message = self.messages.popleft()
+                else:
+                    key = next(iter(self.updates))
+                    message = self.updates.pop(key)
+                await self.send_now(message)
+
+    async def send_now(self, message):
+        """Encode and write one frame, bypassing the queue."""
+        if self.encoding == "msgpack":
+            await self.consumer.send(bytes_data=msgpack.packb(message))
+        else:
+            await self.consumer.send(text_data=json.dumps(message))
+        totals["frames"] += 1
+
+    def close(self):
+        self._task.cancel()
@@ -0,0 +1,137 @@
+import time
+import asyncio
+import logging
+from datetime import datetime
+from asgiref.sync import sync_to_async
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.utils.timezone import now
+from .rolling import RollingAverage, seed_window
+from .writer import tick_writer
+from .fetcher import fetch_quote
+from . import alerts
+
+logger = logging.getLogger(__name__)
+
+
+def group_name(ticker):
+    """Channel-layer group that receives a ticker's price updates."""
+    return f"stocks.{ticker}"
+
+
+class TickerPoller:
+    """Single producer task for one ticker, shared by all its subscribers.
+
+    Each poll fetches the price once, stores it once and broadcasts it to the
+    ticker's group; consumers only join and leave the group. Pollers live in
+    the process that serves the connections, so every worker process polls
+    the tickers its own clients watch.
+    """
+
+    def __init__(self, ticker):
+        self.ticker = ticker
+        self.group = group_name(ticker)
+        self.subscribers = 0
+        self.task = None
+
+    async def run(self):
+        channel_layer = get_channel_layer()
+        last_price = None
+        try:
+            # Seeded from the DB once; later ticks only touch the in-memory window
+            window = await sync_to_async(seed_window)(self.ticker)
+        except Exception as e:
+            logger.error(f"Seeding the moving average of {self.ticker} failed: {str(e)}")
+            window = RollingAverage()
+        while True:
+            try:
+                data = await get_real_stock_data(self.ticker)
+                await channel_layer.group_send(self.group, {"type": "stock.update", "data": data})
+
+                # Save data to the database
+                save_to_db(data, window)
+
+                # Trigger alert if price changes by more than 2%
+                if last_price and abs((data["price"] - last_price) / last_price) * 100 > 2:
+                    await channel_layer.group_send(
+                        self.group,
+                        {"type": "stock.alert", "ticker": self.ticker, "message": "Stock price changed more than 2%!"},
+                    )
+                last_price = data["price"]
+
+                # Subscribers' own alert rules, checked together in one pass
+                if "error" not in data:
+                    for owner, alert_id, message in alerts.evaluate(self.ticker, time.time(), data["price"], window.mean()):
+                        await channel_layer.send(owner, {
+                            "type": "stock.alert", "ticker": self.ticker, "message": message, "alert_id": alert_id,
+                        })
+            except asyncio.CancelledError:
+                raise
+            except asyncio.TimeoutError:
+                logger.warning(f"Fetching {self.ticker} timed out after {settings.MARKET_DATA_TIMEOUT}s")
+            except Exception as e:
+                logger.error(f"Polling {self.ticker} failed: {str(e)}")
+            await asyncio.sleep(settings.STOCK_POLL_INTERVAL)
+
+
+# Ticker -> running poller, in this process
+_pollers = {}
+
+
+def subscribe(ticker):
+    """Count a new subscriber, starting the ticker's poller if it is the first."""
+    poller = _pollers.get(ticker)
+    if poller is None:
+        poller = _pollers[ticker] = TickerPoller(ticker)
+        poller.task = asyncio.get_running_loop().create_task(poller.run())
+    poller.subscribers += 1
+
+
+def unsubscribe(ticker):
+    """Drop a subscriber, stopping the ticker's poller once nobody is left."""
+    poller = _pollers.get(ticker)
+    if poller is None:
+        return
+    poller.subscribers -= 1
+    if poller.subscribers <= 0:
+        poller.task.cancel()
+        del _pollers[ticker]
+
+
+def active_tickers():
+    return {ticker: poller.subscribers for ticker, poller in _pollers.items()}
+
+
+async def get_real_stock_data(ticker):
+    try:
+        quote = await fetch_quote(ticker)
+    except ValueError:
+        return {
+            "ticker": ticker,
+            "price": 0.0,
+            "timestamp": get_timestamp(),
+            "error": f"No data found for {ticker}"
+        }
+    return {
+        "ticker": ticker,
+        "price": round(quote["price"], 2),
+        "timestamp": get_timestamp(),
+        "ts": time.time(),  # Epoch seconds of the fetch, for tick-to-client latency
+    }
+
+
+def save_to_db(data, window):
+    """Queue stock data for the batched database writer."""
+    # Average of the 5 minutes before this tick, from the in-memory window
+    current = now()
+    ma_5min = window.mean(current)
+    window.add(current, data["price"])
+    if not settings.STOCK_PERSIST_TICKS:
+        return
+    # Failed fetches carry a 0.0 price, which is stored but kept out of candles
+    tick_writer.put(data["ticker"], data["price"], ma_5min, rollup="error" not in data, timestamp=current)
+
+
+def get_timestamp():
+    """Generate a formatted timestamp."""
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
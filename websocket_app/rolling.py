@@ -0,0 +1,55 @@
+from collections import deque
+from datetime import timedelta
+from django.utils.timezone import now
+from tradingSim_app.models import StockPrice
+
+MOVING_AVERAGE_WINDOW = timedelta(minutes=5)
+
+
+class RollingAverage:
+    """Mean of the prices seen within a trailing time window.
+
+    Ticks are kept in arrival order with a running sum, so adding a tick and
+    expiring old ones is O(1) per tick instead of a query over the window.
+    """
+
+    def __init__(self, window=MOVING_AVERAGE_WINDOW):
+        self.window = window
+        self._ticks = deque()
+        self._sum = 0.0
+
+    def __len__(self):
+        return len(self._ticks)
+
+    def add(self, when, price):
+        self._ticks.append((when, float(price)))
+        self._sum += float(price)
+        self.expire(when)
+
+    def expire(self, current):
+        """Drop ticks older than the window ending at ``current``."""
+        cutoff = current - self.window
+        while self._ticks and self._ticks[0][0] < cutoff:
+            _, price = self._ticks.popleft()
+            self._sum -= price
+        if not self._ticks:
+            self._sum = 0.0  # Reset any float drift once the window empties
+
+    def mean(self, current=None):
+        self.expire(current or now())
+        if not self._ticks:
+            return None
+        return round(self._sum / len(self._ticks), 2)
+
+
+def seed_window(ticker, window=MOVING_AVERAGE_WINDOW):
+    """Rolling window of a ticker filled from the prices already stored for it."""
+    rolling = RollingAverage(window)
+    recent = (
+        StockPrice.objects.filter(ticker=ticker, timestamp__gte=now() - window)
+        .order_by("timestamp")
+        .values_list("timestamp", "price")
+    )
+    for when, price in recent:
+        rolling.add(when, price)
+    return rolling
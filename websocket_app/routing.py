@@ -1,6 +1,7 @@
 from django.urls import re_path
-from .consumers import StockPriceConsumer
+from .consumers import StockPriceConsumer, MultiStockConsumer
 
 websocket_urlpatterns = [
     re_path(r"ws/stocks/(?P<ticker>[\w\.\-]+)/$", StockPriceConsumer.as_asgi()),
+    re_path(r"ws/stocks/$", MultiStockConsumer.as_asgi()),  # Many tickers over one socket
 ]
@@ -1,3 +1,417 @@
-from django.test import TestCase
+import os
+import json
+import time
+import asyncio
+import tempfile
+import threading
+from datetime import timedelta
+from unittest import mock
+import pandas as pd
+from channels.layers import get_channel_layer
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from algo_trading.datasets import save_dataset
+from tradingSim_app import providers
+from tradingSim_app.models import Candle, StockPrice
+from . import alerts, fetcher, outbox, pollers
+from .rolling import RollingAverage, seed_window
+from .routing import websocket_urlpatterns
+from .management.commands.benchmark_websockets import percentiles_ms, process_usage
+from .alerts import LEVEL_CROSS, MA_CROSS, PERCENT_MOVE, TickerAlerts
+from .outbox import Outbox
+from .writer import TickWriter
 
-# Create your tests here.
+
+async def idle(poller):
+    await asyncio.Event().wait()
+
+
+@mock.patch.object(pollers.TickerPoller, 'run', idle)
+class PollerTests(SimpleTestCase):
+    def tearDown(self):
+        for poller in pollers._pollers.values():
+            poller.task.cancel()
+        pollers._pollers.clear()
+
+    async def test_subscribers_share_one_poller(self):
+        pollers.subscribe('AAPL')
+        task = pollers._pollers['AAPL'].task
+        pollers.subscribe('AAPL')
+        pollers.subscribe('MSFT')
+
+        self.assertEqual(pollers.active_tickers(), {'AAPL': 2, 'MSFT': 1})
+        self.assertIs(pollers._pollers['AAPL'].task, task)
+
+    async def test_last_unsubscribe_stops_the_poller(self):
+        pollers.subscribe('AAPL')
+        pollers.subscribe('AAPL')
+        task = pollers._pollers['AAPL'].task
+
+        pollers.unsubscribe('AAPL')
+        await asyncio.sleep(0)
+        self.assertFalse(task.done())
+        self.assertEqual(pollers.active_tickers(), {'AAPL': 1})
+
+        pollers.unsubscribe('AAPL')
+        await asyncio.sleep(0)
+        self.assertTrue(task.cancelled())
+        self.assertEqual(pollers.active_tickers(), {})
+
+        # Unknown tickers are ignored, and a new subscriber starts a fresh poller
+        pollers.unsubscribe('AAPL')
+        pollers.subscribe('AAPL')
+        self.assertIsNot(pollers._pollers['AAPL'].task, task)
+
+
+class RollingAverageTests(SimpleTestCase):
+    def test_mean_covers_the_trailing_window(self):
+        start = timezone.now()
+        rolling = RollingAverage(timedelta(seconds=10))
+        self.assertIsNone(rolling.mean(start))
+        for step, price in enumerate([10, 20, 30, 40]):
+            rolling.add(start + timedelta(seconds=step * 5), price)
+
+        # At 15s the window [5s, 15s] holds 20, 30 and 40
+        self.assertEqual(len(rolling), 3)
+        self.assertEqual(rolling.mean(start + timedelta(seconds=15)), 30.0)
+        self.assertEqual(rolling.mean(start + timedelta(seconds=24)), 40.0)
+        self.assertIsNone(rolling.mean(start + timedelta(seconds=26)))
+        self.assertEqual(len(rolling), 0)
+
+
+class SeedWindowTests(TestCase):
+    def test_seeded_from_recent_stored_prices(self):
+        current = timezone.now()
+        StockPrice.objects.bulk_create([
+            StockPrice(ticker='AAPL', price=100, timestamp=current - timedelta(minutes=10)),
+            StockPrice(ticker='AAPL', price=10, timestamp=current - timedelta(minutes=2)),
+            StockPrice(ticker='AAPL', price=20, timestamp=current - timedelta(minutes=1)),
+            StockPrice(ticker='MSFT', price=500, timestamp=current - timedelta(minutes=1)),
+        ])
+
+        rolling = seed_window('AAPL')
+        self.assertEqual(len(rolling), 2)
+        self.assertEqual(rolling.mean(current), 15.0)
+
+
+class TickWriterTests(TestCase):
+    async def test_ticks_are_written_in_batches_with_their_own_timestamps(self):
+        writer = TickWriter(batch_size=2, flush_interval=60, max_pending=100)
+        first = timezone.now() - timedelta(seconds=30)
+        for i in range(5):
+            self.assertTrue(writer.put('AAPL', 100 + i, timestamp=first + timedelta(seconds=i)))
+        await writer.close()
+
+        stats = writer.stats()
+        self.assertEqual((stats['written'], stats['pending'], stats['dropped']), (5, 0, 0))
+        self.assertEqual(stats['flushes'], 3)
+        stored = StockPrice.objects.filter(ticker='AAPL').order_by('timestamp').values_list('timestamp', flat=True)
+        stored = [timestamp async for timestamp in stored]
+        self.assertEqual(stored, [first + timedelta(seconds=i) for i in range(5)])
+
+    async def test_ticks_beyond_max_pending_are_dropped(self):
+        writer = TickWriter(batch_size=100, flush_interval=60, max_pending=2)
+        results = [writer.put('AAPL', 100) for _ in range(3)]
+        self.assertEqual(results, [True, True, False])
+        await writer.close()
+
+        self.assertEqual((writer.written, writer.dropped), (2, 1))
+        self.assertEqual(await StockPrice.objects.acount(), 2)
+
+    def test_write_pending_stores_ticks_and_candles_without_a_loop(self):
+        writer = TickWriter(batch_size=100, flush_interval=60, max_pending=100)
+        with mock.patch.object(writer, '_start'):
+            writer.put('AAPL', 101)
+            writer.put('AAPL', 99)
+            writer.put('AAPL', 0.0, rollup=False)  # A failed fetch is stored but kept out of candles
+        writer.write_pending()
+
+        self.assertEqual(StockPrice.objects.count(), 3)
+        candle = Candle.objects.get(ticker='AAPL', interval='1h')
+        self.assertEqual((candle.high, candle.low, candle.ticks), (101, 99, 2))
+
+
+@override_settings(STOCK_BATCH_INTERVAL=0.01, STOCK_MAX_SUBSCRIPTIONS=2)
+@mock.patch.object(pollers.TickerPoller, 'run', idle)
+class MultiStockConsumerTests(SimpleTestCase):
+    async def connect(self):
+        communicator = WebsocketCommunicator(URLRouter(websocket_urlpatterns), '/ws/stocks/')
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        self.assertIn('message', await communicator.receive_json_from())
+        return communicator
+
+    async def test_updates_of_subscribed_tickers_arrive_in_one_batch(self):
+        communicator = await self.connect()
+        await communicator.send_json_to({'action': 'subscribe', 'tickers': ['MSFT', 'AAPL', 'AAPL']})
+        self.assertEqual(await communicator.receive_json_from(), {'subscribed': ['AAPL', 'MSFT']})
+        self.assertEqual(pollers.active_tickers(), {'AAPL': 1, 'MSFT': 1})
+
+        layer = get_channel_layer()
+        for ticker, price in [('AAPL', 100), ('MSFT', 300), ('AAPL', 101)]:
+            await layer.group_send(pollers.group_name(ticker), {
+                'type': 'stock.update', 'data': {'ticker': ticker, 'price': price},
+            })
+        # Usually one frame; a batch boundary may fall between the sends
+        prices = {}
+        while prices != {'AAPL': 101, 'MSFT': 300}:
+            frame = await communicator.receive_json_from(timeout=1)
+            prices.update((update['ticker'], update['price']) for update in frame['updates'])
+
+        await communicator.send_json_to({'action': 'unsubscribe', 'tickers': ['AAPL']})
+        self.assertEqual(await communicator.receive_json_from(), {'subscribed': ['MSFT']})
+        self.assertEqual(pollers.active_tickers(), {'MSFT': 1})
+
+        await communicator.disconnect()
+        self.assertEqual(pollers.active_tickers(), {})
+
+    async def test_bad_requests_are_answered_with_errors(self):
+        communicator = await self.connect()
+        for message in [
+            {'action': 'subscribe'},
+            {'action': 'subscribe', 'tickers': ['NOT A TICKER']},
+            {'action': 'subscribe', 'tickers': ['AAPL', 'MSFT', 'GOOG']},
+        ]:
+            await communicator.send_json_to(message)
+            self.assertIn('error', await communicator.receive_json_from())
+        self.assertEqual(pollers.active_tickers(), {})
+        await communicator.disconnect()
+
+
+class BenchmarkTests(SimpleTestCase):
+    def test_report_helpers(self):
+        self.assertEqual(percentiles_ms([0.001] * 10 + [0.1]), [1.0, 90.1, 99.01])
+        self.assertEqual(percentiles_ms([]), [None, None, None])
+        cpu, rss = process_usage(os.getpid())
+        self.assertGreater(cpu, 0)
+        self.assertGreater(rss, 0)
+
+    @override_settings(STOCK_PERSIST_TICKS=False)
+    def test_ticks_are_not_stored_with_persistence_off(self):
+        window = RollingAverage()
+        with mock.patch.object(pollers.tick_writer, 'put') as put:
+            pollers.save_to_db({'ticker': 'T0', 'price': 100.0}, window)
+        put.assert_not_called()
+        self.assertEqual(len(window), 1)
+
+    async def test_updates_carry_their_fetch_time(self):
+        with mock.patch.object(pollers, 'fetch_quote', return_value={'price': 101.234}):
+            before = time.time()
+            data = await pollers.get_real_stock_data('AAPL')
+        self.assertEqual(data['price'], 101.23)
+        self.assertTrue(before <= data['ts'] <= time.time())
+
+
+class SlowConsumer:
+    """Stands in for a consumer whose client reads frames only when let through."""
+
+    def __init__(self):
+        self.frames = []
+        self.gate = asyncio.Event()
+
+    async def send(self, text_data=None, bytes_data=None):
+        await self.gate.wait()
+        self.frames.append(json.loads(text_data))
+
+
+class OutboxTests(SimpleTestCase):
+    async def test_updates_conflate_and_messages_beyond_the_limit_drop(self):
+        consumer = SlowConsumer()
+        box = Outbox(consumer, 'json', max_messages=2)
+        dropped = outbox.totals['dropped']
+        self.assertEqual([box.put({'n': n}) for n in range(3)], [True, True, False])
+        for price in (100, 101, 102):
+            box.put_update('AAPL', {'price': price})
+
+        consumer.gate.set()
+        while len(consumer.frames) < 3:
+            await asyncio.sleep(0.01)
+        box.close()
+
+        self.assertEqual(consumer.frames, [{'n': 0}, {'n': 1}, {'price': 102}])
+        self.assertEqual((box.conflated, box.dropped), (2, 1))
+        self.assertEqual(outbox.totals['dropped'] - dropped, 1)
+
+    async def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            Outbox(SlowConsumer(), 'xml', max_messages=2)
+        self.assertEqual(outbox.frame_format({'query_string': b'format=msgpack'}), 'msgpack')
+        self.assertEqual(outbox.frame_format({}), 'json')
+
+
+@override_settings(STOCK_MAX_UNACKED_FRAMES=1)
+@mock.patch.object(pollers.TickerPoller, 'run', idle)
+class FlowControlTests(SimpleTestCase):
+    async def test_updates_conflate_until_the_client_acks(self):
+        communicator = WebsocketCommunicator(URLRouter(websocket_urlpatterns), '/ws/stocks/AAPL/')
+        await communicator.connect()
+        self.assertIn('message', await communicator.receive_json_from())
+
+        conflated = outbox.totals['conflated']
+        for price in (100, 101, 102):
+            await get_channel_layer().group_send(pollers.group_name('AAPL'), {
+                'type': 'stock.update', 'data': {'ticker': 'AAPL', 'price': price},
+            })
+        # The welcome frame is not acknowledged yet, so nothing more is sent
+        self.assertTrue(await communicator.receive_nothing(timeout=0.1))
+        self.assertEqual(outbox.totals['conflated'] - conflated, 2)
+
+        await communicator.send_json_to({'action': 'ack'})
+        self.assertEqual(await communicator.receive_json_from(), {'ticker': 'AAPL', 'price': 102})
+        self.assertTrue(await communicator.receive_nothing(timeout=0.05))
+
+        await communicator.send_json_to({'action': 'ack', 'frames': 0})
+        self.assertTrue(await communicator.receive_nothing(timeout=0.05))  # The error waits for an ack too
+        await communicator.send_json_to({'action': 'ack'})
+        self.assertIn('error', await communicator.receive_json_from())
+        await communicator.disconnect()
+
+
+@override_settings(STOCK_BATCH_INTERVAL=0.2, STOCK_MAX_PENDING_MESSAGES=2)
+@mock.patch.object(pollers.TickerPoller, 'run', idle)
+class BatchAlertTests(SimpleTestCase):
+    async def test_alerts_beyond_the_limit_are_counted_as_drops(self):
+        communicator = WebsocketCommunicator(URLRouter(websocket_urlpatterns), '/ws/stocks/')
+        await communicator.connect()
+        await communicator.receive_json_from()
+        await communicator.send_json_to({'action': 'subscribe', 'tickers': ['AAPL']})
+        await communicator.receive_json_from()
+
+        dropped = outbox.totals['dropped']
+        for n in range(3):
+            await get_channel_layer().group_send(pollers.group_name('AAPL'), {
+                'type': 'stock.alert', 'ticker': 'AAPL', 'message': f"alert {n}",
+            })
+        frame = await communicator.receive_json_from(timeout=1)
+        await communicator.disconnect()
+
+        self.assertEqual([alert['alert'] for alert in frame['alerts']], ['alert 1', 'alert 2'])
+        self.assertEqual(outbox.totals['dropped'] - dropped, 1)
+
+
+class BlockingProvider:
+    """Quotes that return only once ``release`` is set, counting the calls made."""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = threading.Event()
+
+    def quote(self, ticker):
+        self.calls += 1
+        self.release.wait(5)
+        return {'ticker': ticker, 'open': 100.0, 'price': 101.0}
+
+
+@override_settings(MARKET_DATA_TIMEOUT=0.2)
+class FetcherTests(SimpleTestCase):
+    def setUp(self):
+        self.provider = BlockingProvider()
+        patcher = mock.patch.object(fetcher, 'get_provider', return_value=self.provider)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.provider.release.set)
+
+    async def test_concurrent_requests_share_one_call(self):
+        coalesced = fetcher.stats['coalesced']
+        asyncio.get_running_loop().call_later(0.05, self.provider.release.set)
+        first, second = await asyncio.gather(fetcher.fetch_quote('AAPL'), fetcher.fetch_quote('AAPL'))
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.provider.calls, 1)
+        self.assertEqual(fetcher.stats['coalesced'] - coalesced, 1)
+        self.assertNotIn('AAPL', fetcher._in_flight)
+
+    async def test_callers_time_out_without_cancelling_the_call(self):
+        with self.assertRaises(asyncio.TimeoutError):
+            await fetcher.fetch_quote('MSFT')
+        call = fetcher._in_flight['MSFT']
+        self.assertFalse(call.cancelled())
+
+        # A later caller joins the call still running and gets its result
+        self.provider.release.set()
+        self.assertEqual((await fetcher.fetch_quote('MSFT'))['price'], 101.0)
+        self.assertEqual(self.provider.calls, 1)
+
+
+class AlertTests(SimpleTestCase):
+    def fired(self, rules, now, price, ma=None):
+        return [(owner, rule_id) for owner, rule_id, _ in rules.evaluate(now, price, ma)]
+
+    def test_percent_move_fires_once_per_excursion(self):
+        rules = TickerAlerts('AAPL')
+        up = rules.add('a', PERCENT_MOVE, 2, window=60, direction=1)
+        either = rules.add('b', PERCENT_MOVE, 2, window=60)
+
+        self.assertEqual(self.fired(rules, 0, 100), [])
+        self.assertEqual(self.fired(rules, 10, 103), [('a', up), ('b', either)])
+        self.assertEqual(self.fired(rules, 20, 104), [])  # Still over: no repeat
+        self.assertEqual(self.fired(rules, 30, 101), [])  # Back under: re-armed
+        self.assertEqual(self.fired(rules, 40, 97), [('b', either)])
+        self.assertEqual(self.fired(rules, 50, 102.5), [('a', up)])
+
+    def test_level_and_moving_average_crossings(self):
+        rules = TickerAlerts('AAPL')
+        level = rules.add('a', LEVEL_CROSS, 100, direction=-1)
+        average = rules.add('b', MA_CROSS, 0)
+
+        self.assertEqual(self.fired(rules, 0, 99, ma=100), [])
+        self.assertEqual(self.fired(rules, 1, 101, ma=100), [('b', average)])  # Upward: not for the down-only rule
+        self.assertEqual(self.fired(rules, 2, 100, ma=100.5), [('a', level), ('b', average)])
+
+    def test_removing_a_rule_keeps_the_others(self):
+        rules = TickerAlerts('AAPL', capacity=1)
+        first = rules.add('a', LEVEL_CROSS, 100)
+        second = rules.add('b', LEVEL_CROSS, 200)
+        self.assertTrue(rules.remove(first))
+        self.assertFalse(rules.remove(first))
+        self.assertEqual([rule['id'] for rule in rules.rules('b')], [second])
+
+        rules.evaluate(0, 150)
+        self.assertEqual(self.fired(rules, 1, 250), [('b', second)])
+
+    def test_rules_by_owner(self):
+        self.addCleanup(alerts.remove_owner, 'b')
+        self.addCleanup(alerts.remove_owner, 'a')
+        with self.assertRaises(ValueError):
+            alerts.add_rule('a', 'AAPL', 'sideways', 2)
+        with self.assertRaises(ValueError):
+            alerts.add_rule('a', 'AAPL', 'percent_move', 2, window=-1)
+        rule_id = alerts.add_rule('a', 'AAPL', 'percent_move', 2, window=60)
+        alerts.add_rule('a', 'MSFT', 'level_cross', 300)
+        alerts.add_rule('b', 'AAPL', 'level_cross', 100)
+
+        self.assertFalse(alerts.remove_rule('b', rule_id))
+        self.assertEqual([rule['ticker'] for rule in alerts.owner_rules('a')], ['AAPL', 'MSFT'])
+        alerts.remove_owner('a')
+        self.assertEqual(alerts.owner_rules('a'), [])
+        self.assertEqual([rule['rule'] for rule in alerts.owner_rules('b')], ['level_cross'])
+
+
+class ReplayFetchTests(TransactionTestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        override = self.settings(MEDIA_ROOT=media.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        bars = pd.DataFrame({
+            'Ticker': ['AAA', 'AAA', 'BBB', 'BBB'],
+            'Date': pd.to_datetime(['2024-01-01', '2024-01-02'] * 2),
+            'Open': [1.0, 2.0, 10.0, 20.0], 'High': [1.0, 2.0, 10.0, 20.0], 'Low': [1.0, 2.0, 10.0, 20.0],
+            'Close': [1.5, 2.5, 15.0, 25.0], 'Volume': [100.0] * 4,
+        })
+        dataset = save_dataset(bars, 'replay')
+        config = {'BACKEND': 'replay', 'OPTIONS': {'dataset': dataset.pk, 'speed': 0.001}}
+        override = self.settings(MARKET_DATA_PROVIDER=config)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.addCleanup(setattr, providers, '_provider', providers._provider)
+        providers._provider = None
+
+    async def test_dataset_replay_is_built_off_the_event_loop(self):
+        quote = await fetcher.fetch_quote('BBB')
+        self.assertEqual((quote['open'], quote['price']), (10.0, 15.0))
+        self.assertIsInstance(providers._provider, providers.ReplayProvider)
@@ -4,4 +4,5 @@ from . import views
 
 urlpatterns = [
     path('monitor/', views.stock_monitor, name='stock_monitor'),
+    path('stats/', views.stream_stats, name='stream_stats'),
 ]
@@ -1,5 +1,20 @@
 # views.py
+from django.http import JsonResponse
 from django.shortcuts import render
+from . import pollers
+from .writer import tick_writer
+from .outbox import totals
+from . import fetcher, alerts
 
 def stock_monitor(request):
     return render(request, 'index.html')
+
+def stream_stats(request):
+    """Active ticker pollers with fetch, tick writer and outbound frame counters."""
+    return JsonResponse({
+        'tickers': pollers.active_tickers(),
+        'fetches': fetcher.stats,
+        'alert_rules': alerts.rule_count(),
+        'writer': tick_writer.stats(),
+        'outbound': totals,
+    })
@@ -0,0 +1,149 @@
+import atexit
+import asyncio
+import logging
+from collections import deque
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.timezone import now
+from tradingSim_app.models import StockPrice
+from tradingSim_app.candles import CandleAggregator, merge_candles
+
+logger = logging.getLogger(__name__)
+
+
+class TickWriter:
+    """Write-behind buffer that stores ticks from every poller in batches.
+
+    ``put`` never waits: ticks queue in memory and a background task inserts
+    them with ``bulk_create`` once ``batch_size`` rows are waiting or every
+    ``flush_interval`` seconds. At most ``max_pending`` ticks are held; when
+    the database falls that far behind, new ticks are dropped and counted.
+    Rows carry the time each tick was queued, not the time of the flush.
+    Ticks are also rolled into 1s/1m/5m/1h candles as they arrive, and the
+    candles touched since the last flush are upserted with them.
+    """
+
+    def __init__(self, batch_size, flush_interval, max_pending):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending = deque()
+        self.candles = CandleAggregator()
+        self._full = None
+        self._closing = False
+        self._task = None
+        self.queued = 0
+        self.written = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.failed = 0
+        self.candles_written = 0
+
+    def put(self, ticker, price, moving_average_5min=None, rollup=True, timestamp=None):
+        """Queue one tick for insertion; returns False if it was dropped."""
+        timestamp = timestamp or now()
+        if rollup:
+            self.candles.add(ticker, timestamp, price)
+        if len(self._pending) >= self.max_pending:
+            self.dropped += 1
+            return False
+        self._pending.append(StockPrice(
+            ticker=ticker, price=price, moving_average_5min=moving_average_5min, timestamp=timestamp,
+        ))
+        self.queued += 1
+        self._start()
+        if len(self._pending) >= self.batch_size:
+            self._full.set()
+        return True
+
+    def _start(self):
+        if self._task is None or self._task.done():
+            self._full = asyncio.Event()
+            self._closing = False
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._full.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._full.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Insert every queued tick, ``batch_size`` rows per statement, then upsert changed candles."""
+        await sync_to_async(self.write_pending)()
+
+    def write_pending(self):
+        """Blocking body of ``flush``, also run on its own at interpreter exit."""
+        while self._pending:
+            batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+            try:
+                StockPrice.objects.bulk_create(batch, ignore_conflicts=True)
+                self.written += len(batch)
+            except Exception as e:
+                self.failed += len(batch)
+                logger.error(f"Writing {len(batch)} ticks failed: {str(e)}")
+            self.flushes += 1
+
+        candles = self.candles.changed()
+        if candles:
+            try:
+                merge_candles(candles)
+                self.candles_written += len(candles)
+            except Exception as e:
+                logger.error(f"Writing {len(candles)} candles failed: {str(e)}")
+
+    async def close(self):
+        """Stop the background task and flush anything still queued."""
+        if self._task is not None and not self._task.done():
+            # Let a flush in progress finish rather than cancelling it mid-batch
+            self._closing = True
+            self._full.set()
+            await self._task
+        await self.flush()
+        self._closing = False
+
+    def stats(self):
+        return {
+            'pending': len(self._pending),
+            'max_pending': self.max_pending,
+            'queued': self.queued,
+            'written': self.written,
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'flushes': self.flushes,
+            'candles_written': self.candles_written,
+        }
+
+
+tick_writer = TickWriter(
+    settings.STOCK_WRITE_BATCH_SIZE,
+    settings.STOCK_WRITE_INTERVAL_MS / 1000,
+    settings.STOCK_WRITE_MAX_PENDING,
+)
+
+
+@atexit.register
+def _flush_at_exit():
+    """Write what is still queued when the process exits.
+
+    Daphne never sends ASGI lifespan events, but it stops its reactor on
+    SIGINT/SIGTERM and returns normally, so this runs after the event loop
+    has stopped. Ticks still queued when the process is killed outright
+    (SIGKILL, OOM) are lost; at most ``STOCK_WRITE_INTERVAL_MS`` of them.
+    """
+    tick_writer.write_pending()
+
+
+async def lifespan(scope, receive, send):
+    """ASGI lifespan handler that flushes queued ticks on shutdown, for servers that send it (uvicorn)."""
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await tick_writer.close()
+            await send({"type": "lifespan.shutdown.complete"})
+            return